@@ -20,7 +20,7 @@
 import os
 import sys
 
-from nark import get_version as _get_version
+from nark import get_version as _nark_get_version
 
 __all__ = (
     'get_version',
@@ -44,9 +44,40 @@ __package_name__ = 'dob'
 
 
 def get_version(include_head=False):
-    return _get_version(
-        package_name=__package_name__,
-        reference_file=__file__,
-        include_head=include_head,
-    )
+    def _get_version():
+        # From a git working tree (e.g., an editable install), the version
+        # stamped at install time goes stale with the next commit, so ask git
+        # (via the version cache, so as not to shell out on every call).
+        if in_git_worktree():
+            return cached_version()
+        if not include_head:
+            # Use the version stamped at build time, if built (see setup.py),
+            # to avoid asking pkg_resources (slow) on every call.
+            try:
+                from ._version import version
+                return version
+            except ImportError:
+                pass
+        return resolve_version()
 
+    def in_git_worktree():
+        from .helpers.versions import git_worktree_dir
+        return git_worktree_dir(__file__) is not None
+
+    def cached_version():
+        from .helpers.versions import cached_version
+        return cached_version(
+            __package_name__,
+            __file__,
+            resolve_version,
+            include_head=include_head,
+        )
+
+    def resolve_version():
+        return _nark_get_version(
+            package_name=__package_name__,
+            reference_file=__file__,
+            include_head=include_head,
+        )
+
+    return _get_version()
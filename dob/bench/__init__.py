@@ -0,0 +1,45 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""``dob`` benchmarking: synthetic data stores, and timing common commands."""
+
+__all__ = (
+    'BENCH_CASES',
+    'BENCH_SIZES',
+)
+
+
+# The store sizes (Fact counts) we care about. The bigger ones take a while
+# to seed, but the stores are reused between runs.
+BENCH_SIZES = (10000, 100000, 1000000)
+
+# The commands that `dob debug bench` knows how to run.
+BENCH_CASES = (
+    'startup',
+    'current',
+    'find',
+    'hydrate',
+    'report',
+    'table',
+    'table-rst',
+    'table-fast',
+    'usage',
+    'export',
+    'import',
+    'complete',
+    'stats',
+)
@@ -0,0 +1,286 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Deterministic Fact generators, for seeding large stores (see ``bench.seed``).
+
+Given the same seed and Fact count, a generator always produces the same
+Facts, so stores generated by different versions of dob are comparable.
+
+The synthetic distributions are loosely modeled on a real user's data: a
+handful of categories; a long tail of activities and tags (a few used a lot,
+most used rarely); workday hours with back-to-back Facts and the occasional
+break; and a mix of terse and chatty descriptions.
+"""
+
+import math
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+__all__ = (
+    'FactGenerator',
+    'SyntheticFact',
+    'SyntheticFactGenerator',
+)
+
+
+SyntheticFact = namedtuple(
+    'SyntheticFact', ('start', 'end', 'activity', 'description', 'tags'),
+)
+
+
+# The generated Facts end in the week before this time, regardless of count.
+ANCHOR_TIME = datetime(2020, 1, 1, 18, 0, 0)
+
+CATEGORY_NAMES = (
+    'Work', 'Meetings', 'Email', 'Learning', 'Admin',
+    'Exercise', 'Household', 'Family', 'Hobby', 'Travel',
+)
+
+ACTIVITY_VERBS = (
+    'Coding', 'Review', 'Planning', 'Standup', 'Reading', 'Writing', 'Triage',
+    'Design', 'Support', 'Research', 'Errands', 'Cooking', 'Running', 'Call',
+)
+
+TAG_STEMS = (
+    'urgent', 'client', 'billable', 'internal', 'bug', 'feature', 'docs',
+    'deep-work', 'remote', 'onsite', 'quick', 'blocked', 'followup', 'ops',
+    'release', 'infra', 'hiring', 'q1', 'q2', 'q3', 'q4',
+)
+
+DESCRIPTION_WORDS = (
+    'review', 'budget', 'meeting', 'notes', 'sync', 'draft', 'fix', 'test',
+    'deploy', 'refactor', 'plan', 'call', 'email', 'report', 'spec', 'merge',
+    'customer', 'team', 'issue', 'release', 'follow', 'up', 'with', 'the',
+    'and', 'on', 'for', 'new', 'old', 'weekly', 'monthly', 'quarterly',
+)
+
+
+class FactGenerator(object):
+    """Base class for Fact generators that ``bench.seed.seed_store`` can insert.
+
+    Subclasses fill in the ``categories`` and ``tags`` name lists, and the
+    ``activities`` list of (name, category index) pairs, and implement
+    ``generate_facts`` to yield SyntheticFact tuples that reference those
+    lists by index.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.rand = random.Random(seed)
+        self.categories = []
+        self.activities = []
+        self.tags = []
+
+    def __iter__(self):
+        return self.generate_facts()
+
+    def generate_facts(self):
+        raise NotImplementedError
+
+    # ***
+
+    def intern_category(self, name):
+        return self.intern_item(self.categories, name)
+
+    def intern_activity(self, name, category_name=None):
+        category_idx = None
+        if category_name is not None:
+            category_idx = self.intern_category(category_name)
+        return self.intern_item(self.activities, (name, category_idx))
+
+    def intern_tag(self, name):
+        return self.intern_item(self.tags, name)
+
+    def intern_item(self, items, item):
+        try:
+            return items.index(item)
+        except ValueError:
+            items.append(item)
+            return len(items) - 1
+
+    def synthesize_fact(self, fact):
+        """Convert a Fact item into a SyntheticFact, interning its names."""
+        category = fact.activity.category
+        return SyntheticFact(
+            start=fact.start,
+            end=fact.end,
+            activity=self.intern_activity(
+                fact.activity.name, category.name if category else None,
+            ),
+            description=fact.description or '',
+            tags=[self.intern_tag(tag.name) for tag in fact.tags],
+        )
+
+
+class SyntheticFactGenerator(FactGenerator):
+    """Generates ``fact_count`` chronological Facts, given a seed.
+
+    The final Fact is left open (active) unless ``ongoing`` is False.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        fact_count=10000,
+        ongoing=True,
+        anchor_time=ANCHOR_TIME,
+        activity_count=60,
+        tag_count=120,
+    ):
+        super(SyntheticFactGenerator, self).__init__(seed=seed)
+        self.fact_count = fact_count
+        self.ongoing = ongoing
+        self.anchor_time = anchor_time
+        self._anchor_offset = None
+        self.create_categories()
+        self.create_activities(activity_count)
+        self.create_tags(tag_count)
+
+    # ***
+
+    def create_categories(self):
+        self.categories = list(CATEGORY_NAMES)
+
+    def create_activities(self, activity_count):
+        # Each activity is a (name, category index) pair.
+        self.activities = []
+        seen = set()
+        while len(self.activities) < activity_count:
+            verb = self.rand.choice(ACTIVITY_VERBS)
+            category_idx = self.rand.randrange(len(self.categories))
+            if (verb, category_idx) in seen:
+                verb = '{} {}'.format(verb, len(self.activities))
+            seen.add((verb, category_idx))
+            self.activities.append((verb, category_idx))
+        self.activity_weights = self.zipf_weights(activity_count)
+
+    def create_tags(self, tag_count):
+        self.tags = [
+            '{}-{}'.format(TAG_STEMS[idx % len(TAG_STEMS)], idx // len(TAG_STEMS))
+            if idx >= len(TAG_STEMS) else TAG_STEMS[idx]
+            for idx in range(tag_count)
+        ]
+        self.tag_weights = self.zipf_weights(tag_count)
+
+    def zipf_weights(self, count, exponent=1.1):
+        # A long-tailed popularity, in shuffled order, so that the most
+        # popular activities are not always the first ones generated.
+        weights = [1.0 / math.pow(rank, exponent) for rank in range(1, count + 1)]
+        self.rand.shuffle(weights)
+        return weights
+
+    # ***
+
+    def generate_facts(self):
+        """Yield SyntheticFact tuples; activity and tags are list indices."""
+        # Reseed, so that each pass over the generator yields the same Facts.
+        self.rand = random.Random('{}:facts'.format(self.seed))
+        for start, end in self.fact_times():
+            yield SyntheticFact(
+                start=start,
+                end=end,
+                activity=self.random_activity(),
+                description=self.random_description(),
+                tags=self.random_tags(),
+            )
+
+    def time_span(self):
+        """Return the first Fact's start and the last Fact's end (or start)."""
+        first = last = None
+        for start, end in self.fact_times():
+            first = first or start
+            last = end or start
+        return first, last
+
+    # ***
+
+    def fact_times(self):
+        """Yield (start, end) for each Fact, ending shortly before the anchor."""
+        offset = self.anchor_offset()
+        for start, end in self.walk_fact_times():
+            yield start + offset, end and end + offset
+
+    def anchor_offset(self):
+        # How many Facts fit in a day depends on the durations and breaks
+        # drawn, so walk the times forward from the anchor first, and then
+        # shift them back to end before it. Shift by whole weeks, so that
+        # weekends still fall on weekends.
+        if self._anchor_offset is None:
+            last = self.anchor_time
+            for start, end in self.walk_fact_times():
+                last = end or start
+            weeks = math.ceil((last - self.anchor_time) / timedelta(weeks=1))
+            self._anchor_offset = -timedelta(weeks=weeks)
+        return self._anchor_offset
+
+    def walk_fact_times(self):
+        # The times are drawn from their own random stream, so that walking
+        # them does not disturb the draws for the rest of each Fact.
+        self.time_rand = random.Random('{}:times'.format(self.seed))
+        start = self.start_of_workday(self.anchor_time)
+        for idx in range(self.fact_count):
+            end = start + self.random_duration()
+            if self.ongoing and idx == self.fact_count - 1:
+                end = None
+            yield start, end
+            if end is not None:
+                start = self.next_start(end)
+
+    def start_of_workday(self, day):
+        return day.replace(hour=8, minute=0, second=0, microsecond=0) + timedelta(
+            minutes=self.time_rand.randrange(0, 60),
+        )
+
+    def next_start(self, prev_end):
+        if prev_end.hour >= 18:
+            next_day = prev_end + timedelta(days=1)
+            # Take most weekends off.
+            while next_day.weekday() >= 5 and self.time_rand.random() < 0.9:
+                next_day += timedelta(days=1)
+            return self.start_of_workday(next_day)
+        if self.time_rand.random() < 0.6:
+            # Back to back.
+            return prev_end
+        return prev_end + timedelta(
+            minutes=int(self.time_rand.expovariate(1 / 20.0)) + 1,
+        )
+
+    def random_duration(self):
+        minutes = self.time_rand.lognormvariate(math.log(45), 0.8)
+        minutes = min(max(minutes, 1), 6 * 60)
+        return timedelta(seconds=int(minutes * 60))
+
+    def random_activity(self):
+        return self.rand.choices(
+            range(len(self.activities)), weights=self.activity_weights,
+        )[0]
+
+    def random_tags(self):
+        tag_count = self.rand.choices((0, 1, 2, 3), weights=(35, 35, 20, 10))[0]
+        chosen = set()
+        while len(chosen) < tag_count:
+            chosen.add(self.rand.choices(
+                range(len(self.tags)), weights=self.tag_weights,
+            )[0])
+        return sorted(chosen)
+
+    def random_description(self):
+        if self.rand.random() < 0.2:
+            return ''
+        word_count = self.rand.randrange(1, 13)
+        return ' '.join(self.rand.choice(DESCRIPTION_WORDS) for _ in range(word_count))
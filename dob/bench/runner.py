@@ -0,0 +1,307 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Runs ``dob`` commands against synthetic stores and records how long they take.
+
+Each command runs in a fresh interpreter, so that the timings include
+startup costs (imports, config, store standup), just like a user sees.
+
+With ``memory``, each command also runs once more with ``--memprofile``
+(see dob.instrument.memory), and the results include its peak memory, and
+the memory that its 'query' phase left allocated (i.e., the results).
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from gettext import gettext as _
+
+from dob_bright.config.app_dirs import AppDirs
+from dob_bright.termio import click_echo, dob_in_user_exit, highlight_value
+
+from .. import get_version
+from . import BENCH_CASES, BENCH_SIZES
+from .generator import SyntheticFactGenerator
+from .seed import seed_store
+
+__all__ = (
+    'run_benchmarks',
+)
+
+
+# The number of Facts in the file that the 'import' case reads.
+IMPORT_FACT_COUNT = 100
+
+# The --table-type for each table case, and the table width.
+TABLE_TYPES = {
+    'table': 'normal',
+    'table-rst': 'rst',
+    'table-fast': 'fast',
+}
+TABLE_WIDTH = 120
+
+# (For echoing memory use.)
+MiB = 1024 * 1024
+
+
+def run_benchmarks(
+    sizes=(BENCH_SIZES[0],),
+    cases=BENCH_CASES,
+    repeat=3,
+    seed=0,
+    workdir=None,
+    output_path=None,
+    memory=False,
+):
+    """Generate (or reuse) a store per size, time each case, and write results."""
+    workdir = workdir or os.path.join(AppDirs.user_cache_dir, 'bench')
+
+    def _run_benchmarks():
+        results = {
+            'dob_version': dob_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now().isoformat(),
+            'seed': seed,
+            'repeat': repeat,
+            'memory': memory,
+            'sizes': [],
+        }
+        for size in sizes:
+            results['sizes'].append(bench_size(size))
+        if output_path:
+            write_results(results)
+        return results
+
+    def dob_version():
+        return get_version()
+
+    def bench_size(size):
+        size_dir = os.path.join(workdir, 'seed-{}-size-{}'.format(seed, size))
+        env = bench_environ(size_dir)
+        seeded = prepare_store(size, size_dir, env)
+        size_results = {
+            'facts': size,
+            'seed_seconds': seeded,
+            'cases': {},
+        }
+        for case in cases:
+            args, extra_env, stdin_path = case_args(case, size_dir)
+            runs = time_command(args, dict(env, **extra_env), stdin_path)
+            if memory:
+                runs['memory'] = profile_memory(
+                    case, args, dict(env, **extra_env), stdin_path, size_dir,
+                )
+            size_results['cases'][case] = runs
+            echo_case(size, case, runs)
+        return size_results
+
+    def bench_environ(size_dir):
+        env = dict(os.environ)
+        # Use a separate config and data store for each size.
+        env['XDG_CONFIG_HOME'] = os.path.join(size_dir, 'config')
+        env['XDG_DATA_HOME'] = os.path.join(size_dir, 'data')
+        env['XDG_CACHE_HOME'] = os.path.join(size_dir, 'cache')
+        # Ignore the user's environment, which might ask for a pager, etc.
+        for key in list(env.keys()):
+            if key.startswith('DOB_'):
+                del env[key]
+        return env
+
+    # ***
+
+    def prepare_store(size, size_dir, env):
+        stamp_path = os.path.join(size_dir, 'seeded.json')
+        if os.path.exists(stamp_path):
+            # The store is deterministic, so reuse the one from last time.
+            return None
+        os.makedirs(size_dir, exist_ok=True)
+        run_dob(['init'], env, check=True)
+        db_path = run_dob(['store', 'path'], env, check=True).strip()
+        click_echo(
+            _('Seeding {} Facts into {}').format(size, highlight_value(db_path))
+        )
+        generator = SyntheticFactGenerator(seed=seed, fact_count=size)
+        time_0 = time.perf_counter()
+        try:
+            seed_store(db_path, generator)
+        except ValueError as err:
+            dob_in_user_exit(str(err))
+        seed_seconds = time.perf_counter() - time_0
+        write_import_file(size_dir, generator)
+        with open(stamp_path, 'w') as stamp_f:
+            json.dump({'seed': seed, 'facts': size}, stamp_f)
+        return seed_seconds
+
+    def write_import_file(size_dir, store_generator):
+        # Import Facts that predate the synthetic Facts, so they never conflict.
+        first_start, _last = store_generator.time_span()
+        generator = SyntheticFactGenerator(
+            seed=seed,
+            fact_count=IMPORT_FACT_COUNT,
+            ongoing=False,
+            anchor_time=first_start - timedelta(days=1),
+        )
+        with open(import_path(size_dir), 'w') as import_f:
+            for fact in generator:
+                activity, category_idx = generator.activities[fact.activity]
+                import_f.write('{} to {} {}@{}: {} {}\n\n'.format(
+                    fact.start.strftime('%Y-%m-%d %H:%M:%S'),
+                    fact.end.strftime('%Y-%m-%d %H:%M:%S'),
+                    activity,
+                    generator.categories[category_idx],
+                    ' '.join('#{}'.format(generator.tags[idx]) for idx in fact.tags),
+                    fact.description,
+                ))
+
+    def import_path(size_dir):
+        return os.path.join(size_dir, 'import.facts')
+
+    # ***
+
+    def case_args(case, size_dir):
+        if case == 'startup':
+            return ['version'], {}, None
+        elif case == 'current':
+            return ['current'], {}, None
+        elif case == 'find':
+            return ['find', 'budget'], {}, None
+        elif case == 'hydrate':
+            # Every Fact, in a format that needs each Fact made in full,
+            # with its Activity, Category, and Tags (see dob.store.interning).
+            return ['find', '--format', 'factoid'], {}, None
+        elif case == 'report':
+            # The last month's worth of Facts, give or take.
+            until = SyntheticFactGenerator(seed=seed, fact_count=0).anchor_time
+            since = until - timedelta(days=30)
+            return [
+                'report',
+                '--since', since.strftime('%Y-%m-%d'),
+                '--until', until.strftime('%Y-%m-%d'),
+            ], {}, None
+        elif case in TABLE_TYPES:
+            # Every Fact, as an ASCII table: the 'normal' one (texttable), the
+            # reST one (tabulate), and dob's own 'fast' one.
+            return [
+                'find',
+                '--format', 'table',
+                '--table-type', TABLE_TYPES[case],
+                '--max-width', str(TABLE_WIDTH),
+            ], {}, None
+        elif case == 'usage':
+            return ['usage', 'activity'], {}, None
+        elif case == 'export':
+            export_path = os.path.join(size_dir, 'export.facts')
+            return ['export', '-o', export_path], {}, None
+        elif case == 'import':
+            # The import command reads from stdin when it is not a terminal.
+            return ['import', '--dry', '-E'], {}, import_path(size_dir)
+        elif case == 'complete':
+            return ['complete'], {'COMP_WORDS': 'dob on ', 'COMP_CWORD': '2'}, None
+        elif case == 'stats':
+            return ['stats'], {}, None
+        raise ValueError('Unknown benchmark case: {}'.format(case))
+
+    def time_command(args, env, stdin_path):
+        timings = []
+        returncode = 0
+        for _run in range(repeat):
+            time_0 = time.perf_counter()
+            returncode = run_dob(args, env, stdin_path=stdin_path)
+            timings.append(time.perf_counter() - time_0)
+        return {
+            'args': args,
+            'returncode': returncode,
+            'runs': timings,
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+        }
+
+    def profile_memory(case, args, env, stdin_path, size_dir):
+        memprofile_path = os.path.join(size_dir, 'memprofile-{}.json'.format(case))
+        if os.path.exists(memprofile_path):
+            os.unlink(memprofile_path)
+        run_dob(['--memprofile', memprofile_path] + args, env, stdin_path=stdin_path)
+        try:
+            with open(memprofile_path, 'r') as memprofile_f:
+                profile = json.load(memprofile_f)
+        except (OSError, ValueError):
+            return None
+        return {
+            'peak': profile['peak'],
+            'rss_peak': profile['rss_peak'],
+            'query_allocated': sum(
+                phase['allocated']
+                for phase in profile['phases'] if phase['name'] == 'query'
+            ),
+        }
+
+    def run_dob(args, env, check=False, stdin_path=None):
+        cmd = [sys.executable, '-c', 'from dob.dob import run; run()'] + args
+        if check:
+            try:
+                return subprocess.check_output(
+                    cmd, env=env, stderr=subprocess.STDOUT, universal_newlines=True,
+                )
+            except subprocess.CalledProcessError as err:
+                dob_in_user_exit(
+                    _('Command failed: {}\n{}').format(' '.join(args), err.output)
+                )
+        stdin_f = open(stdin_path, 'r') if stdin_path else subprocess.DEVNULL
+        try:
+            return subprocess.call(
+                cmd,
+                env=env,
+                stdin=stdin_f,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        finally:
+            if stdin_path:
+                stdin_f.close()
+
+    # ***
+
+    def echo_case(size, case, runs):
+        status = '' if runs['returncode'] == 0 else _(' (exit {})').format(
+            runs['returncode'],
+        )
+        click_echo('{:>9} {:<10} min {:8.3f}s  median {:8.3f}s{}{}'.format(
+            size, case, runs['min'], runs['median'], echo_memory(runs), status,
+        ))
+
+    def echo_memory(runs):
+        if not runs.get('memory'):
+            return ''
+        return '  peak {:8.1f} MiB  results {:8.1f} MiB'.format(
+            runs['memory']['peak'] / MiB, runs['memory']['query_allocated'] / MiB,
+        )
+
+    def write_results(results):
+        with open(output_path, 'w') as output_f:
+            json.dump(results, output_f, indent=2, sort_keys=True)
+            output_f.write('\n')
+        click_echo(_('Wrote results to {}').format(highlight_value(output_path)))
+
+    return _run_benchmarks()
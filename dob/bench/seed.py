@@ -0,0 +1,190 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Bulk-loads generated Facts into a new SQLite store, as fast as SQLite allows."""
+
+from sqlalchemy import create_engine, func, select, text
+
+from nark.backends.sqlalchemy.objects import (
+    activities,
+    categories,
+    fact_tags,
+    facts,
+    tags
+)
+
+from ..store.spans import FACT_SPANS_FILL_SQL
+
+__all__ = (
+    'seed_store',
+)
+
+
+def seed_store(db_path, *generators, batch_size=10000):
+    """Bulk-insert the generators' Facts into an empty SQLite store.
+
+    The rows are inserted in one transaction using ``executemany``, with
+    journaling and syncing turned off, and with the Fact indices and dob's
+    triggers dropped until all the rows are in. So the bulk load is not
+    recorded in the change feed, and the span table (if any) is filled in
+    with one statement afterwards. Without a journal, a failure leaves the
+    store in an undefined state, which is why the store must start empty.
+
+    Returns the number of Facts inserted. Facts are assigned IDs in the
+    order generated, starting from 1.
+    """
+    category_ids = {}
+    activity_ids = {}
+    tag_ids = {}
+    fact_ids = []
+
+    def _seed_store():
+        engine = create_engine('sqlite:///{}'.format(db_path))
+        conn = engine.connect()
+        try:
+            seed_connection(conn)
+        finally:
+            conn.close()
+            engine.dispose()
+        return len(fact_ids)
+
+    def seed_connection(conn):
+        # The journal mode cannot change inside a transaction.
+        conn.execute(text('PRAGMA journal_mode = OFF'))
+        conn.execute(text('PRAGMA synchronous = OFF'))
+        with conn.begin():
+            must_be_empty(conn)
+            trigger_ddls = drop_schema(conn, 'trigger', "name LIKE 'tr_dob_%'")
+            index_ddls = drop_schema(
+                conn, 'index', "tbl_name IN ('facts', 'fact_tags', 'dob_fact_spans')",
+            )
+            for generator in generators:
+                insert_generator(conn, generator)
+            fill_fact_spans(conn)
+            for ddl in index_ddls + trigger_ddls:
+                conn.execute(text(ddl))
+
+    def must_be_empty(conn):
+        # The rows are inserted with IDs counted from 1, so every table
+        # that gets rows must start empty, and not just the Facts.
+        for table in (facts, fact_tags, activities, categories, tags):
+            n_rows = conn.execute(select([func.count()]).select_from(table)).scalar()
+            if n_rows:
+                raise ValueError('Expected an empty store, found {} {}'.format(
+                    n_rows, table.name,
+                ))
+
+    def drop_schema(conn, kind, where):
+        # Building an index once at the end is a lot cheaper than maintaining
+        # it row by row, and dob's triggers (the change feed, versions, and
+        # spans) would otherwise fire for every row. Skip the automatic
+        # indices (for UNIQUE constraints), which have no SQL, and which
+        # cannot be dropped anyway.
+        ddls = []
+        rows = conn.execute(text(
+            "SELECT name, sql FROM sqlite_master"
+            " WHERE type = '{}' AND sql IS NOT NULL AND {}".format(kind, where)
+        ))
+        for name, sql in rows.fetchall():
+            conn.execute(text('DROP {} "{}"'.format(kind.upper(), name)))
+            ddls.append(sql)
+        return ddls
+
+    def fill_fact_spans(conn):
+        # The span table exists only if dob already ran against the store.
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master"
+            " WHERE type = 'table' AND name = 'dob_fact_spans'"
+        )).scalar()
+        if exists:
+            conn.execute(text(FACT_SPANS_FILL_SQL))
+
+    # ***
+
+    def insert_generator(conn, generator):
+        category_map = insert_names(conn, categories, category_ids, generator.categories)
+        activity_map = insert_activities(conn, generator.activities, category_map)
+        tag_map = insert_names(conn, tags, tag_ids, generator.tags)
+        insert_facts(conn, generator, activity_map, tag_map)
+
+    def insert_names(conn, table, known_ids, names):
+        rows = []
+        id_map = []
+        for name in names:
+            if name not in known_ids:
+                known_ids[name] = len(known_ids) + 1
+                rows.append({
+                    'id': known_ids[name],
+                    'name': name,
+                    'deleted': False,
+                    'hidden': False,
+                })
+            id_map.append(known_ids[name])
+        if rows:
+            conn.execute(table.insert(), rows)
+        return id_map
+
+    def insert_activities(conn, generator_activities, category_map):
+        rows = []
+        id_map = []
+        for name, category_idx in generator_activities:
+            category_id = None if category_idx is None else category_map[category_idx]
+            key = (name, category_id)
+            if key not in activity_ids:
+                activity_ids[key] = len(activity_ids) + 1
+                rows.append({
+                    'id': activity_ids[key],
+                    'name': name,
+                    'category_id': category_id,
+                    'deleted': False,
+                    'hidden': False,
+                })
+            id_map.append(activity_ids[key])
+        if rows:
+            conn.execute(activities.insert(), rows)
+        return id_map
+
+    def insert_facts(conn, generator, activity_map, tag_map):
+        fact_rows = []
+        tag_rows = []
+        for fact in generator:
+            fact_id = len(fact_ids) + 1
+            fact_ids.append(fact_id)
+            fact_rows.append({
+                'id': fact_id,
+                'deleted': False,
+                'split_from_id': None,
+                'start_time': fact.start,
+                'end_time': fact.end,
+                'activity_id': activity_map[fact.activity],
+                'description': fact.description,
+            })
+            for tag_idx in fact.tags:
+                tag_rows.append({'fact_id': fact_id, 'tag_id': tag_map[tag_idx]})
+            if len(fact_rows) >= batch_size:
+                flush_rows(conn, fact_rows, tag_rows)
+        flush_rows(conn, fact_rows, tag_rows)
+
+    def flush_rows(conn, fact_rows, tag_rows):
+        if fact_rows:
+            conn.execute(facts.insert(), fact_rows)
+        if tag_rows:
+            conn.execute(fact_tags.insert(), tag_rows)
+        del fact_rows[:]
+        del tag_rows[:]
+
+    return _seed_store()
@@ -18,8 +18,8 @@
 from gettext import gettext as _
 
 import click_hotoffthehamster as click
+import lazy_import
 
-from dob_bright.reports.tabulate_results import report_table_columns
 from dob_bright.termio import dob_in_user_exit, dob_in_user_warning
 
 __all__ = (
@@ -38,6 +38,8 @@ __all__ = (
     #   '_cmd_options_output_format_multiple_choices_option',
     #   '_cmd_options_output_format_singular_options_any',
     #   '_cmd_options_output_format_singular_options_fact',
+    # Private module classes:
+    #   '_LazyChoice',
     #   '_cmd_options_output_format_tabling',
     #   '_cmd_options_output_formats_basic',
     #   '_cmd_options_output_formats_table',
@@ -61,6 +63,12 @@ __all__ = (
     #   '_postprocess_options_sparkline_total',
 )
 
+# The report columns are defined alongside the report formatter, which loads
+# the storage backend (SQLAlchemy). Defer that until the choices are needed.
+report_table_columns = lazy_import.lazy_callable(
+    'dob_bright.reports.tabulate_results.report_table_columns'
+)
+
 
 # ***
 # *** [SEARCH QUERY] Item ID.
@@ -541,10 +549,28 @@ def _postprocess_options_results_show_hide_option(kwargs, argname):
 # *** [RESULTS CUSTOM] Columns.
 # ***
 
+class _LazyChoice(click.Choice):
+    """A Choice that fetches its choices on first use, and not at import."""
+
+    def __init__(self, fetch_choices, **kwargs):
+        self._fetch_choices = fetch_choices
+        super(_LazyChoice, self).__init__(choices=None, **kwargs)
+
+    @property
+    def choices(self):
+        if self._choices is None:
+            self._choices = self._fetch_choices()
+        return self._choices
+
+    @choices.setter
+    def choices(self, choices):
+        self._choices = choices
+
+
 _cmd_options_results_show_columns = [
     click.option(
         '-l', '--column', multiple=True,
-        type=click.Choice(report_table_columns()),
+        type=_LazyChoice(report_table_columns),
         help=_('Specify custom report columns.'),
     ),
 ]
@@ -844,11 +870,16 @@ _tabulate_tablefmts_markup = [
 # - tl;dr We let the user choose `texttable` to generate an ASCII table; and we
 #   let them choose a few of the `tabulate` formats to generate alternative
 #   (non-table) outputs.
+# - But texttable is slow for tables with many rows, so we also offer our own
+#   'fast' table, which writes each row on one line, truncating long values
+#   instead of wrapping them (see dob.reports.fast_table).
 def _cmd_options_output_formats_table(item=''):
     table_choices = []
     # MAGIC_VALUE: Use 'normal' to refer to the nice, wrapped ASCII table
     #              that 'texttable' generates by default.
     table_choices += ['normal']
+    # MAGIC_VALUE: The 'fast' table is dob's own (see dob.reports.fast_table).
+    table_choices += ['fast']
     # Include also those tabulate package output formats that are not
     # ASCII table formats (and not destined for terminal viewage).
     table_choices += _tabulate_tablefmts_markup
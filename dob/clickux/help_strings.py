@@ -328,9 +328,72 @@ DEBUG_HELP = _(
     fix it first,
 
       import os, pdb; os.system("stty sane"); pdb.set_trace()
+
+    The debug command also collects a few developer subcommands,
+    e.g., `bench`, which times common commands on large data stores.
+    """
+)
+
+
+DEBUG_BENCH_HELP = _(
+    """
+    Time common commands against synthetic data stores.
+
+    Generates a deterministic store for each --size (reused on later runs),
+    runs each --case in a fresh process --repeat times, and writes the
+    timings to the --output file as JSON.
+    """
+)
+
+DEBUG_BENCH_SIZE_HELP = _(
+    'Number of Facts in the synthetic store, e.g., 10000, 100000, or 1000000'
+    ' (may be specified multiple times) [default: 10000]'
+)
+
+DEBUG_BENCH_CASE_HELP = _('Command to benchmark (may be specified multiple times)'
+                          ' [default: all]')
+
+DEBUG_BENCH_REPEAT_HELP = _('Number of times to run each command')
+
+DEBUG_BENCH_SEED_HELP = _('Random seed used to generate the synthetic stores')
+
+DEBUG_BENCH_WORKDIR_HELP = _('Where to keep the synthetic stores'
+                             ' [default: under the user cache directory]')
+
+DEBUG_BENCH_OUTPUT_HELP = _('Path to the JSON results file')
+
+DEBUG_BENCH_MEMORY_HELP = _('Also run each command once with --memprofile,'
+                            ' and report its peak memory use')
+
+DEBUG_IMPORT_TIME_HELP = _(
+    """
+    Show the modules that take the longest to import.
+
+    Imports the --module in a fresh interpreter using Python's -X importtime,
+    lists the --top slowest imports (including the modules each imports), and
+    reports any heavy modules (e.g., prompt_toolkit, SQLAlchemy) that dob
+    loaded at startup, rather than lazily, when first used.
+    """
+)
+
+DEBUG_IMPORT_TIME_TOP_HELP = _('Number of slowest imports to show')
+
+DEBUG_IMPORT_TIME_MODULE_HELP = _('Module to import')
+
+DEBUG_SPOOL_HELP = _(
+    """
+    Show the spooled post-processing that's pending (or failed).
+
+    If post_process.spool is set, commands that save Facts spool the plugin
+    post-processors, and start a background worker to run them. Use --drain
+    to run them now, and --requeue to try failed entries again.
     """
 )
 
+DEBUG_SPOOL_DRAIN_HELP = _('Run the pending post-processors now')
+
+DEBUG_SPOOL_REQUEUE_HELP = _('Move failed entries back to pending first')
+
 
 # ***
 # *** [DEMO] Command help.
@@ -346,6 +409,13 @@ def DEMO_HELP(ctx):
     return _help
 
 
+DEMO_SEED_HELP = _('Random seed used to generate the --facts history')
+
+DEMO_FACTS_HELP = _('Number of historic Facts to generate before the demo Facts')
+
+DEMO_OUT_HELP = _('Write the demo store to a new file instead, and exit')
+
+
 # ***
 # *** [INIT] Command help.
 # ***
@@ -934,6 +1004,32 @@ STORE_URL_HELP = _(
 )
 
 
+STORE_CHANGES_HELP = _(
+    """
+    Print the changes made to Facts, oldest first, one JSON object per line.
+
+    Each change has a sequence number (“seq”) that only ever increases.
+    Remember the last one you saw, and pass it to --since next time to see
+    only what's changed since. Use --follow to keep printing new changes
+    as they happen (press Ctrl-C to stop).
+
+    Old changes are removed per the db.changes.retention_days and
+    db.changes.retention_rows settings.
+    """
+)
+
+
+STORE_CHANGES_SINCE_HELP = _('Only show changes after this sequence number')
+
+
+STORE_CHANGES_FOLLOW_HELP = _('Keep printing changes as they happen')
+
+
+STORE_CHANGES_INTERVAL_HELP = _(
+    'How often to check for changes, in seconds, when following'
+)
+
+
 STORE_UPGRADE_LEGACY_HELP = _(
     """
     Migrate a legacy “Hamster” database to dob.
@@ -1158,9 +1254,29 @@ CANCEL_HELP = _(
 CURRENT_HELP = _(
     """
     Print the active Fact, if there is one.
+
+    Each time a command changes your Facts, dob saves a snapshot of the
+    active Fact to the user cache. Use --cached to print from the snapshot
+    (which is much faster, e.g., for a shell prompt or tmux status line),
+    or --watch to print the active Fact whenever it changes.
+
+    Use --format to choose what to print, e.g.,
+
+      --format '{actegory} [{hours}]'
+
+    The fields are: pk, start, activity, category, actegory, tags,
+    description, elapsed, hours, and minutes.
     """
 )
 
+CURRENT_CACHED_HELP = _('Print from the status snapshot, if the database is unchanged')
+
+CURRENT_FORMAT_HELP = _('Print the Fact using the Python format string')
+
+CURRENT_WATCH_HELP = _('Keep running, and print the active Fact anew when it changes')
+
+CURRENT_INTERVAL_HELP = _('How often to check for changes, in seconds, when watching')
+
 
 def NO_ACTIVE_FACT_HELP(ctx):
     _help = _(
@@ -1510,3 +1626,33 @@ GLOBAL_OPT_CONFIGFILE = _(
     default_config_path_abbrev=highlight_value(default_config_path_abbrev()),
 )
 
+
+GLOBAL_OPT_VERSION = _('Show the version and exit.')
+
+GLOBAL_OPT_PROFILE = _(
+    """
+    Write timeline of command phases to FILE (‘-’ for stderr).
+    """
+)
+
+
+GLOBAL_OPT_PROFILE_FORMAT = _(
+    """
+    Profile timeline format: JSON, or Chrome trace events.
+    """
+)
+
+
+GLOBAL_OPT_CPROFILE = _(
+    """
+    Write cProfile stats to FILE (view with, e.g., snakeviz).
+    """
+)
+
+
+GLOBAL_OPT_MEMPROFILE = _(
+    """
+    Write peak memory, and top allocation sites, per phase, to FILE as JSON.
+    """
+)
+
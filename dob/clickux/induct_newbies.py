@@ -23,6 +23,7 @@ from dob_bright.crud.fact_dressed import FactDressed
 from dob_bright.termio import click_echo, dob_in_user_exit, echo_block_header
 
 from .. import __arg0name__, migrate
+from ..instrument.timeline import timeline_phase
 
 __all__ = (
     'induct_newbies',
@@ -42,9 +43,10 @@ def backend_integrity(func):
     """
 
     def wrapper(ctx, controller, *args, **kwargs):
-        version_must_be_latest(controller)
-        time_must_be_gapless(controller)
-        func(ctx, controller, *args, **kwargs)
+        with timeline_phase('integrity'):
+            version_must_be_latest(controller)
+            time_must_be_gapless(controller)
+        return func(ctx, controller, *args, **kwargs)
 
     # ***
 
@@ -100,7 +102,7 @@ def insist_germinated(func):
 
     def wrapper(ctx, controller, *args, **kwargs):
         controller.insist_germinated(fact_cls=FactDressed)
-        func(ctx, controller, *args, **kwargs)
+        return func(ctx, controller, *args, **kwargs)
 
     return wrapper
 
@@ -111,7 +113,7 @@ def induct_newbies(func):
     @insist_germinated
     @backend_integrity
     def wrapper(*args, **kwargs):
-        func(*args, **kwargs)
+        return func(*args, **kwargs)
 
     return update_wrapper(wrapper, func)
 
@@ -20,6 +20,7 @@
 from functools import update_wrapper
 import glob
 import os
+import time
 
 from gettext import gettext as _
 
@@ -29,6 +30,8 @@ from dob_bright.config.app_dirs import AppDirs
 from dob_bright.termio import dob_in_user_warning
 
 from ..helpers.path import compile_and_eval_source
+from ..instrument.plugins import PLUGIN_COSTS, plugin_name
+from ..instrument.timeline import timed_phase
 
 __all__ = (
     'ensure_plugged_in',
@@ -86,6 +89,7 @@ class ClickPluginGroup(click.Group):
         # yet, so any user plugin config was previously ignored).
         controller.replay_config()
 
+    @timed_phase('plugins')
     def get_commands_from_plugins(self, ctx, name):
         cmds = set()
         for py_path in self.plugin_paths:
@@ -109,7 +113,12 @@ class ClickPluginGroup(click.Group):
         #       (Or anything else!)
         # NOTE: This source *should* be trusted -- the user had to run
         #       `dob plugin install` to wire it. At least I think so. -lb.
+        began = time.time()
         eval_globals = compile_and_eval_source(py_path)
+        # On error, compile_and_eval_source warns, and returns no globals.
+        PLUGIN_COSTS.record(
+            plugin_name(py_path), 'load', time.time() - began, failed=not eval_globals,
+        )
         cmds = self.probe_source_for_commands(eval_globals, name)
         return cmds
 
@@ -17,6 +17,10 @@
 
 from functools import update_wrapper
 
+from ..facts.echo_fact import find_ongoing_fact
+from ..spool import spool_post_process
+from ..store.changes import compact_fact_changes
+
 __all__ = (
     'post_processor',
 )
@@ -35,7 +39,15 @@ def post_processor(func):
         #   ctx.parent.command is <ClickAliasableBunchyPluginGroup run>.
         ctx.parent.command.ensure_plugged_in(controller)
         facts = func(ctx, controller, *args, **kwargs)
-        controller.post_process(controller, facts, show_plugin_error=None)
+        if controller.config['post_process.spool']:
+            # Leave the post-processors to a background worker.
+            spool_post_process(controller, facts, command=ctx.command.name)
+        else:
+            controller.post_process(controller, facts, show_plugin_error=None)
+        # The command might have started, stopped, or changed the active Fact.
+        find_ongoing_fact(controller)
+        if facts:
+            compact_fact_changes(controller)
 
     return update_wrapper(wrapper, func)
 
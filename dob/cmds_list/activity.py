@@ -17,12 +17,16 @@
 
 from gettext import gettext as _
 
-from dob_bright.reports.render_results import render_results
+import lazy_import
 
 from ..clickux.query_assist import error_exit_no_results
 
 __all__ = ('list_activities', )
 
+render_results = lazy_import.lazy_callable('dob.reports.render_results.render_results')
+# Loads SQLAlchemy, which is only needed once the store is queried.
+eager_loading = lazy_import.lazy_callable('dob.store.eager.eager_loading')
+
 
 def list_activities(
     controller,
@@ -42,7 +46,9 @@ def list_activities(
     """
     err_context = _('activities')
 
-    results = controller.activities.get_all(**kwargs)
+    # Each Activity's Category is read below, so load them all up front.
+    with eager_loading(controller):
+        results = controller.activities.get_all(**kwargs)
 
     results or error_exit_no_results(err_context)
 
@@ -17,12 +17,14 @@
 
 from gettext import gettext as _
 
-from dob_bright.reports.render_results import render_results
+import lazy_import
 
 from ..clickux.query_assist import error_exit_no_results
 
 __all__ = ('list_categories', )
 
+render_results = lazy_import.lazy_callable('dob.reports.render_results.render_results')
+
 
 def list_categories(
     controller,
@@ -18,11 +18,13 @@
 from gettext import gettext as _
 
 import sys
+from itertools import chain
+
+import lazy_import
 from inflector import English, Inflector
 
 from nark.managers.query_terms import QueryTerms
 
-from dob_bright.reports.render_results import render_results
 from dob_bright.termio import (
     click_echo,
     dob_in_user_exit,
@@ -32,11 +34,44 @@ from dob_bright.termio import (
 
 from ..clickux.cmd_options_search import cmd_options_output_format_facts_only
 from ..clickux.query_assist import error_exit_no_results
+from ..instrument.timeline import timeline_phase
 
 __all__ = (
     'list_facts',
 )
 
+# The report renderer (and SQLAlchemy) load only when there are results to show.
+render_results = lazy_import.lazy_callable('dob.reports.render_results.render_results')
+# Loads SQLAlchemy, which is only needed once the store is queried.
+eager_loading = lazy_import.lazy_callable('dob.store.eager.eager_loading')
+fact_rows_supported = lazy_import.lazy_callable(
+    'dob.store.projection.fact_rows_supported'
+)
+gather_fact_rows = lazy_import.lazy_callable('dob.store.projection.gather_fact_rows')
+fact_spans = lazy_import.lazy_callable('dob.store.spans.fact_spans')
+interning = lazy_import.lazy_callable('dob.store.interning.interning')
+prepare_fact_query = lazy_import.lazy_callable('dob.store.streaming.prepare_fact_query')
+stream_fact_results = lazy_import.lazy_callable(
+    'dob.store.streaming.stream_fact_results'
+)
+stream_fact_rows = lazy_import.lazy_callable('dob.store.streaming.stream_fact_rows')
+# The streamed Journal loads the report renderer (and SQLAlchemy), too.
+JournalScale = lazy_import.lazy_callable('dob.cmds_list.journal.JournalScale')
+journal_scaled = lazy_import.lazy_callable('dob.cmds_list.journal.journal_scaled')
+journal_streams = lazy_import.lazy_callable('dob.cmds_list.journal.journal_streams')
+write_journal_stream = lazy_import.lazy_callable(
+    'dob.cmds_list.journal.write_journal_stream'
+)
+# The 'fast' table, likewise.
+fast_table_streams = lazy_import.lazy_callable(
+    'dob.reports.render_results.fast_table_streams'
+)
+write_fast_table_stream = lazy_import.lazy_callable(
+    'dob.reports.render_results.write_fast_table_stream'
+)
+select_top_k = lazy_import.lazy_callable('dob.store.top_k.select_top_k')
+top_k_sort_keys = lazy_import.lazy_callable('dob.store.top_k.top_k_sort_keys')
+
 
 def list_facts(
     controller,
@@ -91,11 +126,24 @@ def list_facts(
         #   after find_facts returns. Which means the code does unnecessary processing,
         #   and the user has to wait a little longer until they're told they're wrong.
         qt = prepare_query_terms(*args, **kwargs)
-        results = find_facts(controller, query_terms=qt)
+        if journal_streams(qt, output_format, re_sort):
+            return stream_journal(qt)
+        if fast_table_streams(
+            controller, qt, output_format, table_type, column, re_sort,
+        ):
+            return stream_fast_table(qt)
+        top_k = lift_top_k_limit(qt)
+        with timeline_phase('query'), fact_spans(controller):
+            with eager_loading(controller), interning():
+                if top_k is None:
+                    results = find_facts(controller, query_terms=qt)
+                else:
+                    results = find_top_k_facts(qt, top_k)
         if not results:
             error_exit_no_results(_('facts'))
         n_total = len(results)
-        n_written = display_results(results, qt, output_path)
+        with timeline_phase('render'):
+            n_written = display_results(results, qt, output_path)
         report_report_written(controller, output_path, n_total, n_written)
 
     # ***
@@ -166,6 +214,32 @@ def list_facts(
 
     # ***
 
+    # If the results must be sorted after the query (see dob.store.top_k),
+    # the SQL LIMIT would apply before the sort, so pick the top K ourselves.
+    def lift_top_k_limit(qt):
+        if not qt.limit or qt.limit < 0:
+            return None
+
+        sort_keys = top_k_sort_keys(qt, output_format)
+        if sort_keys is None:
+            return None
+
+        top_k = (sort_keys, qt.limit, qt.offset)
+        qt.limit = None
+        qt.offset = None
+        return top_k
+
+    def find_top_k_facts(qt, top_k):
+        # Stream the results into the top K heap, rather than have get_all
+        # read every group into a list first. Each group is still read and
+        # hydrated, but only the best K are held at once.
+        query = prepare_query(qt)
+        results = stream_fact_results(controller, query, qt)
+        sort_keys, qt.limit, qt.offset = top_k
+        return select_top_k(results, sort_keys, qt.limit, qt.offset)
+
+    # ***
+
     def find_facts(controller, **kwargs):
         """
         Search for one or more facts, given a set of search criteria and sort options.
@@ -177,9 +251,13 @@ def list_facts(
 
         Returns:
             A list of matching Facts, or matching (Fact, *statistics) tuples,
-            depending on the QueryTerms.
+            depending on the QueryTerms. Or, if the report only reads Fact
+            fields, a list of lightweight, read-only FactRows.
         """
         try:
+            qt = kwargs['query_terms']
+            if fact_rows_supported(controller, qt, output_format):
+                return gather_fact_rows(controller, qt, with_tags=report_shows_tags())
             return controller.facts.get_all(**kwargs)
         except Exception as err:
             # - NotImplementedError happens if db.engine != 'sqlite', because
@@ -187,6 +265,87 @@ def list_facts(
             # - ParserInvalidDatetimeException happens on bad since or until.
             dob_in_user_exit(str(err))
 
+    def report_shows_tags():
+        # Of the formats that support FactRows, only the table shows Tags.
+        return output_format == 'table' and (not column or 'tags' in column)
+
+    # ***
+
+    # The `dob report` Journal is written a day at a time, as the results
+    # stream from the query, rather than after reading all the results.
+    def stream_journal(qt):
+        row_limit = suss_row_limit(qt)
+        with fact_spans(controller), eager_loading(controller), interning():
+            with timeline_phase('query'):
+                query = prepare_query(qt)
+                scale = prepare_journal_scale(query, row_limit)
+                results = stream_fact_results(controller, query, qt)
+                first_result = next(results, None)
+            if first_result is None:
+                error_exit_no_results(_('facts'))
+            with timeline_phase('render'):
+                n_total, n_written = write_journal_stream(
+                    controller,
+                    chain((first_result,), results),
+                    qt,
+                    scale=scale,
+                    show_usage=show_usage,
+                    show_duration=show_duration,
+                    hide_description=hide_description,
+                    custom_columns=column,
+                    row_limit=row_limit,
+                    output_path=output_path,
+                    spark_total=spark_total,
+                    spark_width=spark_width,
+                    spark_secs=spark_secs,
+                    show_totals=show_totals,
+                )
+        report_report_written(controller, output_path, n_total, n_written)
+
+    def prepare_query(qt):
+        try:
+            return prepare_fact_query(controller, qt)
+        except Exception as err:
+            # See find_facts: E.g., NotImplementedError, or bad since or until.
+            dob_in_user_exit(str(err))
+
+    def prepare_journal_scale(query, row_limit):
+        if not journal_scaled(column):
+            return None
+        return JournalScale(query, row_limit)
+
+    # The 'fast' table is written a batch of rows at a time, as the results
+    # stream from the query, rather than after reading all the results.
+    def stream_fast_table(qt):
+        row_limit = suss_row_limit(qt)
+        with fact_spans(controller), interning():
+            with timeline_phase('query'):
+                results = prepare_fast_table_rows(qt)
+                first_result = next(results, None)
+            if first_result is None:
+                error_exit_no_results(_('facts'))
+            with timeline_phase('render'):
+                n_total, n_written = write_fast_table_stream(
+                    controller,
+                    chain((first_result,), results),
+                    qt,
+                    show_usage=show_usage,
+                    show_duration=show_duration,
+                    hide_description=hide_description,
+                    custom_columns=column,
+                    max_width=max_width,
+                    row_limit=row_limit,
+                    output_path=output_path,
+                )
+        report_report_written(controller, output_path, n_total, n_written)
+
+    def prepare_fast_table_rows(qt):
+        try:
+            return stream_fact_rows(controller, qt, with_tags=report_shows_tags())
+        except Exception as err:
+            # See find_facts: E.g., bad since or until.
+            dob_in_user_exit(str(err))
+
     # ***
 
     def display_results(results, qt, output_path):
@@ -0,0 +1,396 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Streamed Journal reports, written a batch of days at a time.
+
+The ``dob report`` Journal groups its results by day (and by Activity and
+Category), and sorts them by day first. So rather than hydrate and tabulate
+every result before writing the first line, ``write_journal_stream`` reads
+the results as they stream from the query (see ``dob.store.streaming``),
+and tabulates and writes a batch of whole days at a time, holding only the
+one batch's results, and the running totals.
+
+The sparkline scale (the longest, or the net, duration) and the column the
+durations align on both depend on every result, so the caller first asks
+the database for them (see ``JournalScale``), so that the output is the
+same as when the whole report is tabulated at once.
+"""
+
+from gettext import gettext as _
+
+import copy
+from itertools import groupby, islice
+
+from click_hotoffthehamster._compat import term_len
+from pedantic_timedelta import PedanticTimedelta
+from sqlalchemy import case, func
+
+from nark.backends.sqlalchemy.managers.fact import FactManager
+from nark.helpers.format_time import format_delta
+
+from dob_bright.reports.journal_writer import JournalWriter
+from dob_bright.reports.tabulate_results import tabulate_results
+from dob_bright.termio import dob_in_user_exit
+from dob_bright.termio.paging import ClickEchoPager
+
+from ..store.streaming import STREAM_BATCH_SIZE, fact_durations_query
+from ..store.top_k import sorts_after_query
+
+__all__ = (
+    'JournalScale',
+    'JournalStreamWriter',
+    'journal_scaled',
+    'journal_streams',
+    'query_duration_units',
+    'write_journal_stream',
+    # Private:
+    #  '_JournalTotals',
+)
+
+
+# MAGIC_NUMBER: 86400 seconds/day, as the SQL durations are in (julian)days.
+SECONDS_IN_DAY = 86400.0
+
+# The seconds in each time unit (but seconds) that the Journal's durations
+# might be formatted in, largest first (see PedanticTimedelta).
+DURATION_UNITS_SECONDS = (
+    PedanticTimedelta.SECS_IN_YEAR,
+    PedanticTimedelta.SECS_IN_MONTH,
+    PedanticTimedelta.SECS_IN_DAY,
+    60 * 60,
+    60,
+)
+
+
+def journal_streams(query_terms, output_format, re_sort=False):
+    """Whether the report is a Journal that can be written a day at a time.
+
+    The results must be grouped by day, and sorted by day first, and not
+    need any sorting after the query (which would apply to all the results).
+    """
+    qt = query_terms
+    return (
+        output_format == 'journal'
+        and qt.group_days
+        and bool(qt.sort_cols)
+        and qt.sort_cols[0] == 'day'
+        and not sorts_after_query(qt)
+        and not re_sort
+    )
+
+
+def journal_scaled(custom_columns=None):
+    """Whether the Journal shows the durations or sparklines that JournalScale scales."""
+    if not custom_columns:
+        # The default Journal columns include both.
+        return True
+    return 'duration' in custom_columns or 'sparkline' in custom_columns
+
+
+# ***
+
+def format_journal_duration(duration):
+    """Formats a duration (in days) as the Journal shows it (see tabulate_results)."""
+    return format_delta(
+        (duration or 0) * SECONDS_IN_DAY, style='', field_width=4, precision=1,
+    )
+
+
+def duration_apres_dot(duration_fmtd):
+    """The width of the formatted duration from its decimal point, or -1."""
+    try:
+        return term_len(duration_fmtd) - duration_fmtd.index('.')
+    except ValueError:
+        return -1
+
+
+def query_duration_units(query, row_limit=None):
+    """Returns a query of the sum, and the max, of the results' durations, by unit.
+
+    Args:
+        query: The prepared report query (see ``dob.store.streaming``).
+
+        row_limit (int, optional): The number of results that the report
+            shows, if limited.
+    """
+    durations = fact_durations_query(query)
+    if row_limit and row_limit > 0:
+        # Limit an outer query, lest the report query's own limit be replaced.
+        durations = durations.from_self().limit(row_limit)
+    durations = durations.subquery()
+    duration = func.coalesce(durations.c.duration, 0)
+    # Round like the timedelta that format_journal_duration makes, to the
+    # microsecond, so that, e.g., an hour long Fact is counted as an hour.
+    seconds = func.round(duration * SECONDS_IN_DAY, 6)
+    unit = case(
+        [(seconds >= unit_seconds, unit_seconds)
+         for unit_seconds in DURATION_UNITS_SECONDS],
+        else_=1,
+    )
+    return query.session.query(func.sum(duration), func.max(duration)).group_by(unit)
+
+
+class JournalScale(object):
+    """The sparkline scale and the duration alignment, from every result's duration.
+
+    Each duration's alignment depends on the unit it's formatted in (and if
+    that unit is plural), so the longest duration of each unit aligns them.
+
+    Args:
+        query: The prepared report query (see ``dob.store.streaming``).
+
+        row_limit (int, optional): The number of results that the report
+            shows, if limited.
+    """
+
+    def __init__(self, query, row_limit=None):
+        self.cum_duration = 0
+        self.max_duration = 0
+        self.duration_apres_dot = -1
+        for cum_duration, max_duration in query_duration_units(query, row_limit):
+            self.cum_duration += cum_duration
+            self.max_duration = max(self.max_duration, max_duration)
+            self.duration_apres_dot = max(
+                self.duration_apres_dot,
+                duration_apres_dot(format_journal_duration(max_duration)),
+            )
+
+    def spark_total(self, spark_total):
+        """Resolves the --spark-total 'max' or 'net' to a number of seconds."""
+        if not spark_total or spark_total == 'max':
+            return self.max_duration * SECONDS_IN_DAY
+        elif spark_total == 'net':
+            return self.cum_duration * SECONDS_IN_DAY
+        return spark_total
+
+
+class _JournalTotals(object):
+    """The Journal's TOTAL row, accumulated as each day's results are written."""
+
+    i_cum_duration = FactManager.RESULT_GRP_INDEX['duration']
+    i_group_count = FactManager.RESULT_GRP_INDEX['group_count']
+    i_first_start = FactManager.RESULT_GRP_INDEX['first_start']
+    i_final_end = FactManager.RESULT_GRP_INDEX['final_end']
+
+    def __init__(self, time_now):
+        self.time_now = time_now
+        self.cum_duration = 0
+        self.group_count = 0
+        self.first_start = None
+        self.final_end = None
+        self.tag_freqs = {}
+
+    def update(self, result):
+        fact, *cols = result
+        self.cum_duration += cols[self.i_cum_duration]
+        self.group_count += cols[self.i_group_count]
+        first_start = cols[self.i_first_start]
+        final_end = cols[self.i_final_end] or self.time_now
+        if self.first_start is None:
+            self.first_start = first_start
+            self.final_end = final_end
+        else:
+            self.first_start = min(self.first_start, first_start)
+            self.final_end = max(self.final_end, final_end)
+        for tag in fact.tags:
+            self.tag_freqs[tag.name] = self.tag_freqs.get(tag.name, 0) + tag.freq
+
+    def table_row(self, columns, datetime_format='%Y-%m-%d %H:%M'):
+        # Like tabulate_results, label every cell 'TOTAL' but for the totals.
+        row = {column: _('TOTAL') for column in columns}
+        if 'duration' in row:
+            row['duration'] = format_journal_duration(self.cum_duration)
+        if 'group_count' in row:
+            row['group_count'] = str(self.group_count)
+        if 'first_start' in row:
+            row['first_start'] = self.first_start.strftime(datetime_format)
+        if 'final_end' in row:
+            row['final_end'] = self.final_end.strftime(datetime_format)
+        if 'tags' in row:
+            row['tags'] = ' '.join(sorted(
+                '#{}'.format(name) if freq == 1 else '#{}({})'.format(name, freq)
+                for name, freq in self.tag_freqs.items()
+            ))
+        return row
+
+
+# ***
+
+class JournalStreamWriter(JournalWriter):
+    """A JournalWriter that writes one report in parts, until ``close``.
+
+    The days are sections, with a blank line between each, even between
+    parts, and the ``row_limit`` applies to the whole report.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(JournalStreamWriter, self).__init__(*args, section_nls=True, **kwargs)
+        self.curr_section = None
+        self.n_written = 0
+
+    def write_report_table(self, table, headers, tabulation=None):
+        if self.row_limit > 0:
+            table = islice(table, max(0, self.row_limit - self.n_written))
+        n_written = super(JournalStreamWriter, self).write_report_table(
+            table, headers, tabulation,
+        )
+        self.n_written += n_written
+        return n_written
+
+    def close(self):
+        self._close()
+
+
+def write_journal_stream(
+    controller,
+    results,
+    query_terms,
+    scale=None,
+    show_usage=False,
+    show_duration=False,
+    hide_description=False,
+    custom_columns=None,
+    row_limit=0,
+    output_path=None,
+    spark_total=None,
+    spark_width=None,
+    spark_secs=None,
+    show_totals=False,
+):
+    """Tabulates and writes the results a batch of whole days at a time.
+
+    Args:
+        results (iterable): The results, as nark's ``get_all`` would return
+            them, but as they stream from the query, ordered by day.
+
+        scale (JournalScale): The sparkline scale and the duration alignment,
+            which, if None, are computed from each batch's results (as if each
+            batch were its own report).
+
+        Most of the other arguments are the same as ``render_results``'.
+
+    Returns:
+        tuple: The number of results read, and the number of lines written.
+    """
+    qt = query_terms
+
+    i_start_date = FactManager.RESULT_GRP_INDEX['start_date']
+
+    # Because the results are already in order, and because results_final_sort
+    # logs as it skips its re-sort, give tabulate_results no sort columns.
+    day_qt = copy.copy(qt)
+    day_qt.sort_cols = ()
+
+    totals = _JournalTotals(controller.store.now)
+
+    def _write_journal_stream():
+        writer = journal_writer()
+        n_total = 0
+        tabulation = None
+        for batch_results in results_by_days():
+            n_total += len(batch_results)
+            tabulation = tabulate_batch(batch_results)
+            writer.write_report_table(tabulation.table, None, tabulation)
+            if show_totals:
+                for result in batch_results:
+                    totals.update(result)
+        if show_totals and tabulation is not None:
+            writer.write_report_table(tabulate_totals(tabulation), None, tabulation)
+        writer.close()
+        return n_total, writer.n_written
+
+    # ***
+
+    def journal_writer():
+        writer = JournalStreamWriter()
+        try:
+            writer.output_setup(
+                output_obj=output_path or ClickEchoPager, row_limit=row_limit,
+            )
+        except Exception as err:
+            # I.e., FileNotFoundError, or PermissionError.
+            dob_in_user_exit(str(err))
+        return writer
+
+    def results_by_days():
+        # Like tabulate_results, the row_limit limits the results read.
+        limited = results
+        if row_limit and row_limit > 0:
+            limited = islice(results, row_limit)
+        # Tabulate at least a batch of results at a time, but only whole days.
+        batch_results = []
+        for _start_date, day_results in groupby(limited, key=start_date):
+            batch_results.extend(day_results)
+            if len(batch_results) >= STREAM_BATCH_SIZE:
+                yield batch_results
+                batch_results = []
+        if batch_results:
+            yield batch_results
+
+    def start_date(result):
+        return result[1 + i_start_date]
+
+    # ***
+
+    def tabulate_batch(batch_results):
+        tabulation = tabulate_results(
+            controller,
+            batch_results,
+            query_terms=day_qt,
+            show_usage=show_usage,
+            show_duration=show_duration,
+            show_description=not hide_description,
+            custom_columns=custom_columns,
+            output_format='journal',
+            spark_total=spark_total if scale is None else scale.spark_total(spark_total),
+            spark_width=spark_width,
+            spark_secs=spark_secs,
+        )
+        if scale is not None:
+            tabulation = align_durations(tabulation, scale.duration_apres_dot)
+        return tabulation
+
+    def align_durations(tabulation, apres_dot):
+        # Pad each duration as tabulate_results would have across all the days.
+        if 'duration' not in tabulation.max_widths._fields:
+            return tabulation
+        table = [
+            row._replace(duration=pad_duration(row.duration, apres_dot))
+            for row in tabulation.table
+        ]
+        return tabulation._replace(table=table)
+
+    def pad_duration(duration, apres_dot):
+        if not isinstance(duration, str):
+            return duration
+        padding = apres_dot - duration_apres_dot(duration)
+        if padding <= 0 or '.' not in duration:
+            return duration
+        return duration + ' ' * padding
+
+    def tabulate_totals(tabulation):
+        TableRow = type(tabulation.max_widths)
+        columns = TableRow._fields
+        totals_row = totals.table_row(columns)
+        if scale is not None and 'duration' in totals_row:
+            totals_row['duration'] = pad_duration(
+                totals_row['duration'], scale.duration_apres_dot,
+            )
+        empty_row = {column: '' for column in columns}
+        return [TableRow(**empty_row), TableRow(**totals_row)]
+
+    return _write_journal_stream()
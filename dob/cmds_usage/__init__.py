@@ -19,12 +19,15 @@
 
 from gettext import gettext as _
 
+import lazy_import
 from pedantic_timedelta import PedanticTimedelta
 
-from dob_bright.reports.render_results import render_results
+from ..instrument.timeline import timeline_phase
 
 __all__ = ('generate_usage_table', )
 
+render_results = lazy_import.lazy_callable('dob.reports.render_results.render_results')
+
 
 def generate_usage_table(
     controller,
@@ -99,5 +102,6 @@ def generate_usage_table(
             headers.append(_("Total Time"))
         return headers
 
-    generate_usage_table()
+    with timeline_phase('render'):
+        generate_usage_table()
 
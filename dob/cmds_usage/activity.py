@@ -17,12 +17,19 @@
 
 from gettext import gettext as _
 
+import lazy_import
+
 from ..clickux.query_assist import error_exit_no_results
+from ..instrument.timeline import timeline_phase
 
 from . import generate_usage_table
 
 __all__ = ('usage_activities', )
 
+# Loads SQLAlchemy, which is only needed once the store is queried.
+eager_loading = lazy_import.lazy_callable('dob.store.eager.eager_loading')
+fact_spans = lazy_import.lazy_callable('dob.store.spans.fact_spans')
+
 
 def usage_activities(
     controller,
@@ -32,6 +39,9 @@ def usage_activities(
     table_type='texttable',
     max_width=-1,
     output_path=None,
+    # These two --totals flags are ignored but specified to keep out of kwargs.
+    show_totals=False,
+    hide_totals=False,
     **kwargs
 ):
     """
@@ -46,7 +56,8 @@ def usage_activities(
     def _usage_activities():
         err_context = _('activities')
 
-        results = controller.activities.get_all_by_usage(**kwargs)
+        with timeline_phase('query'), eager_loading(controller), fact_spans(controller):
+            results = controller.activities.get_all_by_usage(**kwargs)
 
         results or error_exit_no_results(err_context)
 
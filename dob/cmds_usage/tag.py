@@ -17,12 +17,18 @@
 
 from gettext import gettext as _
 
+import lazy_import
+
 from ..clickux.query_assist import error_exit_no_results
+from ..instrument.timeline import timeline_phase
 
 from . import generate_usage_table
 
 __all__ = ('usage_tags', )
 
+# Loads SQLAlchemy, which is only needed once the store is queried.
+fact_spans = lazy_import.lazy_callable('dob.store.spans.fact_spans')
+
 
 def usage_tags(
     controller,
@@ -32,6 +38,9 @@ def usage_tags(
     table_type='texttable',
     max_width=-1,
     output_path=None,
+    # These two --totals flags are ignored but specified to keep out of kwargs.
+    show_totals=False,
+    hide_totals=False,
     **kwargs
 ):
     """
@@ -43,7 +52,8 @@ def usage_tags(
     def _usage_tags():
         err_context = _('tags')
 
-        results = controller.tags.get_all_by_usage(**kwargs)
+        with timeline_phase('query'), fact_spans(controller):
+            results = controller.tags.get_all_by_usage(**kwargs)
 
         results or error_exit_no_results(err_context)
 
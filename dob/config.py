@@ -17,6 +17,7 @@
 
 from gettext import gettext as _
 
+import lazy_import
 from click_hotoffthehamster.exceptions import MissingParameter
 
 from config_decorator.key_chained_val import KeyChainedValue
@@ -26,10 +27,10 @@ from config_decorator.key_chained_val import KeyChainedValue
 from nark import config as nark_config  # noqa: F401 '<>' imported but unused
 from dob_bright import config as dob_bright_config  # noqa: F401
 from dob_viewer import config as dob_viewer_config  # noqa: F401
+# And our own.
+from . import settings as dob_settings  # noqa: F401
 
-from dob_bright.crud.interrogate import run_editor_safe
 from dob_bright.termio import click_echo, dob_in_user_exit
-from dob_bright.termio.config_table import echo_config_decorator_table
 
 __all__ = (
     'echo_config_table',
@@ -48,6 +49,15 @@ __all__ = (
     #  'must_be_config_setting',
 )
 
+# The table renderer (which loads SQLAlchemy) and the editor helper are
+# each only needed by one subcommand, so load them on demand.
+echo_config_decorator_table = lazy_import.lazy_callable(
+    'dob_bright.termio.config_table.echo_config_decorator_table'
+)
+run_editor_safe = lazy_import.lazy_callable(
+    'dob_bright.crud.interrogate.run_editor_safe'
+)
+
 
 # *** [DUMP] TABLE
 
@@ -62,6 +72,10 @@ def echo_config_table(
     parts = list(filter(None, (section, keyname)))
     conf_objs = fetch_config_objects(controller, parts)
     include_hidden = section and keyname
+    # The config table is short, and its help reads best wrapped,
+    # so show the 'normal' table for the 'fast' one (dob's own).
+    if table_type == 'fast':
+        table_type = 'texttable'
     echo_config_decorator_table(
         controller,
         conf_objs,
@@ -17,30 +17,139 @@
 
 """A lite wrapper around the dob-bright Controller."""
 
+import lazy_import
+
+from nark.helpers import logging as logging_helpers
+from nark.items.fact import Fact
+
 from dob_bright.controller import Controller
 from dob_bright.styling.apply_styles import pre_apply_style_conf
 
+from .instrument.plugins import PLUGIN_COSTS, plugin_name
+from .instrument.sql import install_query_instrumentation
+from .instrument.timeline import timeline_phase
+from .store.changes import ensure_fact_changes
+from .store.pragmas import install_sqlite_pragmas, sqlite_pragmas
+from .store.versions import ensure_fact_versions, fact_versions
+
 __all__ = (
     'Controller',
 )
 
+# Loads SQLAlchemy, which is only needed once the store is stood up.
+ensure_fact_indices = lazy_import.lazy_callable('dob.store.indices.ensure_fact_indices')
+ensure_fact_spans = lazy_import.lazy_callable('dob.store.spans.ensure_fact_spans')
+install_dob_managers = lazy_import.lazy_callable(
+    'dob.store.managers.install_dob_managers'
+)
+
 
 class DobController(Controller):
     """
-    A custom controller that ensures the style config is ready when needed.
+    A custom controller that ensures the style config is ready when needed,
+    and that the data store has the indices that dob relies upon.
+
+    The data store is made lazily, on first use, so that commands that do
+    not touch the data (e.g., ``dob config``, ``dob styles``, ``dob help``)
+    never load the storage backend or open the database. Likewise, commands
+    that insist on a germinated store only stand it up once they use it.
     """
 
+    _store = None
+    _standup_lazily = False
+    _standup_fact_cls = None
+
     def __init__(self, *args, **kwargs):
-        super(DobController, self).__init__(*args, **kwargs)
+        with timeline_phase('controller'):
+            super(DobController, self).__init__(*args, **kwargs)
         self.applied_style_conf = False
+        self.verboser = False
 
-    def setup_logging(self, *args, **kwargs):
+    def setup_logging(self, verbose=False, verboser=False):
         self.pre_apply_style_conf()
-        return super(DobController, self).setup_logging(*args, **kwargs)
+        # With -VV, the store also counts the rows each statement fetches.
+        self.verboser = verboser
+        return super(DobController, self).setup_logging(verbose, verboser)
+
+    # *** Lazy store.
 
-    def standup_store(self, *args, **kwargs):
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = super(DobController, self)._get_store()
+            install_dob_managers(self._store)
+            # Before standup, so that the db.sqlite PRAGMAs apply from the
+            # very first connection (which might be the one creating the db).
+            install_sqlite_pragmas(self._store, sqlite_pragmas(self.config))
+            install_query_instrumentation(
+                self._store, self.config, count_rows=self.verboser,
+            )
+        if self._standup_fact_cls is not None:
+            fact_cls = self._standup_fact_cls
+            self._standup_fact_cls = None
+            self.standup_store(fact_cls)
+        return self._store
+
+    @store.setter
+    def store(self, store):
+        self._store = store
+
+    def _get_store(self):
+        # The base class calls this on init, and when the config changes.
+        # Return nothing, so that the store property makes it when needed.
+        return None
+
+    def _sql_logger(self):
+        # The same logger the store would make (see BaseStore.init_logger),
+        # but without making the store.
+        return logging_helpers.set_logger_level(
+            'nark.store', self.config['dev.sql_log_level'],
+        )
+
+    def insist_germinated(self, fact_cls=Fact):
+        self._standup_lazily = True
+        try:
+            super(DobController, self).insist_germinated(fact_cls)
+        finally:
+            self._standup_lazily = False
+
+    def standup_store(self, fact_cls=Fact):
+        if self._standup_lazily:
+            # Defer engine, session, and migrations setup until first use.
+            self._standup_fact_cls = fact_cls
+            return None
         self.pre_apply_style_conf()
-        return super(DobController, self).standup_store(*args, **kwargs)
+        with timeline_phase('store'):
+            created_fresh = super(DobController, self).standup_store(fact_cls)
+            ensure_fact_indices(self.store)
+            ensure_fact_versions(self.store)
+            ensure_fact_changes(self.store)
+            ensure_fact_spans(self.store)
+            # Note the store version before any Facts are read.
+            fact_versions(self.store)
+        return created_fresh
+
+    # *** Timed post-processors.
+
+    def post_process(
+        self,
+        controller,
+        fact_facts_or_true,
+        show_plugin_error=None,
+        carousel_active=False,
+    ):
+        # Like Controller._post_process, but account for each plugin's time.
+        for handler in Controller.POST_PROCESSORS:
+            with PLUGIN_COSTS.timed(plugin_name(handler), 'hook'):
+                handler(
+                    self.ctx,
+                    controller,
+                    fact_facts_or_true,
+                    show_plugin_error=show_plugin_error,
+                    carousel_active=carousel_active,
+                )
+
+    # ***
 
     def pre_apply_style_conf(self):
         if self.applied_style_conf:
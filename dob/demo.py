@@ -24,50 +24,105 @@ import tempfile
 from datetime import timedelta
 from functools import update_wrapper
 
+import lazy_import
+
 from nark.items.activity import Activity
 from nark.items.category import Category
 
 from dob_bright.crud.fact_dressed import FactDressed
+from dob_bright.termio import click_echo, dob_in_user_exit, highlight_value
 
-# We could use the wrapper method and tell it to Carousel:
-#  from .facts.save_confirmed import prompt_and_save_confirmed
-# Or we could just call the Carousel wrapper directly:
-from dob_viewer.traverser.save_confirmer import prompt_and_save_confirmer
+from .bench.generator import FactGenerator, SyntheticFactGenerator
 
 __all__ = (
     'demo_config',
     'demo_dob',
+    'DemoFactGenerator',
     # Private:
     # '_demo_prep'
 )
 
 
+# We could use the wrapper method and tell it to Carousel:
+#  from .facts.save_confirmed import prompt_and_save_confirmed
+# Or we could just call the Carousel wrapper directly.
+# - Either way, load the Carousel (and prompt_toolkit) only when demoing.
+prompt_and_save_confirmer = lazy_import.lazy_callable(
+    'dob_viewer.traverser.save_confirmer.prompt_and_save_confirmer'
+)
+seed_store = lazy_import.lazy_callable('dob.bench.seed.seed_store')
+
+
 def demo_config(func):
     """
     """
-    def wrapper(controller, *args, **kwargs):
-        tmpfile = _demo_prep(controller)
-        func(controller, *args, **kwargs)
+    def wrapper(controller, *args, out_path=None, **kwargs):
+        tmpfile = _demo_prep(controller, db_path=out_path)
+        func(controller, *args, out_path=out_path, **kwargs)
         # The temp. file is removed on exit regardless, but just to be clear:
-        tmpfile.close()
+        if tmpfile is not None:
+            tmpfile.close()
 
     return update_wrapper(wrapper, func)
 
 
 # ***
 
-def demo_dob(controller):
+def demo_dob(controller, seed=0, fact_count=0, out_path=None):
+    """Run the demo, optionally atop lots of generated history.
+
+    If ``out_path`` is set, write the store there and skip the Carousel.
+    """
     def _demo_dob():
-        genator = DemoFactGenerator(controller)
-        demo_facts = []
-        # Save the facts to the temp. db., otherwise Carousel
-        # won't quit on simple 'q', but will prompt user to save.
-        for demo_fact in genator.demo_facts():
-            saved_fact = controller.facts.save(demo_fact)
-            demo_facts.append(saved_fact)
+        demo_facts = seed_demo_store()
+        if out_path:
+            click_echo(
+                _('Seeded {} Facts into {}').format(
+                    fact_count + len(demo_facts), highlight_value(out_path),
+                )
+            )
+            return
 
         prompt_and_save_confirmer(controller, edit_facts=demo_facts, dry=False)
+        remove_demo_store()
 
+    def seed_demo_store():
+        genator = DemoFactGenerator(controller)
+        generators = []
+        if fact_count:
+            generators.append(history_generator(genator))
+        generators.append(genator)
+        # Save the facts to the temp. db., otherwise Carousel
+        # won't quit on simple 'q', but will prompt user to save.
+        # - The demo Facts are inserted last, so they get the last IDs.
+        n_facts = seed_store(controller.config['db.path'], *generators)
+        first_pk = n_facts - genator.fact_count + 1
+        return [controller.facts.get(pk) for pk in range(first_pk, n_facts + 1)]
+
+    def history_generator(genator):
+        # The generated history ends the day before the first demo Fact,
+        # and the final demo Fact is the active one.
+        first_demo_start = min(fact.start for fact in genator.demo_facts())
+        history = SyntheticFactGenerator(
+            seed=seed,
+            fact_count=fact_count,
+            ongoing=False,
+            anchor_time=first_demo_start - timedelta(days=1),
+        )
+        try:
+            _first_start, last_time = history.time_span()
+        except OverflowError:
+            # Walking that far back from the demo Facts passed year 1.
+            last_time = None
+        if last_time is None or last_time >= first_demo_start:
+            dob_in_user_exit(
+                _('Cannot fit {} Facts of history before the demo Facts').format(
+                    fact_count,
+                )
+            )
+        return history
+
+    def remove_demo_store():
         # Remove the temporary file that _demo_prep created, that we could
         # not let tempfile delete on garbage collection, because Windows.
         # Note that SQLAlchemy's db reference causes Windows to complain
@@ -81,9 +136,10 @@ def demo_dob(controller):
     return _demo_dob()
 
 
-class DemoFactGenerator(object):
+class DemoFactGenerator(FactGenerator):
     """"""
-    def __init__(self, controller):
+    def __init__(self, controller, seed=0):
+        super(DemoFactGenerator, self).__init__(seed=seed)
         self.controller = controller
         self.create_actegories()
         self.populate_facts()
@@ -116,6 +172,14 @@ class DemoFactGenerator(object):
         for demo_fact in self._demo_facts:
             yield demo_fact
 
+    def generate_facts(self):
+        for synthetic_fact in self._synthetic_facts:
+            yield synthetic_fact
+
+    @property
+    def fact_count(self):
+        return len(self._demo_facts)
+
     def populate_facts(self):
         self._demo_facts = []
         prev_fact = None
@@ -123,6 +187,10 @@ class DemoFactGenerator(object):
             demo_fact = getattr(self, name)(prev_fact)
             self._demo_facts.append(demo_fact)
             prev_fact = demo_fact
+        # Intern the names now, so they're ready before the Facts are generated.
+        self._synthetic_facts = [
+            self.synthesize_fact(demo_fact) for demo_fact in self._demo_facts
+        ]
 
     # ***
 
@@ -722,15 +790,25 @@ Happy dobbin!
 
 # ***
 
-def _demo_prep(controller):
+def _demo_prep(controller, db_path=None):
     """"""
 
     def __demo_prep():
-        tmpfile = create_temporary_file()
-        demoize_config(db_path=tmpfile.name)
+        tmpfile = None
+        if db_path:
+            must_not_exist()
+        else:
+            tmpfile = create_temporary_file()
+        demoize_config(db_path=db_path or tmpfile.name)
         controller.standup_store(fact_cls=FactDressed)
         return tmpfile
 
+    def must_not_exist():
+        if os.path.exists(db_path):
+            dob_in_user_exit(
+                _('Refusing to overwrite existing file: {}').format(db_path)
+            )
+
     def create_temporary_file():
         # (lb): Windows does not allow NamedTemporaryFile to be opened twice,
         # so close here, without allowing it to be deleted, and then the store
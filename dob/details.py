@@ -26,6 +26,8 @@ from dob_bright.config.app_dirs import AppDirs
 from dob_bright.termio import ascii_art, attr, click_echo, fg, highlight_value
 
 from .clickux.plugin_group import ClickPluginGroup
+from .instrument.plugins import echo_plugin_costs
+from .store.pragmas import query_sqlite_pragmas, sqlite_pragmas
 
 from . import get_version, __package_name__
 
@@ -43,8 +45,10 @@ def echo_app_details(controller, full=False):
         echo_name_version()
         echo_config_path()
         echo_plugins_basepath()
+        echo_plugins_costs()
         echo_logfile_path()
         echo_db_info()
+        echo_db_pragmas()
         echo_app_dirs()
 
     def echo_name_version():
@@ -70,6 +74,11 @@ def echo_app_details(controller, full=False):
             highlight_value(ClickPluginGroup().plugins_basepath),
         ))
 
+    def echo_plugins_costs():
+        if not full:
+            return
+        echo_plugin_costs(controller)
+
     def echo_logfile_path():
         click_echo(_(
             "Logfile stored at: {}"
@@ -124,6 +133,30 @@ def echo_app_details(controller, full=False):
 
         return _get_sqlalchemy_info()
 
+    def echo_db_pragmas():
+        if controller.config['db.engine'] != 'sqlite':
+            return
+        configured = sqlite_pragmas(controller.config)
+        click_echo(_(
+            "SQLite PRAGMAs configured: {}"
+        ).format(format_pragmas(configured) or highlight_value(_('(defaults)'))))
+        if not full or not os.path.exists(controller.config['db.path']):
+            # Do not make a new database just to report on it.
+            return
+        click_echo(_(
+            "SQLite PRAGMAs in effect: {}"
+        ).format(format_pragmas(query_sqlite_pragmas(standup_store()))))
+
+    def standup_store():
+        controller.standup_store()
+        return controller.store
+
+    def format_pragmas(pragmas):
+        return ', '.join(
+            '{}={}'.format(name, highlight_value(value))
+            for name, value in pragmas.items()
+        )
+
     def echo_app_dirs():
         if not full:
             return
@@ -17,12 +17,6 @@
 
 """A time tracker for the command line. Utilizing the power of hamster! [nark]."""
 
-# BREADCRUMB: PROFILING
-from nark.helpers.dev.profiling import profile_elapsed
-# BREADCRUMB: PROFILING
-# E402 module level import not at top of file
-profile_elapsed('To dob:   _top')  # noqa: E402
-
 from gettext import gettext as _
 
 import os
@@ -31,32 +25,13 @@ import sys
 from functools import update_wrapper
 
 import click_hotoffthehamster as click
+import lazy_import
 
 from dob_bright.crud.fact_dressed import FactDressed
-from dob_bright.styling.ignore_cmds import (
-    create_ignore_conf,
-    echo_ignore_sections,
-    echo_ignore_table,
-    edit_ignore_file
-)
-from dob_bright.styling.rules_cmds import (
-    create_rules_conf,
-    echo_rules_conf,
-    echo_rule_names,
-    echo_rules_table,
-    edit_rules_conf
-)
-from dob_bright.styling.styles_cmds import (
-    create_styles_conf,
-    echo_styles_conf,
-    echo_styles_list,
-    echo_styles_table,
-    edit_styles_conf
-)
 from dob_bright.termio.echoes import click_echo
 from dob_bright.termio.errors import dob_in_user_exit
-from dob_bright.termio.paging import flush_pager
 
+from .bench import BENCH_CASES, BENCH_SIZES
 from .clickux import help_strings
 from .clickux import help_string_add_fact
 from .clickux.add_fact_help_group import ClickAddFactHelpGroup
@@ -116,15 +91,30 @@ from .demo import demo_config, demo_dob
 from .details import echo_app_details, echo_app_environs, echo_data_stats
 from .facts.add_fact import add_fact
 from .facts.cancel_fact import cancel_fact
-from .facts.echo_fact import echo_latest_ended, echo_ongoing_fact, echo_ongoing_or_ended
+from .facts.echo_fact import (
+    echo_latest_ended,
+    echo_ongoing_fact,
+    echo_ongoing_or_ended,
+    find_ongoing_fact,
+    watch_ongoing_fact
+)
 from .facts.edit_fact import edit_fact_by_pk
 from .facts.import_facts import import_facts
+from .instrument.timeline import PHASE_TIMELINE, flush_pager
+from .store.changes import echo_fact_changes
 from .migrate import control as migrate_control
 from .migrate import downgrade as migrate_downgrade
 from .migrate import upgrade as migrate_upgrade
 from .migrate import upgrade_legacy_database_file
 from .migrate import version as migrate_version
 from .run_cli import dob_versions, pass_controller, pass_controller_context, run
+from .spool import drain_spool, echo_spool, requeue_failed
+
+# The styles, rules, and ignore commands pull in prompt_toolkit and the editor
+# package, among others, which most commands never use, so load them on demand.
+ignore_cmds = lazy_import.lazy_module('dob_bright.styling.ignore_cmds')
+rules_cmds = lazy_import.lazy_module('dob_bright.styling.rules_cmds')
+styles_cmds = lazy_import.lazy_module('dob_bright.styling.styles_cmds')
 
 # __all__ = ( ... )  # So many. Too tedious to list.
 
@@ -244,17 +234,99 @@ def environs(controller):
 # ***
 
 @cmd_bunch_group_get_meta
-@run.command(help=help_strings.DEBUG_HELP, hidden=True)
+@run.group(
+    'debug',
+    help=help_strings.DEBUG_HELP,
+    hidden=True,
+    cls=ClickAliasableBunchyPluginGroup,
+    invoke_without_command=True,
+)
 @show_help_finally
 @flush_pager
-@pass_controller
-def debug(controller):
-    """Break!"""
+@pass_controller_context
+def debug_group(ctx, controller):
+    """Break! Unless running a debug subcommand."""
+    if ctx.invoked_subcommand is not None:
+        return
     import pdb
     pdb.set_trace()
     pass
 
 
+# *** [DEBUG] BENCH
+
+@debug_group.command('bench', help=help_strings.DEBUG_BENCH_HELP)
+@show_help_finally
+@flush_pager
+@click.option('-n', '--size', 'sizes', type=int, multiple=True,
+              help=help_strings.DEBUG_BENCH_SIZE_HELP)
+@click.option('-c', '--case', 'cases', type=click.Choice(BENCH_CASES), multiple=True,
+              help=help_strings.DEBUG_BENCH_CASE_HELP)
+@click.option('-r', '--repeat', type=int, default=3, show_default=True,
+              help=help_strings.DEBUG_BENCH_REPEAT_HELP)
+@click.option('-s', '--seed', type=int, default=0, show_default=True,
+              help=help_strings.DEBUG_BENCH_SEED_HELP)
+@click.option('-w', '--workdir', type=click.Path(file_okay=False),
+              help=help_strings.DEBUG_BENCH_WORKDIR_HELP)
+@click.option('-o', '--output', type=click.Path(dir_okay=False),
+              default='dob-bench.json', show_default=True,
+              help=help_strings.DEBUG_BENCH_OUTPUT_HELP)
+@click.option('-m', '--memory', is_flag=True,
+              help=help_strings.DEBUG_BENCH_MEMORY_HELP)
+@pass_controller
+def debug_bench(controller, sizes, cases, repeat, seed, workdir, output, memory):
+    """Time common commands against synthetic stores of various sizes."""
+    # Only load the generator (and SQLAlchemy Core tables) when benchmarking.
+    from .bench.runner import run_benchmarks
+    run_benchmarks(
+        sizes=sizes or (BENCH_SIZES[0],),
+        cases=cases or BENCH_CASES,
+        repeat=repeat,
+        seed=seed,
+        workdir=workdir,
+        output_path=output,
+        memory=memory,
+    )
+
+
+# *** [DEBUG] IMPORT-TIME
+
+@debug_group.command('import-time', help=help_strings.DEBUG_IMPORT_TIME_HELP)
+@show_help_finally
+@flush_pager
+@click.option('-t', '--top', type=int, default=20, show_default=True,
+              help=help_strings.DEBUG_IMPORT_TIME_TOP_HELP)
+@click.option('-m', '--module', default='dob.dob', show_default=True,
+              help=help_strings.DEBUG_IMPORT_TIME_MODULE_HELP)
+@pass_controller
+def debug_import_time(controller, top, module):
+    """Report what it costs to import dob, and which heavy modules it loads."""
+    from .instrument.imports import echo_import_times
+    echo_import_times(module=module, top=top)
+
+
+# *** [DEBUG] SPOOL
+
+@debug_group.command('spool', help=help_strings.DEBUG_SPOOL_HELP)
+@show_help_finally
+@flush_pager
+@click.option('-d', '--drain', is_flag=True,
+              help=help_strings.DEBUG_SPOOL_DRAIN_HELP)
+@click.option('-r', '--requeue', is_flag=True,
+              help=help_strings.DEBUG_SPOOL_REQUEUE_HELP)
+@pass_controller_context
+def debug_spool(ctx, controller, drain, requeue):
+    """Show (or drain) the spooled post-processing."""
+    if requeue:
+        requeue_failed()
+    if drain:
+        # Load the plugins, which register the post-processors.
+        ctx.find_root().command.ensure_plugged_in(controller)
+        controller.insist_germinated(fact_cls=FactDressed)
+        drain_spool(controller)
+    echo_spool(controller)
+
+
 # ***
 # *** [DEMO] Command.
 # ***
@@ -263,11 +335,17 @@ def debug(controller):
 @run.command('demo', help=help_strings.DEMO_HELP)
 @show_help_finally
 @flush_pager
+@click.option('--seed', type=int, default=0, show_default=True,
+              help=help_strings.DEMO_SEED_HELP)
+@click.option('--facts', 'fact_count', type=int, default=0,
+              help=help_strings.DEMO_FACTS_HELP)
+@click.option('--out', 'out_path', type=click.Path(dir_okay=False),
+              help=help_strings.DEMO_OUT_HELP)
 @pass_controller
 @demo_config
-def demo_dob_and_nark(controller):
+def demo_dob_and_nark(controller, seed, fact_count, out_path):
     """"""
-    demo_dob(controller)
+    demo_dob(controller, seed=seed, fact_count=fact_count, out_path=out_path)
 
 
 # ***
@@ -422,7 +500,7 @@ def styles_group(ctx):
 @ensure_plugged_in
 def styles_create(ctx, controller, name, force):
     """"""
-    create_styles_conf(controller, name, force)
+    styles_cmds.create_styles_conf(controller, name, force)
 
 
 # *** [STYLES] CONF
@@ -440,7 +518,7 @@ def styles_create(ctx, controller, name, force):
 @ensure_plugged_in
 def styles_conf(ctx, controller, name, internal, complete):
     """"""
-    echo_styles_conf(controller, name, internal, complete)
+    styles_cmds.echo_styles_conf(controller, name, internal, complete)
 
 
 # *** [STYLES] EDIT
@@ -452,7 +530,7 @@ def styles_conf(ctx, controller, name, internal, complete):
 @ensure_plugged_in
 def styles_edit(ctx, controller):
     """"""
-    edit_styles_conf(controller)
+    styles_cmds.edit_styles_conf(controller)
 
 
 # *** [STYLES] LIST
@@ -465,7 +543,7 @@ def styles_edit(ctx, controller):
 @ensure_plugged_in
 def styles_list(ctx, controller, internal):
     """"""
-    echo_styles_list(controller, internal)
+    styles_cmds.echo_styles_list(controller, internal)
 
 
 # *** [STYLES] SHOW
@@ -480,7 +558,7 @@ def styles_list(ctx, controller, internal):
 def styles_show(ctx, controller, name, **kwargs):
     """"""
     postprocess_options_output_format_any_input(kwargs)
-    echo_styles_table(controller, name, **kwargs)
+    styles_cmds.echo_styles_table(controller, name, **kwargs)
 
 
 # ***
@@ -511,7 +589,7 @@ def rules_group(ctx):
 @ensure_plugged_in
 def rules_create(ctx, controller, force):
     """"""
-    create_rules_conf(controller, force)
+    rules_cmds.create_rules_conf(controller, force)
 
 
 # *** [RULES] CONF
@@ -528,7 +606,7 @@ def rules_create(ctx, controller, force):
 @ensure_plugged_in
 def rules_conf(ctx, controller, name, complete):
     """"""
-    echo_rules_conf(controller, name, complete)
+    rules_cmds.echo_rules_conf(controller, name, complete)
 
 
 # *** [RULES] EDIT
@@ -540,7 +618,7 @@ def rules_conf(ctx, controller, name, complete):
 @ensure_plugged_in
 def rules_edit(ctx, controller):
     """"""
-    edit_rules_conf(controller)
+    rules_cmds.edit_rules_conf(controller)
 
 
 # *** [RULES] LIST
@@ -552,7 +630,7 @@ def rules_edit(ctx, controller):
 @ensure_plugged_in
 def rules_list(ctx, controller):
     """"""
-    echo_rule_names(controller)
+    rules_cmds.echo_rule_names(controller)
 
 
 # *** [RULES] SHOW
@@ -567,7 +645,7 @@ def rules_list(ctx, controller):
 def rules_show(ctx, controller, name, **kwargs):
     """"""
     postprocess_options_output_format_any_input(kwargs)
-    echo_rules_table(controller, name, **kwargs)
+    rules_cmds.echo_rules_table(controller, name, **kwargs)
 
 
 # ***
@@ -598,7 +676,7 @@ def ignore_group(ctx):
 @ensure_plugged_in
 def ignore_create(ctx, controller, force):
     """"""
-    create_ignore_conf(controller, force)
+    ignore_cmds.create_ignore_conf(controller, force)
 
 
 # *** [IGNORE] EDIT
@@ -610,7 +688,7 @@ def ignore_create(ctx, controller, force):
 @ensure_plugged_in
 def ignore_edit(ctx, controller):
     """"""
-    edit_ignore_file(controller)
+    ignore_cmds.edit_ignore_file(controller)
 
 
 # *** [IGNORE] LIST
@@ -622,7 +700,7 @@ def ignore_edit(ctx, controller):
 @ensure_plugged_in
 def ignore_list(ctx, controller):
     """"""
-    echo_ignore_sections(controller)
+    ignore_cmds.echo_ignore_sections(controller)
 
 
 # *** [IGNORE] SHOW
@@ -637,7 +715,7 @@ def ignore_list(ctx, controller):
 def ignore_show(ctx, controller, name, **kwargs):
     """"""
     postprocess_options_output_format_any_input(kwargs)
-    echo_ignore_table(controller, name, **kwargs)
+    ignore_cmds.echo_ignore_table(controller, name, **kwargs)
 
 
 # ***
@@ -686,6 +764,22 @@ def store_url(controller):
     click_echo(controller.data_store_url)
 
 
+@store_group.command('changes', help=help_strings.STORE_CHANGES_HELP)
+@show_help_finally
+@flush_pager
+@click.option('-s', '--since', type=int, default=0, show_default=True,
+              help=help_strings.STORE_CHANGES_SINCE_HELP)
+@click.option('-f', '--follow', is_flag=True,
+              help=help_strings.STORE_CHANGES_FOLLOW_HELP)
+@click.option('--interval', type=float, default=1.0, show_default=True,
+              help=help_strings.STORE_CHANGES_INTERVAL_HELP)
+@pass_controller_context
+@induct_newbies
+def store_changes(ctx, controller, since, follow, interval):
+    """Stream the Fact change feed as JSON lines."""
+    echo_fact_changes(controller, since=since, follow=follow, interval=interval)
+
+
 @store_group.command('upgrade-legacy', help=help_strings.STORE_UPGRADE_LEGACY_HELP)
 @show_help_finally
 @flush_pager
@@ -960,11 +1054,27 @@ def cancel(ctx, controller, force):
 @run.command('current', help=help_strings.CURRENT_HELP)
 @show_help_finally
 @flush_pager
+@click.option('--cached', is_flag=True, help=help_strings.CURRENT_CACHED_HELP)
+@click.option('--format', 'fmt', metavar='FORMAT', help=help_strings.CURRENT_FORMAT_HELP)
+@click.option('--watch', is_flag=True, help=help_strings.CURRENT_WATCH_HELP)
+@click.option('--interval', type=float, default=1.0, show_default=True,
+              help=help_strings.CURRENT_INTERVAL_HELP)
 @pass_controller_context
-@induct_newbies
-def current(ctx, controller):
+def current(ctx, controller, cached, fmt, watch, interval):
     """Display the active Fact."""
-    echo_ongoing_fact(controller)
+    # The snapshot is only trusted if the database is unchanged since it was
+    # written, so skip the store standup and integrity checks unless stale.
+    @induct_newbies
+    def find_ongoing(ctx, controller):
+        return find_ongoing_fact(controller)
+
+    def find_fact(controller):
+        return find_ongoing(ctx, controller)
+
+    if watch:
+        watch_ongoing_fact(controller, fmt=fmt, interval=interval, find_fact=find_fact)
+    else:
+        echo_ongoing_fact(controller, fmt=fmt, cached=cached, find_fact=find_fact)
 
 
 @cmd_bunch_group_ongoing_fact
@@ -1502,5 +1612,6 @@ def _migrate_version(ctx, controller):
 # About ~ 0.150 is sqlalchemy, which is unavoidable?
 # About ~ 0.005 is loading config.
 # The other half of the time, ~ 0.145, is plugins.
-profile_elapsed('To dob: loaded')
+# - Run `dob --profile - ...` to see the latest numbers.
+PHASE_TIMELINE.record('import', PHASE_TIMELINE.time_0)
 
@@ -19,18 +19,28 @@ import random
 
 from gettext import gettext as _
 
+import lazy_import
+
 from dob_bright.crud.fact_from_factoid import must_create_fact_from_factoid
 from dob_bright.crud.fix_times import mend_fact_timey_wimey
 from dob_bright.termio import dob_in_user_exit
 
-from dob_prompt.prompters.triple_prompter import ask_user_for_edits
+from ..store.contention import retry_write
+from ..store.transaction import single_transaction
 
 from .save_backedup import prompt_and_save_backedup
+from .save_confirmer import echo_facts_saved
+from .simple_prompts import save_facts_maybe
 
 __all__ = (
     'add_fact',
 )
 
+# The prompter loads prompt_toolkit, which is only needed to --edit-meta/-text.
+ask_user_for_edits = lazy_import.lazy_callable(
+    'dob_prompt.prompters.triple_prompter.ask_user_for_edits'
+)
+
 
 # ***
 
@@ -79,6 +89,8 @@ def add_fact(
     def _add_fact():
         new_fact = _create_fact()
         new_fact_or_two, conflicts = _mend_times(new_fact)
+        if _can_save_directly(new_fact_or_two, conflicts):
+            return _save_directly(new_fact_or_two, conflicts)
         edit_facts, orig_facts = _prepare_facts(new_fact_or_two)
         edit_fact = _add_conflicts(conflicts, edit_facts, orig_facts)
         _maybe_prompt_description(edit_fact)
@@ -126,6 +138,36 @@ def add_fact(
             dob_in_user_exit(msg)
         return new_fact_or_two, conflicts
 
+    def _can_save_directly(new_fact_or_two, conflicts):
+        # The common one-off commands, e.g., `dob now`, `dob stop`, and
+        # `dob at`, add at most one new Fact, and might stop the active
+        # Fact. If there's nothing to ask the user, skip the Carousel
+        # and backup file machinery, and just save.
+        if use_carousel or edit_text or edit_meta or dry:
+            return False
+        if len(new_fact_or_two) > 1:
+            return False
+        if any(new_fact.pk is not None for new_fact in new_fact_or_two):
+            return False
+        return all('stopped' in edited.dirty_reasons for edited, _orig in conflicts)
+
+    def _save_directly(new_fact_or_two, conflicts):
+        # Stop the active Fact and add the new one in the same transaction,
+        # and retry the whole transaction if the database is locked. Each
+        # try saves copies of the Facts (see save_fact), so a retry starts
+        # from Facts that the failed try did not change.
+        saved_facts = retry_write(
+            controller, lambda: _save_in_transaction(new_fact_or_two, conflicts),
+        )
+        echo_facts_saved(len(saved_facts))
+        return saved_facts
+
+    def _save_in_transaction(new_fact_or_two, conflicts):
+        with single_transaction(controller.store):
+            return save_facts_maybe(
+                controller, new_fact_or_two, conflicts, ignore_pks=[], dry=False,
+            )
+
     def _prepare_facts(new_fact_or_two):
         edit_facts = []
         orig_facts = []
@@ -19,6 +19,8 @@ from gettext import gettext as _
 
 import click_hotoffthehamster as click
 
+from ..store.contention import retry_write
+
 from .simple_prompts import echo_ongoing_completed
 
 __all__ = (
@@ -37,7 +39,9 @@ def cancel_fact(controller, purge=False):
         KeyErŕor: No active Fact can be found.
     """
     try:
-        fact = controller.facts.cancel_current_fact(purge=purge)
+        fact = retry_write(
+            controller, lambda: controller.facts.cancel_current_fact(purge=purge),
+        )
     except KeyError:
         message = _("Nothing tracked right now. Not doing anything.")
         controller.client_logger.info(message)
@@ -15,27 +15,58 @@
 # You can find the GNU General Public License reprinted in the file titled 'LICENSE',
 # or visit <http://www.gnu.org/licenses/>.
 
+import os
+import time
+
 from gettext import gettext as _
 
 import ansiwrap
 import click_hotoffthehamster as click
+import lazy_import
 from click_hotoffthehamster.formatting import wrap_text
 from click_hotoffthehamster._textwrap import TextWrapper
 
-from dob_bright.termio import attr, click_echo, dob_in_user_exit, fg
+from nark.helpers.format_time import format_delta
+
+from dob_bright.crud.fact_dressed import FactDressed
+from dob_bright.termio import (
+    attr,
+    click_echo,
+    dob_in_user_exit,
+    dob_in_user_warning,
+    fg
+)
 
 from ..clickux.help_strings import NO_ACTIVE_FACT_HELP
+from ..instrument.timeline import timeline_phase
+
+from .status_snapshot import (
+    database_stamp,
+    load_status_snapshot,
+    snapshot_fact,
+    status_snapshot_path,
+    write_status_snapshot
+)
 
 __all__ = (
     'echo_fact',
     'echo_latest_ended',
     'echo_ongoing_fact',
     'echo_ongoing_or_ended',
+    'find_latest_fact',
+    'find_ongoing_fact',
+    'format_fact_status',
+    'watch_ongoing_fact',
     # Private:
     #  'echo_most_recent',
     #  'echo_single_fact',
+    #  'ongoing_fact_text',
+    #  'single_fact_text',
 )
 
+# The keyset queries load SQLAlchemy, which the store loads anyway once used.
+fact_keyset_latest = lazy_import.lazy_callable('dob.store.keyset.fact_keyset_latest')
+
 
 # ***
 
@@ -59,21 +90,78 @@ def echo_latest_ended(controller):
     echo_most_recent(controller, restrict='ended')
 
 
-def echo_ongoing_fact(controller):
+def echo_ongoing_fact(controller, fmt=None, cached=False, find_fact=None):
     """
-    Return current active Fact.
+    Print the current active Fact.
+
+    If cached, answer from the status snapshot, unless it's missing or stale,
+    in which case call find_fact (which defaults to find_ongoing_fact) to
+    query the store (which also writes a new snapshot).
+
+    If fmt, format the Fact using the format_fact_status fields.
 
     Returns:
         None: If everything went alright.
 
     Raises:
-        click.ClickException: If we fail to fetch any active Fact.
+        SystemExit: If there is no active Fact.
     """
-    echo_most_recent(
-        controller,
-        restrict='ongoing',
-        empty_msg=NO_ACTIVE_FACT_HELP(controller.ctx),
-    )
+    find_fact = find_fact or find_ongoing_fact
+    snapshot = load_status_snapshot(controller) if cached else None
+    if snapshot is not None:
+        fact = snapshot_fact(snapshot, FactDressed)
+    else:
+        fact = find_fact(controller)
+    if fact is None:
+        dob_in_user_exit(NO_ACTIVE_FACT_HELP(controller.ctx))
+    with timeline_phase('render'):
+        click_echo(ongoing_fact_text(controller, fact, fmt))
+
+
+def watch_ongoing_fact(controller, fmt=None, interval=1.0, find_fact=None):
+    """Print the active Fact, and print it again whenever it changes.
+
+    Rather than query the store every interval, watch the status snapshot
+    and the database file, and only re-render when either changes.
+    """
+    find_fact = find_fact or find_ongoing_fact
+
+    def _watch_ongoing_fact():
+        last_key = None
+        last_text = None
+        try:
+            while True:
+                key = watch_key()
+                # If the store cannot be stamped (e.g., it's not a SQLite
+                # file), there is no snapshot, so query every interval.
+                if key != last_key or key[1] is None:
+                    fact = load_fact()
+                    # Loading might have refreshed the snapshot.
+                    last_key = watch_key()
+                    text = ongoing_fact_text(controller, fact, fmt)
+                    if text != last_text:
+                        click_echo(text)
+                        last_text = text
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def watch_key():
+        path = status_snapshot_path()
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+        snapshot_stamp = (stat.st_mtime_ns, stat.st_size) if stat else None
+        return (snapshot_stamp, database_stamp(controller))
+
+    def load_fact():
+        snapshot = load_status_snapshot(controller)
+        if snapshot is not None:
+            return snapshot_fact(snapshot, FactDressed)
+        return find_fact(controller)
+
+    _watch_ongoing_fact()
 
 
 def echo_ongoing_or_ended(controller):
@@ -81,14 +169,40 @@ def echo_ongoing_or_ended(controller):
 
 
 def echo_most_recent(controller, restrict=None, empty_msg=None):
-    fact = controller.find_latest_fact(restrict=restrict)
+    with timeline_phase('query'):
+        fact = find_latest_fact(controller, restrict=restrict)
     if fact is not None:
-        echo_single_fact(controller, fact)
+        with timeline_phase('render'):
+            echo_single_fact(controller, fact)
     else:
         empty_msg = empty_msg if empty_msg else _('No facts found.')
         dob_in_user_exit(empty_msg)
 
 
+def find_latest_fact(controller, restrict=None):
+    """Return the latest Fact, either 'ended', 'ongoing', or either (None).
+
+    Like ``controller.find_latest_fact``, but rather than have nark sort
+    all Facts (via ``get_all``), seek the (start, id) index. Note that the
+    active Fact, if any, is necessarily the latest Fact, so unrestricted,
+    the latest Fact is just the Fact with the latest start.
+    """
+    try:
+        return fact_keyset_latest(controller, restrict=restrict)
+    except Exception as err:
+        # Unexpected! But mimic the controller, and warn, not die.
+        dob_in_user_warning(str(err))
+        return None
+
+
+def find_ongoing_fact(controller):
+    """Return the active Fact, or None, and update the status snapshot."""
+    with timeline_phase('query'):
+        fact = find_latest_fact(controller, restrict='ongoing')
+    write_status_snapshot(controller, fact)
+    return fact
+
+
 # ***
 
 class AnsiWrapper(TextWrapper):
@@ -101,6 +215,10 @@ class AnsiWrapper(TextWrapper):
 
 
 def echo_single_fact(controller, fact):
+    click_echo(single_fact_text(controller, fact))
+
+
+def single_fact_text(controller, fact):
     colorful = controller.config['term.use_color']
     localize = controller.config['time.tz_aware']
     friendly = fact.friendly_str(
@@ -114,11 +232,43 @@ def echo_single_fact(controller, fact):
     # extends Python's textwrap.TextWrapper, which is not ANSI-aware. So we
     # extent TextWrapper to redirect it to ansiwrap, which is ANSI-couth.
     # FIXME/2019-11-22: (lb): Make this width CONFIGable.
-    wrapped = wrap_text(friendly, width=100, preserve_paragraphs=True, cls=AnsiWrapper)
-    click_echo(wrapped)
+    return wrap_text(friendly, width=100, preserve_paragraphs=True, cls=AnsiWrapper)
 
 
-# ***
+def ongoing_fact_text(controller, fact, fmt=None):
+    if fact is None:
+        return NO_ACTIVE_FACT_HELP(controller.ctx)
+    if fmt:
+        return format_fact_status(fact, fmt)
+    return single_fact_text(controller, fact)
+
+
+def format_fact_status(fact, fmt):
+    """Format the Fact using a Python format string, e.g., ``'{actegory} {hours}'``.
+
+    The fields are: pk, start, activity, category, actegory, tags, description,
+    elapsed (e.g., '1.42 hours'), hours (e.g., '01:25'), and minutes (e.g., '85').
+    """
+    delta = fact.delta()
+    fields = {
+        'pk': fact.pk,
+        'start': fact.start_fmt_local,
+        'activity': fact.activity_name,
+        'category': fact.category_name,
+        'actegory': '{}@{}'.format(fact.activity_name, fact.category_name),
+        'tags': ' '.join('#{}'.format(tag.name) for tag in fact.tags_sorted),
+        'description': fact.description_or_empty,
+        'elapsed': format_delta(delta, style=''),
+        'hours': format_delta(delta, style='%H:%M'),
+        'minutes': format_delta(delta, style='%M'),
+    }
+    try:
+        return fmt.format(**fields)
+    except (KeyError, IndexError, ValueError) as err:
+        dob_in_user_exit(
+            _('Cannot format the Fact using “{}”: {}').format(fmt, str(err))
+        )
+
 
 def write_fact_block_format(fact_f, fact, rule, is_first_fact):
     write_fact_separator(fact_f, rule, is_first_fact)
@@ -18,19 +18,30 @@
 from gettext import gettext as _
 
 import click_hotoffthehamster as click
+import lazy_import
 
 from dob_bright.crud.fact_dressed import FactDressed
-from dob_bright.crud.interrogate import ask_edit_with_editor
 from dob_bright.termio import dob_in_user_exit, dob_in_user_warning
 
-from dob_prompt.prompters.triple_prompter import ask_user_for_edits
-
 from .save_backedup import prompt_and_save_backedup
 from .simple_prompts import mend_facts_confirm_and_save_maybe
 
 __all__ = ('edit_fact_by_pk', )
 
 
+# The interactive editors (prompt_toolkit, and the external editor helper)
+# are costly to load, and only needed when editing interactively.
+ask_edit_with_editor = lazy_import.lazy_callable(
+    'dob_bright.crud.interrogate.ask_edit_with_editor'
+)
+ask_user_for_edits = lazy_import.lazy_callable(
+    'dob_prompt.prompters.triple_prompter.ask_user_for_edits'
+)
+fact_keyset_nth_latest = lazy_import.lazy_callable(
+    'dob.store.keyset.fact_keyset_nth_latest'
+)
+
+
 def edit_fact_by_pk(
     controller,
     key,
@@ -107,15 +118,12 @@ def edit_fact_by_pk(
             )
 
     def fact_from_key_relative(key):
-        offset = -1 - key
-        old_facts = controller.facts.get_all(
-            sort_cols=('start',),
-            sort_orders=('desc',),
-            limit=1,
-            offset=offset,
-            deleted=False,
-        )
-        return old_facts[0] if old_facts else None
+        # Seek the (start, id) index from the latest Fact, rather than
+        # ask get_all to OFFSET, which sorts and skips over every Fact.
+        # - Note that key 0 is treated like -1 (which is how OFFSET -1
+        #   behaved, which SQLite treats as no offset).
+        nth = max(-key, 1)
+        return fact_keyset_nth_latest(controller, nth)
 
     def warn_nothing_found(key):
         if key > 0:
@@ -20,6 +20,7 @@
 from dob_bright.crud.parse_input import parse_input
 from dob_bright.termio.crude_progress import CrudeProgress
 
+from ..instrument.timeline import timeline_phase
 from .save_backedup import prompt_and_save_backedup
 
 
@@ -53,24 +54,26 @@ def import_facts(
     progress = CrudeProgress(enabled=True)
 
     def _import_facts():
-        new_facts = parse_input(
-            controller,
-            file_in=file_in,
-            progress=progress,
-        )
-        saved_facts = prompt_and_save_backedup(
-            controller,
-            edit_facts=new_facts,
-            file_out=file_out,
-            rule=rule,
-            backup=backup,
-            leave_backup=leave_backup,
-            use_carousel=use_carousel,
-            dry=dry,
-            yes=False,
-            progress=progress,
-            **kwargs,
-        )
+        with timeline_phase('hydrate'):
+            new_facts = parse_input(
+                controller,
+                file_in=file_in,
+                progress=progress,
+            )
+        with timeline_phase('write'):
+            saved_facts = prompt_and_save_backedup(
+                controller,
+                edit_facts=new_facts,
+                file_out=file_out,
+                rule=rule,
+                backup=backup,
+                leave_backup=leave_backup,
+                use_carousel=use_carousel,
+                dry=dry,
+                yes=False,
+                progress=progress,
+                **kwargs,
+            )
         return saved_facts
 
     # ***
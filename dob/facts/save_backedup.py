@@ -58,6 +58,7 @@ def prompt_and_save_backedup(
         saved_facts = []
         try:
             backup_callback = write_facts_file(backup_f, rule, dry)
+            backup_facts_upfront(backup_f, dry)
             saved_facts = prompt_and_save_confirmed(
                 controller,
                 rule=rule,
@@ -94,7 +95,7 @@ def prompt_and_save_backedup(
     # ***
 
     def prepare_backup_file(backup):
-        if not backup:
+        if not backup or not backup_needed():
             return None
         backup_path, backup_link = get_import_ephemeral_backup_path()
         log_msg = _("Creating backup at {0}").format(backup_path)
@@ -132,6 +133,12 @@ def prompt_and_save_backedup(
             )
             dob_in_user_warning(msg)
 
+    def backup_needed():
+        # The Carousel rewrites the backup file as the user edits. Otherwise,
+        # back up only when saving many Facts (e.g., on import), in case the
+        # save fails partway through. Saving one Fact needs no backup.
+        return kwargs.get('use_carousel') or len(kwargs.get('edit_facts') or []) > 1
+
     IMPORT_BACKUP_DIR = 'carousel'
 
     def get_import_ephemeral_backup_path():
@@ -185,19 +192,29 @@ def prompt_and_save_backedup(
         def wrapper(carousel):
             if dry or not fact_f:
                 return
-            fact_f.truncate(0)
-            # (lb): truncate doesn't move the pointer (you can peek()), and while
-            # write seems to still work, it feels best to reset the pointer.
-            fact_f.seek(0)
-            for idx, fact in enumerate(carousel.prepared_facts):
-                # The Carousel should only send us facts that need to be
-                # stored, which excludes deleted Facts that were never stored.
+            # The Carousel should only send us facts that need to be
+            # stored, which excludes deleted Facts that were never stored.
+            for fact in carousel.prepared_facts:
                 controller.affirm((not fact.deleted) or (fact.pk > 0))
-                write_fact_block_format(fact_f, fact, rule, is_first_fact=(idx == 0))
-            fact_f.flush()
+            write_facts(fact_f, carousel.prepared_facts, rule)
 
         return wrapper
 
+    def backup_facts_upfront(fact_f, dry):
+        # Without the Carousel, the Facts are final, so back them up now.
+        if dry or not fact_f or kwargs.get('use_carousel'):
+            return
+        write_facts(fact_f, kwargs.get('edit_facts') or [], rule)
+
+    def write_facts(fact_f, facts, rule):
+        fact_f.truncate(0)
+        # (lb): truncate doesn't move the pointer (you can peek()), and while
+        # write seems to still work, it feels best to reset the pointer.
+        fact_f.seek(0)
+        for idx, fact in enumerate(facts):
+            write_fact_block_format(fact_f, fact, rule, is_first_fact=(idx == 0))
+        fact_f.flush()
+
     # ***
 
     return _prompt_and_save()
@@ -19,11 +19,16 @@ from gettext import gettext as _
 
 import sys
 
+import lazy_import
+
+from ..store.versions import fact_version_guard
 
 __all__ = (
     'prompt_and_save_confirmed',
 )
 
+fact_window_cache = lazy_import.lazy_callable('dob.store.window_cache.fact_window_cache')
+
 
 # ***
 
@@ -70,14 +75,17 @@ def prompt_and_save_confirmed(
     def launch_carousel():
         # Not just lazy loading, but allows test_save_backedup to mock away.
         from dob_viewer.traverser.save_confirmer import prompt_and_save_confirmer
-        prompt_and_save_confirmer(
-            controller,
-            edit_facts=edit_facts,
-            orig_facts=orig_facts,
-            backup_callback=backup_callback,
-            dry=dry,
-            **kwargs,
-        )
+        # Answer the Carousel's Fact-by-Fact store lookups from prefetched windows,
+        # and check that each Fact it saves was not changed by another process.
+        with fact_version_guard(controller), fact_window_cache(controller):
+            prompt_and_save_confirmer(
+                controller,
+                edit_facts=edit_facts,
+                orig_facts=orig_facts,
+                backup_callback=backup_callback,
+                dry=dry,
+                **kwargs,
+            )
         return []
 
     def prompt_directly():
@@ -20,16 +20,20 @@ from gettext import gettext as _
 from dob_bright.termio import (
     attr,
     click_echo,
+    dob_in_user_exit,
     echo_block_header,
     highlight_value
 )
 from dob_bright.termio.crude_progress import CrudeProgress
 
+from ..store.versions import StaleFactsError, fact_versions
+
 from .echo_fact import echo_fact, write_fact_block_format
 from .simple_prompts import mend_facts_confirm_and_save_maybe
 
 
 __all__ = (
+    'echo_facts_saved',
     'prompt_and_save_confirmer',
 )
 
@@ -69,10 +73,22 @@ def prompt_and_save_confirmer(
     def persist_facts():
         if not edit_facts:
             return
+        must_be_current()
         saved_facts = record_edited_facts()
         celebrate()
         return saved_facts
 
+    def must_be_current():
+        if dry or file_out:
+            return
+        # Check every edited Fact at once, before saving any of them.
+        try:
+            fact_versions(controller.store).must_be_current(
+                [fact.pk for fact in edit_facts]
+            )
+        except StaleFactsError as err:
+            dob_in_user_exit(str(err))
+
     def record_edited_facts():
         task_descrip = _('Saving facts')
         if progress is not None:
@@ -153,14 +169,17 @@ def prompt_and_save_confirmer(
     def celebrate():
         if not edit_facts:
             return
-        click_echo('{}{}{}! {}'.format(
-            attr('underlined'),
-            _('Voilà'),
-            attr('reset'),
-            _('Saved {} facts.').format(highlight_value(len(edit_facts))),
-        ))
+        echo_facts_saved(len(edit_facts))
 
     # ***
 
     return _prompt_and_save()
 
+
+def echo_facts_saved(count):
+    click_echo('{}{}{}! {}'.format(
+        attr('underlined'),
+        _('Voilà'),
+        attr('reset'),
+        _('Saved {} facts.').format(highlight_value(count)),
+    ))
@@ -30,14 +30,18 @@ from dob_bright.termio import (
     fg,
 )
 
+from ..store.contention import is_database_locked, retry_write
+from ..store.transaction import in_single_transaction
+from ..store.versions import StaleFactsError, fact_versions
+
 from .echo_fact import echo_fact
 
 __all__ = (
     'mend_facts_confirm_and_save_maybe',
+    'save_facts_maybe',
     # Private:
     #   'echo_ongoing_completed',
     #   'must_confirm_fact_edits',
-    #   'save_facts_maybe',
 )
 
 
@@ -151,6 +155,11 @@ def save_facts_maybe(controller, new_facts, conflicts, ignore_pks, dry):
         new_and_edited = []
         if conflicts and dry:
             echo_dry_run()
+        # Saving an edited Fact clears its PK, so collect them first.
+        edited_pks = [edited.pk for edited, _orig in conflicts]
+        edited_pks += [fact.pk for fact in new_facts]
+        if not dry:
+            must_be_current(edited_pks)
         for edited_fact, original in conflicts:
             if not dry:
                 new_and_edited += save_fact(controller, edited_fact, dry)
@@ -165,8 +174,16 @@ def save_facts_maybe(controller, new_facts, conflicts, ignore_pks, dry):
 
         for fact in new_facts:
             new_and_edited += save_fact(controller, fact, dry, ignore_pks=ignore_pks)
+        if not dry:
+            fact_versions(controller.store).record(edited_pks)
         return new_and_edited
 
+    def must_be_current(edited_pks):
+        try:
+            fact_versions(controller.store).must_be_current(edited_pks)
+        except StaleFactsError as err:
+            dob_in_user_exit(str(err))
+
     def echo_dry_run():
         click.echo()
         click.echo('{}Dry run! These facts will be edited{}:\n '.format(
@@ -184,8 +201,16 @@ def save_facts_maybe(controller, new_facts, conflicts, ignore_pks, dry):
         if not dry:
             controller.client_logger.debug('{}: {}'.format(_('Save fact'), fact.short))
             try:
-                new_fact = controller.facts.save(fact, ignore_pks=ignore_pks)
+                # nark changes the Fact it saves (e.g., it marks an edited Fact
+                # deleted before it commits), so save a fresh copy each try.
+                new_fact = retry_write(
+                    controller,
+                    lambda: controller.facts.save(fact.copy(), ignore_pks=ignore_pks),
+                )
             except Exception as err:
+                if is_database_locked(err) and in_single_transaction(controller.store):
+                    # Let the transaction roll back, and maybe retry.
+                    raise
                 traceback.print_exc()
                 dob_in_user_exit(str(err))
         else:
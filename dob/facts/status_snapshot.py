@@ -0,0 +1,220 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""A snapshot of the active Fact, kept in the user cache, to answer ``dob current``.
+
+Shell prompts and status lines run ``dob current`` every few seconds, and
+each run would otherwise stand up the store, verify its integrity, and
+query for the active Fact. Instead, whenever a command changes the Facts
+(i.e., after the post-processors run), dob writes a small JSON snapshot
+of the active Fact, which ``dob current --cached`` reads back.
+
+The snapshot is stamped with the database file's inode and the last
+sequence number of the Fact change feed (see dob.store.changes), which
+SQLite triggers bump on every write to the Facts, from any tool. (Unlike
+the file's modification time, this is stable under WAL journaling, when
+the last connection to close checkpoints the log into the database file.)
+If the store has no change feed, the stamp falls back to the database
+file's modification time and size (and those of its write-ahead log).
+If the database changes without the snapshot being updated, the stamp
+no longer matches, and the snapshot is ignored (and rewritten).
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from urllib.request import pathname2url
+
+from dob_bright.config.app_dirs import AppDirs, get_appdirs_subdir_file_path
+
+from nark.items.activity import Activity
+from nark.items.category import Category
+from nark.items.tag import Tag
+
+from ..helpers.files import write_json_atomic
+
+__all__ = (
+    'DESCRIPTION_HEAD_LENGTH',
+    'STATUS_SNAPSHOT_BASENAME',
+    'database_stamp',
+    'load_status_snapshot',
+    'snapshot_fact',
+    'status_snapshot_path',
+    'write_status_snapshot',
+    # Private:
+    #  '_snapshot_fields',
+)
+
+
+STATUS_SNAPSHOT_BASENAME = 'status.json'
+
+# Bump this if the snapshot fields change, to ignore older snapshots.
+STATUS_SNAPSHOT_VERSION = 2
+
+# The snapshot keeps just the first line of the description, up to this long.
+DESCRIPTION_HEAD_LENGTH = 100
+
+# The snapshot stores times in local time, sans timezone (like the store).
+START_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def status_snapshot_path():
+    """Return the path to the status snapshot file in the user cache."""
+    return get_appdirs_subdir_file_path(
+        file_basename=STATUS_SNAPSHOT_BASENAME,
+        dir_dirname='status',
+        appdirs_dir=AppDirs.user_cache_dir,
+    )
+
+
+def database_stamp(controller):
+    """Return a fingerprint that changes whenever the Facts in the database change.
+
+    Returns None if the store is not a SQLite database file (e.g., it's
+    in-memory), in which case there's nothing to snapshot against.
+    """
+    def _database_stamp():
+        if controller.config['db.engine'] != 'sqlite':
+            return None
+        db_path = controller.config['db.path']
+        if not db_path or db_path == ':memory:':
+            return None
+        db_path = os.path.abspath(db_path)
+        try:
+            db_stat = os.stat(db_path)
+        except OSError:
+            return None
+        change_seq = last_change_seq(db_path)
+        if change_seq is not None:
+            return [db_path, db_stat.st_ino, change_seq]
+        return [db_path, file_stat(db_path), file_stat(db_path + '-wal')]
+
+    def last_change_seq(db_path):
+        # Rather than stand up the store, peek with a plain read-only connection.
+        # The AUTOINCREMENT counter survives the feed being compacted.
+        try:
+            conn = sqlite3.connect(
+                'file:{}?mode=ro'.format(pathname2url(db_path)), uri=True, timeout=1,
+            )
+            try:
+                found, seq = conn.execute(
+                    "SELECT"
+                    " EXISTS (SELECT 1 FROM sqlite_master"
+                    "  WHERE type = 'table' AND name = 'dob_fact_changes'),"
+                    " (SELECT seq FROM sqlite_sequence"
+                    "  WHERE name = 'dob_fact_changes')"
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # E.g., no sqlite_sequence table, because no change feed.
+            return None
+        return (seq or 0) if found else None
+
+    def file_stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    return _database_stamp()
+
+
+def write_status_snapshot(controller, fact):
+    """Atomically replace the status snapshot with the given active Fact (or None)."""
+    def _write_status_snapshot():
+        stamp = database_stamp(controller)
+        if stamp is None:
+            return
+        path = status_snapshot_path()
+        if not path:
+            return
+        snapshot = {
+            'version': STATUS_SNAPSHOT_VERSION,
+            'stamp': stamp,
+            'fact': _snapshot_fields(fact) if fact is not None else None,
+        }
+        try:
+            write_json_atomic(path, snapshot)
+        except OSError:
+            # Not fatal: `dob current --cached` will query the store instead.
+            pass
+
+    _write_status_snapshot()
+
+
+def load_status_snapshot(controller, path=None):
+    """Return the status snapshot, if it exists and the database is unchanged.
+
+    Returns None if the snapshot is missing, unreadable, or stale, in which
+    case the caller should query the store (and write a new snapshot).
+    """
+    path = path or status_snapshot_path()
+    if not path:
+        return None
+    try:
+        with open(path, 'r') as snapshot_f:
+            snapshot = json.load(snapshot_f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get('version') != STATUS_SNAPSHOT_VERSION:
+        return None
+    stamp = database_stamp(controller)
+    if stamp is None or snapshot.get('stamp') != stamp:
+        return None
+    return snapshot
+
+
+def snapshot_fact(snapshot, fact_cls):
+    """Return a (partial) Fact from the status snapshot, or None if no active Fact."""
+    fields = snapshot['fact']
+    if fields is None:
+        return None
+    activity = None
+    if fields['activity'] is not None:
+        category = None
+        if fields['category'] is not None:
+            category = Category(name=fields['category'])
+        activity = Activity(name=fields['activity'], category=category)
+    return fact_cls(
+        activity=activity,
+        start=datetime.strptime(fields['start'], START_FORMAT),
+        pk=fields['pk'],
+        description=fields['description'],
+        tags=[Tag(name=name) for name in fields['tags']],
+    )
+
+
+def _snapshot_fields(fact):
+    description = (fact.description or '').split('\n', 1)[0]
+    if len(description) > DESCRIPTION_HEAD_LENGTH:
+        description = description[:DESCRIPTION_HEAD_LENGTH - 1] + '…'
+    activity = fact.activity
+    category = activity.category if activity is not None else None
+    return {
+        'pk': fact.pk,
+        'start': fact.start.strftime(START_FORMAT),
+        'activity': activity.name if activity is not None else None,
+        'category': category.name if category is not None else None,
+        'tags': [tag.name for tag in fact.tags_sorted],
+        'description': description,
+    }
+
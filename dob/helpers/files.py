@@ -0,0 +1,77 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2018-2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Helpers for files that several dob processes might read and write at once."""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # E.g., Windows.
+    fcntl = None
+
+__all__ = (
+    'file_lock',
+    'write_json_atomic',
+)
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Hold an exclusive ``flock`` on the lock file for the block.
+
+    The lock is advisory, and is skipped where ``flock`` is not available.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def write_json_atomic(path, obj, fsync=False):
+    """Write the object as JSON to a temporary file, then rename it into place.
+
+    So a concurrent reader never sees a partially written file. If ``fsync``,
+    the file is also flushed to disk before it's renamed. Raises OSError on
+    failure (after removing the temporary file).
+    """
+    fd, temp_path = tempfile.mkstemp(
+        prefix='.{}-'.format(os.path.basename(path)),
+        dir=os.path.dirname(path),
+    )
+    try:
+        with os.fdopen(fd, 'w') as json_f:
+            json.dump(obj, json_f)
+            if fsync:
+                json_f.flush()
+                os.fsync(json_f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,145 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Package version lookups, cached between runs."""
+
+import importlib
+import json
+import os
+
+from dob_bright.config.app_dirs import AppDirs, get_appdirs_subdir_file_path
+
+__all__ = (
+    'cached_version',
+    'git_worktree_dir',
+    'package_versions',
+    # Private:
+    #  'version_stamp',
+)
+
+
+VERSIONS_CACHE_BASENAME = 'versions.json'
+
+
+def package_versions(hothlibs, include_head=False):
+    """Return a list of (package name, version) for the named packages.
+
+    Resolving a version can be costly: from an editable install, the
+    version comes from git (via ``setuptools_scm``), which shells out.
+    So the versions are cached in the user cache directory, and each one
+    is recomputed only if its package (or its git working tree) changes.
+    """
+    versions = []
+    for hothlib in hothlibs:
+        mod = importlib.import_module(hothlib, package=None)
+        version = cached_version(
+            hothlib,
+            mod.__file__,
+            lambda: mod.get_version(include_head=include_head),
+            include_head=include_head,
+        )
+        versions.append((mod.__package_name__, version))
+    return versions
+
+
+def cached_version(package_name, reference_file, resolve, include_head=False):
+    """Return the version of the package that owns ``reference_file``.
+
+    Calls ``resolve`` to compute the version on a cache miss, or if the
+    package (or its git working tree) changed since it was last cached.
+    """
+    def _cached_version():
+        cache = load_cache()
+        key = '{}:{}'.format(package_name, 'head' if include_head else 'dist')
+        stamp = version_stamp(reference_file)
+        cached = cache.get(key)
+        if not cached or cached['stamp'] != stamp:
+            cached = {'stamp': stamp, 'version': resolve()}
+            # Reload, in case resolve() cached something itself.
+            cache = load_cache()
+            cache[key] = cached
+            save_cache(cache)
+        return cached['version']
+
+    def cache_path():
+        return get_appdirs_subdir_file_path(
+            file_basename=VERSIONS_CACHE_BASENAME,
+            dir_dirname='version',
+            appdirs_dir=AppDirs.user_cache_dir,
+        )
+
+    def load_cache():
+        path = cache_path()
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as cache_f:
+                return json.load(cache_f)
+        except (OSError, ValueError):
+            # Corrupt or unreadable; it'll be rewritten.
+            return {}
+
+    def save_cache(cache):
+        path = cache_path()
+        if not path:
+            return
+        try:
+            with open(path, 'w') as cache_f:
+                json.dump(cache, cache_f)
+        except OSError:
+            # Not fatal: just means recomputing the version next time.
+            pass
+
+    return _cached_version()
+
+
+def git_worktree_dir(reference_file):
+    """Return the .git/ of the working tree that holds ``reference_file``, or None.
+
+    The package is at the top level of the working tree, usually, but
+    look a few levels up, in case.
+    """
+    path = os.path.dirname(reference_file)
+    for _level in range(3):
+        path = os.path.dirname(path)
+        git_dir = os.path.join(path, '.git')
+        if os.path.exists(git_dir):
+            return git_dir
+    return None
+
+
+def version_stamp(reference_file):
+    """Return a fingerprint that changes when the package version might change.
+
+    A release install changes its files on upgrade; an editable install
+    changes its git HEAD or index on commit, checkout, or staging.
+    """
+    def _version_stamp():
+        stamp = [reference_file, mtime(reference_file)]
+        git_dir = git_worktree_dir(reference_file)
+        if git_dir:
+            for name in ('HEAD', 'index'):
+                stamp.append(mtime(os.path.join(git_dir, name)))
+        return stamp
+
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    return _version_stamp()
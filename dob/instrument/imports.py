@@ -0,0 +1,210 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Measures what ``dob`` costs to import, and which heavy modules it loads.
+
+Startup time matters most for the commands folks run all day, like
+``dob now`` and ``dob current``. Those never need the interactive editor
+(prompt_toolkit), the external editor helper, or the report renderers,
+so dob loads those lazily (see ``lazy_import``), on first use.
+
+This module reports Python's own ``-X importtime`` measurements, and
+lists any of the known-heavy modules that were loaded for real (versus
+being left as a lazy placeholder), which is what the import budget test
+(and ``dob debug import-time``) checks.
+"""
+
+import json
+import subprocess
+import sys
+from collections import namedtuple
+
+from gettext import gettext as _
+
+import lazy_import
+
+from dob_bright.termio import click_echo, dob_in_user_warning, highlight_value
+
+__all__ = (
+    'HOT_PATH_HEAVY_MODULES',
+    'STARTUP_HEAVY_MODULES',
+    'ImportTime',
+    'echo_import_times',
+    'heavy_modules_imported',
+    'heavy_modules_loaded',
+    'import_times',
+    'module_is_loaded',
+)
+
+
+# Modules the `dob now` and `dob current` commands should never load.
+HOT_PATH_HEAVY_MODULES = (
+    'dob_prompt.prompters',
+    'dob_viewer.traverser',
+    'editor',
+    'prompt_toolkit',
+)
+
+# Modules that merely importing dob should not load. The storage backend
+# (SQLAlchemy) is loaded only once a command stands up the data store.
+STARTUP_HEAVY_MODULES = HOT_PATH_HEAVY_MODULES + (
+    'dob_bright.reports',
+    'sqlalchemy',
+)
+
+
+ImportTime = namedtuple('ImportTime', ('name', 'depth', 'self_us', 'cumulative_us'))
+
+
+def module_is_loaded(name, modules=None):
+    """Returns True if the named module was imported, and not just lazily."""
+    modules = sys.modules if modules is None else modules
+    try:
+        module = modules[name]
+    except KeyError:
+        return False
+    if not isinstance(module, lazy_import.LazyModule):
+        return True
+    # A lazy module's class drops its error messages attribute once loaded.
+    return not hasattr(type(module), '_lazy_import_error_msgs')
+
+
+def heavy_modules_loaded(heavy_modules=STARTUP_HEAVY_MODULES, modules=None):
+    """Returns the subset of heavy_modules that are (really) loaded."""
+    return [name for name in heavy_modules if module_is_loaded(name, modules)]
+
+
+def heavy_modules_imported(args=None, heavy_modules=STARTUP_HEAVY_MODULES, env=None):
+    """Runs dob in a fresh interpreter and returns the heavy modules it loaded.
+
+    If args is None, dob is only imported. Otherwise, dob is run with
+    the given command line arguments (e.g., ``['current']``).
+    """
+    def _heavy_modules_imported():
+        proc = subprocess.run(
+            [sys.executable, '-c', python_script()],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            env=env,
+            check=True,
+        )
+        # The command's own output (if any) precedes the report.
+        return json.loads(proc.stdout.splitlines()[-1])
+
+    def python_script():
+        if args is None:
+            run_dob = 'import dob.dob'
+        else:
+            run_dob = 'sys.argv = {}; from dob.dob import run; run()'.format(
+                repr(['dob'] + list(args)),
+            )
+        return '\n'.join((
+            'import json, sys',
+            'from dob.instrument.imports import heavy_modules_loaded',
+            'try:',
+            '    {}'.format(run_dob),
+            'except SystemExit:',
+            '    pass',
+            'print()',
+            'print(json.dumps(heavy_modules_loaded({})))'.format(repr(heavy_modules)),
+        ))
+
+    return _heavy_modules_imported()
+
+
+def import_times(module='dob.dob'):
+    """Imports module in a fresh interpreter and returns its ``-X importtime`` tree.
+
+    Returns a list of ImportTime, in the order Python reports them (i.e.,
+    each module follows the modules it imported), with times in microsecs.
+    """
+    def _import_times():
+        stderr = run_importtime()
+        return [
+            parsed for parsed in (parse_line(line) for line in stderr.splitlines())
+            if parsed is not None
+        ]
+
+    def run_importtime():
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        return proc.stderr
+
+    def parse_line(line):
+        # E.g., "import time:       245 |       1042 |   dob.clickux"
+        prefix = 'import time:'
+        if not line.startswith(prefix):
+            return None
+        try:
+            self_us, cumulative_us, name = line[len(prefix):].split('|')
+            self_us = int(self_us)
+            cumulative_us = int(cumulative_us)
+        except ValueError:
+            # The header line: "import time: self [us] | cumulative | imported package"
+            return None
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        return ImportTime(name.strip(), depth, self_us, cumulative_us)
+
+    return _import_times()
+
+
+def echo_import_times(module='dob.dob', top=20):
+    """Prints the top slowest imports of module, and any heavy modules it loaded."""
+    def _echo_import_times():
+        times = import_times(module)
+        echo_total(times)
+        echo_slowest(times)
+        echo_heavy_modules()
+
+    def echo_total(times):
+        total_us = sum(imported.self_us for imported in times)
+        click_echo(_('Imported {} in {}').format(
+            highlight_value(module), highlight_value(format_msecs(total_us)),
+        ))
+
+    def echo_slowest(times):
+        slowest = sorted(times, key=lambda imported: -imported.cumulative_us)
+        click_echo('{:>11}  {:>11}  {}'.format(_('cumulative'), _('self'), _('module')))
+        for imported in slowest[:top]:
+            click_echo('{:>11}  {:>11}  {}'.format(
+                format_msecs(imported.cumulative_us),
+                format_msecs(imported.self_us),
+                imported.name,
+            ))
+
+    def echo_heavy_modules():
+        if module != 'dob.dob':
+            return
+        loaded = heavy_modules_imported()
+        if not loaded:
+            click_echo(_('No heavy modules were loaded at startup.'))
+            return
+        dob_in_user_warning(_('Heavy modules loaded at startup: {}').format(
+            ', '.join(loaded),
+        ))
+
+    def format_msecs(usecs):
+        return '{:.1f} ms'.format(usecs / 1000)
+
+    return _echo_import_times()
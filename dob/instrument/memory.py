@@ -0,0 +1,292 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Measures memory use per phase, for ``dob --memprofile``.
+
+When enabled, ``tracemalloc`` traces Python's allocations, and, as each
+timeline phase ends (see dob.instrument.timeline), dob notes the phase's
+peak traced memory, the memory it left allocated, and the source lines
+that allocated the most, e.g.,::
+
+    dob --memprofile memory.json export --output facts.json
+    dob --memprofile - import < facts.txt
+
+The peak is the most traced memory in use at once during the phase
+(including what earlier phases left allocated); the peak growth is how
+far above its starting point the phase climbed. (Before Python 3.9, which
+added ``tracemalloc.reset_peak``, each phase's peak is instead the most
+traced memory the sampler thread saw, so it may miss brief spikes.)
+
+The phases to watch for large reports and imports are 'query' (running
+the query, including 'hydrate', i.e., making the Facts from the results),
+'render' (formatting the report, and writing it out), 'hydrate' and
+'write' on import (parsing, then saving, the Facts), and 'pager' (flushing
+the buffered output to the pager).
+
+A sampler thread also notes the process's resident set size (RSS) every
+so often, which also counts memory that tracemalloc cannot see (e.g.,
+SQLite's page cache). The results are written as JSON, to compare runs.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from .. import get_version
+
+from .timeline import PHASE_TIMELINE
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # E.g., Windows.
+    resource = None
+
+__all__ = (
+    'MEMPROFILE_TOP',
+    'MemoryProfiler',
+    'RssSampler',
+    'current_rss',
+    'install_hydrate_marker',
+    'start_memprofile',
+)
+
+
+# The number of allocation sites to list per phase.
+MEMPROFILE_TOP = 10
+
+# How often the sampler thread notes the RSS.
+RSS_SAMPLE_SECS = 0.05
+
+
+def current_rss():
+    """Return the process's resident set size, in bytes (or None if unknown).
+
+    Where /proc is not available, returns the peak RSS instead.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, but macOS reports bytes.
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+class RssSampler(threading.Thread):
+    """A daemon thread that notes the RSS, as (time, bytes), every so often.
+
+    While tracemalloc is tracing, it also notes the traced memory.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECS):
+        super(RssSampler, self).__init__(name='dob-rss-sampler', daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.traced_samples = []
+        self.stopped = threading.Event()
+
+    def sample(self):
+        at = time.time()
+        rss = current_rss()
+        if rss is not None:
+            self.samples.append((at, rss))
+        if tracemalloc.is_tracing():
+            self.traced_samples.append((at, tracemalloc.get_traced_memory()[0]))
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+    def peak(self, began=None, ended=None, samples=None):
+        """Return the highest RSS sampled between the times, or None."""
+        samples = self.samples if samples is None else samples
+        sizes = [
+            size for at, size in samples
+            if (began is None or at >= began) and (ended is None or at <= ended)
+        ]
+        return max(sizes) if sizes else None
+
+    def traced_peak(self, began=None, ended=None):
+        """Return the highest traced memory sampled between the times, or None."""
+        return self.peak(began, ended, self.traced_samples)
+
+
+class MemoryProfiler(object):
+    """Traces allocations, and notes the memory each timeline phase uses."""
+
+    def __init__(self, top=MEMPROFILE_TOP, timeline=PHASE_TIMELINE, sampler=None):
+        self.top = top
+        self.timeline = timeline
+        self.sampler = sampler or RssSampler()
+        # Phases in progress, innermost last.
+        self.stack = []
+        self.phases = []
+        self.peak = 0
+        # Python 3.9+ can reset the traced peak, so each phase can measure its
+        # own peak. Otherwise, the phase peaks are sampled (see phase_ended).
+        self.sampled_peaks = not hasattr(tracemalloc, 'reset_peak')
+
+    def start(self):
+        tracemalloc.start()
+        self.sampler.start()
+        self.timeline.observer = self
+
+    def stop(self):
+        self.timeline.observer = None
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        self.sampler.stop()
+
+    # ***
+
+    def phase_began(self, name, depth):
+        if name == 'query':
+            install_hydrate_marker(self.timeline)
+        self.sampler.sample()
+        self.stack.append({
+            'began': time.time(),
+            'current': tracemalloc.get_traced_memory()[0],
+            'snapshot': self.snapshot(),
+            'child_peak': 0,
+        })
+        # Each phase measures its own peak (see phase_ended).
+        self.reset_peak()
+
+    def phase_ended(self, name, depth):
+        self.sampler.sample()
+        current, peak = tracemalloc.get_traced_memory()
+        began = self.stack.pop()
+        if self.sampled_peaks:
+            # The traced peak spans the whole run, so use the samples instead.
+            sampled = self.sampler.traced_peak(began['began'])
+            peak = max(began['current'], current, sampled or 0)
+        # Children reset the peak, so fold in theirs.
+        peak = max(peak, began['child_peak'])
+        if self.stack:
+            self.stack[-1]['child_peak'] = max(self.stack[-1]['child_peak'], peak)
+        self.peak = max(self.peak, peak)
+        self.phases.append({
+            'name': name,
+            'depth': depth,
+            'start': round(began['began'] - self.timeline.time_0, 6),
+            'duration': round(time.time() - began['began'], 6),
+            'peak': peak,
+            # How far above where it began the phase peaked.
+            'peak_growth': peak - began['current'],
+            'allocated': current - began['current'],
+            'rss_peak': self.sampler.peak(began['began']),
+            'top': self.top_sites(began['snapshot']),
+        })
+        self.reset_peak()
+
+    def reset_peak(self):
+        if not self.sampled_peaks:
+            tracemalloc.reset_peak()
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def top_sites(self, before):
+        stats = self.snapshot().compare_to(before, 'lineno')
+        return [
+            {
+                'site': '{0.filename}:{0.lineno}'.format(stat.traceback[0]),
+                'size': stat.size_diff,
+                'count': stat.count_diff,
+            }
+            for stat in stats[:self.top] if stat.size_diff > 0
+        ]
+
+    # ***
+
+    def as_dict(self):
+        return {
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'version': get_version(),
+            'python': sys.version.split()[0],
+            'peak': self.peak,
+            'sampled_peaks': self.sampled_peaks,
+            'rss_peak': self.sampler.peak(),
+            # Parents before children (like the timeline).
+            'phases': sorted(self.phases, key=lambda ph: (ph['start'], ph['depth'])),
+            'rss_samples': [
+                [round(at - self.timeline.time_0, 3), rss]
+                for at, rss in self.sampler.samples
+            ],
+        }
+
+
+def install_hydrate_marker(timeline=PHASE_TIMELINE):
+    """Split a 'hydrate' phase from the 'query' phase when Facts are first made.
+
+    nark runs the query, then makes a Fact from each result, all from the
+    one call, so dob marks the first Fact made as the start of hydration.
+    """
+    from nark.backends.sqlalchemy.objects import AlchemyFact
+
+    as_hamster = AlchemyFact.as_hamster
+    if getattr(as_hamster, 'marks_hydrate', False):
+        return
+
+    def marked_as_hamster(self, *args, **kwargs):
+        timeline.split('hydrate', parent='query')
+        return as_hamster(self, *args, **kwargs)
+
+    marked_as_hamster.marks_hydrate = True
+    AlchemyFact.as_hamster = marked_as_hamster
+
+
+def start_memprofile(ctx, memprofile_path=None):
+    """Trace memory until ctx closes, then write the results to memprofile_path.
+
+    Use a memprofile_path of '-' to write the results to stderr.
+    """
+    if not memprofile_path:
+        return
+    profiler = MemoryProfiler()
+    profiler.start()
+
+    def write_memprofile():
+        profiler.stop()
+        if memprofile_path == '-':
+            json.dump(profiler.as_dict(), sys.stderr, indent=2)
+            sys.stderr.write('\n')
+        else:
+            with open(memprofile_path, 'w') as memprofile_f:
+                json.dump(profiler.as_dict(), memprofile_f, indent=2)
+
+    ctx.call_on_close(write_memprofile)
@@ -0,0 +1,227 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Accounts for the time each plugin costs, loading and in its hooks.
+
+Plugins are compiled and evaluated from the user's plugins directory (see
+``ClickPluginGroup``), and may register post-processors that dob calls
+after saving Facts (see ``Controller.post_processor``). Either can slow
+down every command, so dob times each plugin's load, and each call to its
+post-processors (and counts those that fail).
+
+Each run that touches a plugin appends its costs to a short, rolling
+history in the user cache directory, and ``dob details --tmi`` prints
+the average cost of each plugin, flagging any that adds more than
+``plugins.cost_threshold`` milliseconds to a command.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from gettext import gettext as _
+
+from dob_bright.config.app_dirs import AppDirs, get_appdirs_subdir_file_path
+from dob_bright.termio import click_echo, highlight_value
+
+from ..helpers.files import file_lock, write_json_atomic
+
+__all__ = (
+    'PLUGIN_COSTS',
+    'PLUGIN_COSTS_BASENAME',
+    'PLUGIN_COSTS_HISTORY',
+    'PLUGIN_COST_KINDS',
+    'PluginCosts',
+    'echo_plugin_costs',
+    'load_plugin_costs',
+    'plugin_costs_path',
+    'plugin_name',
+    'summarize_plugin_costs',
+)
+
+
+PLUGIN_COSTS_BASENAME = 'plugin-costs.json'
+
+# The number of runs the history keeps.
+PLUGIN_COSTS_HISTORY = 100
+
+# What a plugin costs: 'load' and 'hook' add to the command's latency,
+# whereas 'spooled' post-processors run later, in the spool worker.
+PLUGIN_COST_KINDS = ('load', 'hook', 'spooled')
+
+
+def plugin_name(path_or_func):
+    """Return the plugin's file name, given its path, or one of its functions."""
+    if not isinstance(path_or_func, str):
+        # Plugins are compiled from their files, so their code knows its path.
+        code = getattr(path_or_func, '__code__', None)
+        path_or_func = code.co_filename if code else '?'
+    return os.path.basename(path_or_func)
+
+
+def plugin_costs_path():
+    """Return the path to the plugin costs history file in the user cache."""
+    return get_appdirs_subdir_file_path(
+        file_basename=PLUGIN_COSTS_BASENAME,
+        dir_dirname='instrument',
+        appdirs_dir=AppDirs.user_cache_dir,
+    )
+
+
+class PluginCosts(object):
+    """Time spent in each plugin during this process."""
+
+    def __init__(self, history_path=None):
+        self.history_path = history_path
+        self.plugins = OrderedDict()
+        # The spool worker runs post-processors on threads.
+        self.lock = threading.Lock()
+        self.saving = False
+
+    def record(self, name, kind, secs, failed=False):
+        with self.lock:
+            if name not in self.plugins:
+                self.plugins[name] = {'calls': 0, 'failures': 0}
+                self.plugins[name].update((cost, 0.0) for cost in PLUGIN_COST_KINDS)
+            costs = self.plugins[name]
+            costs[kind] += secs
+            if kind != 'load':
+                costs['calls'] += 1
+            if failed:
+                costs['failures'] += 1
+            if not self.saving:
+                # Add this run to the history as the process exits.
+                self.saving = True
+                atexit.register(self.save)
+
+    @contextmanager
+    def timed(self, name, kind):
+        """Record the time the block takes, and whether it raises."""
+        began = time.time()
+        try:
+            yield
+        except BaseException:
+            self.record(name, kind, time.time() - began, failed=True)
+            raise
+        self.record(name, kind, time.time() - began)
+
+    def save(self):
+        """Append this run's costs to the history file (and trim the oldest)."""
+        with self.lock:
+            if not self.plugins:
+                return
+            run = {
+                'at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'argv': sys.argv[1:],
+                'plugins': self.plugins,
+            }
+            path = self.history_path or plugin_costs_path()
+            if not path:
+                return
+            try:
+                # Lock out other runs, lest one's read-append-replace undo another's.
+                with file_lock('{}.lock'.format(path)):
+                    history = load_plugin_costs(path)
+                    history.append(run)
+                    write_json_atomic(path, history[-PLUGIN_COSTS_HISTORY:])
+            except OSError:
+                # Not fatal: it's just for `dob details --tmi`.
+                pass
+            self.plugins = OrderedDict()
+
+
+# The costs for this process.
+PLUGIN_COSTS = PluginCosts()
+
+
+def load_plugin_costs(path=None):
+    """Return the plugin costs history, oldest run first."""
+    path = path or plugin_costs_path()
+    if not path:
+        return []
+    try:
+        with open(path, 'r') as history_f:
+            history = json.load(history_f)
+    except (OSError, ValueError):
+        return []
+    return history if isinstance(history, list) else []
+
+
+def summarize_plugin_costs(history):
+    """Return each plugin's average costs per run, in milliseconds.
+
+    Returns an OrderedDict of plugin name to a dict with the number of
+    'runs', the average 'load', 'hook', and 'spooled' times, the average
+    'latency' (load plus hook), and the total 'calls' and 'failures'.
+    """
+    totals = OrderedDict()
+    for run in history:
+        for name, costs in sorted(run.get('plugins', {}).items()):
+            total = totals.setdefault(name, {'runs': 0, 'calls': 0, 'failures': 0})
+            total['runs'] += 1
+            total['calls'] += costs.get('calls', 0)
+            total['failures'] += costs.get('failures', 0)
+            for kind in PLUGIN_COST_KINDS:
+                total[kind] = total.get(kind, 0.0) + costs.get(kind, 0.0)
+    for total in totals.values():
+        for kind in PLUGIN_COST_KINDS:
+            total[kind] = total[kind] * 1000 / total['runs']
+        total['latency'] = total['load'] + total['hook']
+    return totals
+
+
+def echo_plugin_costs(controller, path=None):
+    """Print a table of what each plugin costs, on average, per run."""
+    def _echo_plugin_costs():
+        history = load_plugin_costs(path)
+        summary = summarize_plugin_costs(history)
+        if not summary:
+            click_echo(_('Plugin cost: no plugin runs recorded yet'))
+            return
+        threshold = controller.config['plugins.cost_threshold']
+        click_echo(_(
+            'Plugin cost (average per run, over the last {} runs):'
+        ).format(highlight_value(len(history))))
+        click_echo('  {:>5}  {:>10}  {:>10}  {:>10}  {:>8}  {}'.format(
+            _('runs'), _('load'), _('hooks'), _('spooled'), _('failed'), _('plugin'),
+        ))
+        for name, total in summary.items():
+            flag = ''
+            if total['latency'] > threshold:
+                flag = highlight_value(
+                    _('  (adds over {} ms)').format(threshold)
+                )
+            click_echo('  {:>5}  {:>10}  {:>10}  {:>10}  {:>8}  {}{}'.format(
+                total['runs'],
+                format_msecs(total['load']),
+                format_msecs(total['hook']),
+                format_msecs(total['spooled']),
+                total['failures'],
+                name,
+                flag,
+            ))
+
+    def format_msecs(msecs):
+        return '{:.1f} ms'.format(msecs)
+
+    _echo_plugin_costs()
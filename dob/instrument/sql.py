@@ -0,0 +1,290 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Accounts for the SQL each command runs, and logs the slow statements.
+
+The store's engine reports each statement it executes (see
+``install_query_instrumentation``), which is tallied by statement, i.e.,
+by its SQL with any literal values replaced by placeholders. Run with
+``-VV`` to see a summary at exit: how many times each statement ran, the
+rows it fetched, and the time it took, and which statements look like
+an "N+1" pattern, i.e., the same statement run over and over with just
+a different PK (likely from a lazy-loaded relationship in a loop).
+
+Statements slower than ``log.slow_query_ms`` are appended to the slow
+query log, beside the ``log.filepath`` logfile.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from gettext import gettext as _
+
+import lazy_import
+
+__all__ = (
+    'N_PLUS_ONE_REPEATS',
+    'QUERY_STATS',
+    'SLOW_QUERY_LOG_BASENAME',
+    'QueryStats',
+    'StatementStats',
+    'echo_query_summary',
+    'install_query_instrumentation',
+    'normalize_statement',
+    'slow_query_log_path',
+)
+
+# Only needed once an engine is made, and engines load SQLAlchemy anyway.
+event_listen = lazy_import.lazy_callable('sqlalchemy.event.listen')
+
+
+SLOW_QUERY_LOG_BASENAME = 'slow-queries.log'
+
+# A statement run this many times, with different parameters, looks like N+1.
+N_PLUS_ONE_REPEATS = 10
+
+# Stop remembering distinct parameters after this many (per statement).
+DISTINCT_PARAMS_LIMIT = 100
+
+# How much of each statement (and its parameters) to show.
+STATEMENT_WIDTH = 100
+PARAMETERS_WIDTH = 200
+
+# Literal numbers and strings, and IN (...) lists, within a statement.
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+
+
+def normalize_statement(statement):
+    """Return the statement on one line, with literal values as placeholders."""
+    statement = ' '.join(statement.split())
+    statement = LITERAL_RE.sub('?', statement)
+    return IN_LIST_RE.sub('IN (?...)', statement)
+
+
+class StatementStats(object):
+    """Running totals for one (normalized) statement."""
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.count = 0
+        self.rows = 0
+        self.secs = 0.0
+        self.max_secs = 0.0
+        self.distinct_params = set()
+
+    @property
+    def looks_like_n_plus_one(self):
+        return self.count >= N_PLUS_ONE_REPEATS and len(self.distinct_params) > 1
+
+
+class QueryStats(object):
+    """Running totals for the statements that the store executes."""
+
+    def __init__(self):
+        self.statements = OrderedDict()
+        self.count = 0
+        self.rows = 0
+        self.secs = 0.0
+
+    def record(self, statement, parameters, secs):
+        """Tally the statement (as sent to the DBAPI), and return its StatementStats.
+
+        Statements are tallied as is (which is quicker), and only merged by
+        their normalized SQL when reported (see ``by_statement``).
+        """
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = StatementStats(normalize_statement(statement))
+            self.statements[statement] = stats
+        stats.count += 1
+        stats.secs += secs
+        stats.max_secs = max(stats.max_secs, secs)
+        if len(stats.distinct_params) < DISTINCT_PARAMS_LIMIT:
+            stats.distinct_params.add(repr(parameters))
+        self.count += 1
+        self.secs += secs
+        return stats
+
+    def add_rows(self, stats, rows):
+        stats.rows += rows
+        self.rows += rows
+
+    def by_statement(self):
+        """Return StatementStats, merged by normalized statement."""
+        merged = OrderedDict()
+        for stats in self.statements.values():
+            total = merged.get(stats.statement)
+            if total is None:
+                total = merged[stats.statement] = StatementStats(stats.statement)
+            total.count += stats.count
+            total.rows += stats.rows
+            total.secs += stats.secs
+            total.max_secs = max(total.max_secs, stats.max_secs)
+            # Different literal values make different statements, too.
+            total.distinct_params |= {
+                (id(stats), params) for params in stats.distinct_params
+            }
+        return list(merged.values())
+
+    def n_plus_one(self):
+        """Return StatementStats for the statements that look like N+1."""
+        return [stats for stats in self.by_statement() if stats.looks_like_n_plus_one]
+
+
+# The totals for this process.
+QUERY_STATS = QueryStats()
+
+
+# ***
+
+class RowCountingCursor(sqlite3.Cursor):
+    """A sqlite3 cursor that counts the rows fetched for the statement."""
+
+    dob_stats = None
+    dob_query_stats = None
+
+    def count_rows(self, rows):
+        if self.dob_stats is not None:
+            self.dob_query_stats.add_rows(self.dob_stats, rows)
+
+    def fetchone(self):
+        row = super(RowCountingCursor, self).fetchone()
+        if row is not None:
+            self.count_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super(RowCountingCursor, self).fetchmany(*args, **kwargs)
+        self.count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super(RowCountingCursor, self).fetchall()
+        self.count_rows(len(rows))
+        return rows
+
+
+class RowCountingConnection(sqlite3.Connection):
+    """A sqlite3 connection that makes RowCountingCursors."""
+
+    def cursor(self, factory=RowCountingCursor):
+        return super(RowCountingConnection, self).cursor(factory)
+
+
+def slow_query_log_path(config):
+    """Return the slow query log path, or None if not logging slow queries."""
+    if not config['log.slow_query_ms'] or not config['log.filepath']:
+        return None
+    return os.path.join(
+        os.path.dirname(config['log.filepath']), SLOW_QUERY_LOG_BASENAME,
+    )
+
+
+def install_query_instrumentation(store, config, count_rows=False, stats=QUERY_STATS):
+    """Arrange for the store's engine to tally each statement it executes.
+
+    Call before the store is stood up (see ``install_sqlite_pragmas``).
+
+    Counting the rows fetched costs a little on each fetch, so it's optional
+    (and only works with SQLite).
+    """
+    slow_log_path = slow_query_log_path(config)
+    slow_secs = config['log.slow_query_ms'] / 1000.0
+
+    create_storage_engine = store.create_storage_engine
+
+    def _create_storage_engine():
+        engine = create_storage_engine()
+        event_listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event_listen(engine, 'after_cursor_execute', after_cursor_execute)
+        if count_rows and engine.dialect.name == 'sqlite':
+            event_listen(engine, 'do_connect', on_do_connect)
+        return engine
+
+    def on_do_connect(dialect, connection_record, cargs, cparams):
+        cparams['factory'] = RowCountingConnection
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault('dob_query_began', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        secs = time.perf_counter() - conn.info['dob_query_began'].pop()
+        statement_stats = stats.record(statement, parameters, secs)
+        if isinstance(cursor, RowCountingCursor):
+            cursor.dob_stats = statement_stats
+            cursor.dob_query_stats = stats
+        if slow_log_path and secs > slow_secs:
+            log_slow_query(statement, parameters, secs)
+
+    def log_slow_query(statement, parameters, secs):
+        try:
+            with open(slow_log_path, 'a') as slow_log:
+                slow_log.write('{}\t{:.1f} ms\t{}\t{}\t{}\n'.format(
+                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    secs * 1000,
+                    ' '.join(sys.argv[1:]),
+                    ' '.join(statement.split()),
+                    repr(parameters)[:PARAMETERS_WIDTH],
+                ))
+        except OSError:
+            # Not fatal: the log is just informative.
+            pass
+
+    store.create_storage_engine = _create_storage_engine
+
+
+def echo_query_summary(stats=QUERY_STATS, top=10, file=None):
+    """Print the statement counts and times (to stderr), slowest first."""
+    file = file or sys.stderr
+    if not stats.count:
+        return
+
+    def echo(line):
+        file.write(line + '\n')
+
+    def truncated(statement):
+        if len(statement) <= STATEMENT_WIDTH:
+            return statement
+        return statement[:STATEMENT_WIDTH - 1] + '…'
+
+    echo(_('SQL: {} statements, {} rows fetched, {:.1f} ms').format(
+        stats.count, stats.rows, stats.secs * 1000,
+    ))
+    echo('  {:>6}  {:>7}  {:>10}  {:>10}  {}'.format(
+        _('count'), _('rows'), _('total'), _('max'), _('statement'),
+    ))
+    slowest = sorted(stats.by_statement(), key=lambda stmt: -stmt.secs)
+    for stmt in slowest[:top]:
+        echo('  {:>6}  {:>7}  {:>7.1f} ms  {:>7.1f} ms  {}'.format(
+            stmt.count,
+            stmt.rows,
+            stmt.secs * 1000,
+            stmt.max_secs * 1000,
+            truncated(stmt.statement),
+        ))
+    n_plus_one = stats.n_plus_one()
+    if not n_plus_one:
+        return
+    echo(_('Possible N+1 queries (same statement, different parameters):'))
+    for stmt in n_plus_one:
+        echo('  {:>6} x  {}'.format(stmt.count, truncated(stmt.statement)))
@@ -0,0 +1,248 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Records a timeline of each dob invocation's phases, for ``dob --profile``.
+
+The timeline is always recorded -- it's just a few timestamps per run --
+but it's only written out if the user asks for it, e.g.,::
+
+    dob --profile profile.json report
+    dob --profile profile.json --profile-format trace report
+    dob --profile - --cprofile dob.prof report
+
+The 'json' format lists each phase's start and duration, in seconds
+since the process started. The 'trace' format is the Chrome trace-event
+format, which you can load in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import update_wrapper
+
+from nark import __time_0__
+
+from dob_bright.termio.paging import ClickEchoPager
+
+__all__ = (
+    'PHASE_TIMELINE',
+    'PROFILE_FORMATS',
+    'PhaseTimeline',
+    'flush_pager',
+    'start_profiling',
+    'timed_phase',
+    'timeline_phase',
+)
+
+
+PROFILE_FORMATS = ('json', 'trace')
+
+
+class PhaseTimeline(object):
+    """An ordered list of named, possibly nested, timed phases."""
+
+    def __init__(self, time_0=None):
+        self.time_0 = time_0 if time_0 is not None else time.time()
+        self.phases = []
+        self.depth = 0
+        # The names of the phases in progress, innermost last.
+        self.current = []
+        # The phases begun by split(), as (name, began, depth), innermost last.
+        self.splits = []
+        # Told as each phase begins and ends (see dob.instrument.memory).
+        self.observer = None
+
+    def record(self, name, began, ended=None, depth=None):
+        ended = ended if ended is not None else time.time()
+        depth = depth if depth is not None else self.depth
+        self.phases.append((name, began, ended, depth))
+
+    @contextmanager
+    def phase(self, name):
+        began = time.time()
+        depth = self.depth
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end_splits(depth)
+            self.end(name, began, depth)
+
+    def split(self, name, parent):
+        """Begin the named phase within the parent phase, until the parent ends.
+
+        This is for work that's only known to begin from deep within the
+        parent's callees, e.g., hydrating query results. It's a no-op unless
+        the parent is the innermost phase (so it's safe to call repeatedly).
+        """
+        if not self.current or self.current[-1] != parent:
+            return
+        self.splits.append((name, time.time(), self.depth))
+        self.begin(name)
+
+    def begin(self, name):
+        self.depth += 1
+        self.current.append(name)
+        if self.observer is not None:
+            self.observer.phase_began(name, self.depth - 1)
+
+    def end(self, name, began, depth):
+        self.depth -= 1
+        self.current.pop()
+        self.record(name, began, depth=depth)
+        if self.observer is not None:
+            self.observer.phase_ended(name, depth)
+
+    def end_splits(self, depth):
+        while self.splits and self.splits[-1][2] > depth:
+            self.end(*self.splits.pop())
+
+    # ***
+
+    def as_dict(self, ended=None):
+        ended = ended if ended is not None else time.time()
+        phases = [
+            {
+                'name': name,
+                'start': round(began - self.time_0, 6),
+                'duration': round(finis - began, 6),
+                'depth': depth,
+            }
+            for name, began, finis, depth in sorted(self.phases, key=_began_key)
+        ]
+        return {
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'total': round(ended - self.time_0, 6),
+            'phases': phases,
+        }
+
+    def as_trace_events(self, ended=None):
+        ended = ended if ended is not None else time.time()
+        pid = os.getpid()
+
+        def usecs(secs):
+            return int(round(secs * 1000000))
+
+        events = [
+            {
+                'name': name,
+                'cat': 'dob',
+                'ph': 'X',
+                'ts': usecs(began - self.time_0),
+                'dur': usecs(finis - began),
+                'pid': pid,
+                'tid': 0,
+            }
+            for name, began, finis, _depth in sorted(self.phases, key=_began_key)
+        ]
+        events.insert(0, {
+            'name': ' '.join(sys.argv),
+            'cat': 'dob',
+            'ph': 'X',
+            'ts': 0,
+            'dur': usecs(ended - self.time_0),
+            'pid': pid,
+            'tid': 0,
+        })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _began_key(phase):
+    # Sort by start time, and parents before children.
+    _name, began, _ended, depth = phase
+    return (began, depth)
+
+
+# The nark package records the time when it's first loaded,
+# which is one of the first things dob does.
+PHASE_TIMELINE = PhaseTimeline(time_0=__time_0__)
+
+
+def timeline_phase(name):
+    """Context manager that records the named phase on the timeline."""
+    return PHASE_TIMELINE.phase(name)
+
+
+def timed_phase(name):
+    """Decorator that records each call to the function as the named phase."""
+    def _timed_phase(func):
+        def timed_func(*args, **kwargs):
+            with PHASE_TIMELINE.phase(name):
+                return func(*args, **kwargs)
+
+        return update_wrapper(timed_func, func)
+
+    return _timed_phase
+
+
+# ***
+
+def flush_pager(func):
+    """Like the dob_bright ``flush_pager``, but records the flush on the timeline."""
+    def flush_echo(*args, **kwargs):
+        func(*args, **kwargs)
+        with PHASE_TIMELINE.phase('pager'):
+            ClickEchoPager.flush_pager()
+
+    return update_wrapper(flush_echo, func)
+
+
+# ***
+
+def start_profiling(ctx, profile_path=None, profile_format='json', cprofile_path=None):
+    """Arrange to write the timeline (and cProfile stats) when ctx closes.
+
+    Use a profile_path of '-' to write the timeline to stderr.
+    """
+    def _start_profiling():
+        if not profile_path and not cprofile_path:
+            return
+        profiler = start_cprofile()
+        ctx.call_on_close(lambda: write_profiles(profiler))
+
+    def start_cprofile():
+        if not cprofile_path:
+            return None
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def write_profiles(profiler):
+        ended = time.time()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        if profile_path:
+            write_timeline(ended)
+
+    def write_timeline(ended):
+        if profile_format == 'trace':
+            profile = PHASE_TIMELINE.as_trace_events(ended)
+        else:
+            profile = PHASE_TIMELINE.as_dict(ended)
+        if profile_path == '-':
+            json.dump(profile, sys.stderr, indent=2)
+            sys.stderr.write('\n')
+        else:
+            with open(profile_path, 'w') as profile_f:
+                json.dump(profile, profile_f, indent=2)
+
+    _start_profiling()
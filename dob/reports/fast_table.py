@@ -0,0 +1,268 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""A fast, fixed-width ASCII table, for reports with many rows.
+
+The 'normal' table (texttable) measures, balances, and wraps every cell of
+every row before it writes the first line, which gets slow when a report has
+tens of thousands of rows. The 'fast' table instead writes each row on one
+line: it sizes the columns from the headers and a sample of the first rows,
+fits them to the --max-width (shrinking the widest columns first), and then
+writes each row as it comes, truncating any cell that does not fit.
+
+Because the widths are decided from the sample, a longer cell in a later row
+is truncated, even if the table had room to spare.
+"""
+
+from gettext import gettext as _
+
+import re
+import sys
+from itertools import chain, islice
+
+import click_hotoffthehamster as click
+
+from dob_bright.reports.line_writer import LineWriter
+from dob_bright.termio import dob_in_user_exit
+
+__all__ = (
+    'FAST_TABLE_SAMPLE_SIZE',
+    'FastTableWriter',
+    'ansi_truncate',
+    'cell_text',
+    'fit_column_widths',
+    'restrict_width',
+    'visible_len',
+)
+
+
+# The number of rows read to size the columns before writing the table.
+FAST_TABLE_SAMPLE_SIZE = 500
+
+# The number of rows to write at a time (as one write, which is cheaper).
+FAST_TABLE_WRITE_ROWS = 100
+
+# Like nark's format_value_truncate, mark truncated cells with an ellipsis.
+TRUNCATE_ELLIPSIS = '...'
+
+# The ANSI control sequences (e.g., colors) that take no room on the terminal.
+ANSI_ESCAPE_RE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+ANSI_RESET = '\x1b[0m'
+
+
+# ***
+
+def cell_text(value):
+    """The cell value as a single line of text."""
+    if value is None:
+        return ''
+    text = value if isinstance(value, str) else str(value)
+    if '\n' in text or '\r' in text:
+        # Like nark's format_value_truncate, show each newline escaped.
+        text = '\\n'.join(text.splitlines())
+    if '\t' in text:
+        text = text.replace('\t', ' ')
+    return text
+
+
+def visible_len(text):
+    """The length of the text, less any ANSI control sequences."""
+    if '\x1b' not in text:
+        return len(text)
+    return len(ANSI_ESCAPE_RE.sub('', text))
+
+
+def ansi_truncate(text, width, ellipsis=TRUNCATE_ELLIPSIS):
+    """Cuts the text to at most ``width`` visible characters, ending with an ellipsis.
+
+    ANSI control sequences are kept (but not counted) up until the cut, after
+    which the style is reset, so that the color does not bleed past the cell.
+    """
+    if visible_len(text) <= width:
+        return text
+    if width <= len(ellipsis):
+        ellipsis = ''
+    room = width - len(ellipsis)
+    if '\x1b' not in text:
+        return text[:room] + ellipsis
+    pieces = []
+    pos = 0
+    for match in ANSI_ESCAPE_RE.finditer(text):
+        chunk = text[pos:match.start()]
+        if len(chunk) >= room:
+            break
+        pieces.append(chunk)
+        pieces.append(match.group())
+        room -= len(chunk)
+        pos = match.end()
+    pieces.append(text[pos:pos + room])
+    return ''.join(pieces) + ellipsis + ANSI_RESET
+
+
+def fit_column_widths(widths, max_width):
+    """Shrinks the widest columns until the table fits within ``max_width``.
+
+    Args:
+        widths (list): The width that each column would like.
+
+        max_width (int): The table width, including its borders,
+            or 0 for no limit.
+
+    Returns:
+        list: The column widths, or None if the table cannot fit.
+    """
+    widths = list(widths)
+    if not max_width or max_width <= 0:
+        return widths
+    room = max_width - border_width(len(widths))
+    if sum(widths) <= room:
+        return widths
+    if room < len(widths):
+        return None
+    # Find the widest cap at which the capped columns fit.
+    least, most = 1, max(widths)
+    while least < most:
+        cap = (least + most + 1) // 2
+        if sum(min(width, cap) for width in widths) <= room:
+            least = cap
+        else:
+            most = cap - 1
+    fitted = [min(width, least) for width in widths]
+    # Share what room remains with the capped columns, from the left.
+    spare = room - sum(fitted)
+    for idx, width in enumerate(widths):
+        if not spare:
+            break
+        if width > fitted[idx]:
+            fitted[idx] += 1
+            spare -= 1
+    return fitted
+
+
+def border_width(n_columns):
+    # Each column is bordered '| ' and ' ', and the last column, also '|'.
+    return 3 * n_columns + 1
+
+
+def restrict_width(max_width):
+    """Resolves the --max-width to the table width, like dob_bright's render_results."""
+    if max_width is not None and max_width >= 0:
+        return max_width
+    elif sys.stdout.isatty():
+        # MAGIC_NUMBER: Subtract 1 to leave an empty column border on the right.
+        return click.get_terminal_size()[0] - 1
+    else:
+        return 80
+
+
+# ***
+
+class FastTableWriter(LineWriter):
+    """Writes an ASCII table one line per row, as the rows arrive.
+
+    Args:
+        max_width (int): The table width, or 0 for as wide as the sample asks.
+
+        sample_size (int): The number of rows that decide the column widths.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_width=0,
+        sample_size=FAST_TABLE_SAMPLE_SIZE,
+        **kwargs,
+    ):
+        super(FastTableWriter, self).__init__(*args, **kwargs)
+        self.max_width = max_width
+        self.sample_size = sample_size
+        self.widths = []
+        self.cols_align = []
+
+    @property
+    def requires_table(self):
+        return True
+
+    def write_report_table(self, table, headers, tabulation=None):
+        rows = iter(table)
+        sample = list(islice(rows, self.sample_size))
+        self.prepare_columns(headers, sample, tabulation)
+        self.output_write(self.rule_line('-'))
+        # Like texttable, center the headers.
+        self.output_write(self.table_line(headers, ['c'] * len(headers)))
+        self.output_write(self.rule_line('='))
+        n_written = self.write_rows(chain(sample, rows))
+        self.output_write(self.rule_line('-'))
+        return n_written
+
+    def write_rows(self, rows):
+        n_written = 0
+        lines = []
+        for row in rows:
+            lines.append(self.table_line(row, self.cols_align))
+            n_written += 1
+            if self.row_limit > 0 and n_written >= self.row_limit:
+                break
+            if len(lines) >= FAST_TABLE_WRITE_ROWS:
+                self.output_write('\n'.join(lines))
+                lines = []
+        if lines:
+            self.output_write('\n'.join(lines))
+        return n_written
+
+    # ***
+
+    def prepare_columns(self, headers, sample, tabulation):
+        widths = [visible_len(cell_text(header)) for header in headers]
+        for row in sample:
+            for idx, value in enumerate(row):
+                widths[idx] = max(widths[idx], visible_len(cell_text(value)))
+        self.widths = fit_column_widths(widths, self.max_width)
+        if self.widths is None:
+            dob_in_user_exit(_('Please specify a larger table width.'))
+        self.cols_align = self.prepare_cols_align(headers, tabulation)
+
+    def prepare_cols_align(self, headers, tabulation):
+        # Like dob_bright's generate_table, right-align the first column.
+        if tabulation is None:
+            cols_align = ['l'] * len(headers)
+        else:
+            cols_align = [repcol.align for repcol in tabulation.repcols]
+        if cols_align:
+            cols_align[0] = 'r'
+        return cols_align
+
+    def rule_line(self, rule):
+        return '+' + '+'.join(rule * (width + 2) for width in self.widths) + '+'
+
+    def table_line(self, values, cols_align):
+        cells = []
+        for value, width, align in zip(values, self.widths, cols_align):
+            text = cell_text(value)
+            text_len = visible_len(text)
+            if text_len > width:
+                text = ansi_truncate(text, width)
+                text_len = visible_len(text)
+            padding = width - text_len
+            if align == 'r':
+                text = ' ' * padding + text
+            elif align == 'c':
+                text = ' ' * (padding // 2) + text + ' ' * (padding - padding // 2)
+            else:
+                text += ' ' * padding
+            cells.append(text)
+        return '| ' + ' | '.join(cells) + ' |'
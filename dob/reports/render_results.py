@@ -0,0 +1,235 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Renders reports, including dob's own 'fast' table (see ``fast_table``).
+
+``render_results`` hands every output format but the 'fast' table to
+dob_bright's ``render_results``. The 'fast' table is tabulated the same as
+the 'normal' table, but it's written by the ``FastTableWriter``.
+
+For a simple Fact listing (one that can use FactRows; see
+``dob.store.projection``), ``write_fast_table_stream`` goes further,
+and tabulates and writes the rows a batch at a time, as they stream
+from the query, rather than reading and tabulating them all first.
+"""
+
+import copy
+from itertools import chain, islice
+
+from dob_bright.reports.render_results import render_results as render_bright
+from dob_bright.reports.tabulate_results import tabulate_results
+from dob_bright.termio import dob_in_user_exit
+from dob_bright.termio.paging import ClickEchoPager
+
+from ..store.projection import fact_rows_supported
+from ..store.streaming import STREAM_BATCH_SIZE
+from .fast_table import FastTableWriter, restrict_width
+
+__all__ = (
+    'fast_table_streams',
+    'render_fast_table',
+    'render_results',
+    'write_fast_table_stream',
+)
+
+
+def render_results(
+    controller,
+    results,
+    output_format='table',
+    table_type='texttable',
+    **kwargs
+):
+    """Renders the results like dob_bright's ``render_results``, or as a 'fast' table."""
+    if output_format != 'table' or table_type != 'fast':
+        return render_bright(
+            controller,
+            results,
+            output_format=output_format,
+            table_type=table_type,
+            **kwargs
+        )
+    return render_fast_table(controller, results, **kwargs)
+
+
+def render_fast_table(
+    controller,
+    results,
+    headers=None,
+    query_terms=None,
+    show_usage=False,
+    show_duration=False,
+    hide_description=False,
+    custom_columns=None,
+    max_width=-1,
+    row_limit=0,
+    output_path=None,
+    # The factoid_rule does not apply to tables.
+    factoid_rule='',
+    datetime_format=None,
+    duration_fmt=None,
+    spark_total=None,
+    spark_width=None,
+    spark_secs=None,
+    show_totals=False,
+    hide_totals=False,
+    re_sort=False,
+):
+    """Writes the results as a 'fast' table. See dob_bright's ``render_results``."""
+    writer = fast_table_writer(
+        max_width, output_path, row_limit, datetime_format, duration_fmt,
+    )
+    if headers is not None:
+        # For list/usage act/cat/tag, already have ready table and headers.
+        return writer.write_report(results, headers, tabulation=None)
+
+    tabulation = tabulate_results(
+        controller,
+        results,
+        row_limit=row_limit,
+        query_terms=query_terms,
+        show_usage=show_usage,
+        show_duration=show_duration,
+        show_description=not hide_description,
+        custom_columns=custom_columns,
+        output_format='table',
+        datetime_format=datetime_format,
+        duration_fmt=duration_fmt,
+        spark_total=spark_total,
+        spark_width=spark_width,
+        spark_secs=spark_secs,
+        show_totals=show_totals,
+        hide_totals=hide_totals,
+        re_sort=re_sort,
+    )
+    tabn_headers = [repcol.header for repcol in tabulation.repcols]
+    return writer.write_report(tabulation.table, tabn_headers, tabulation)
+
+
+def fast_table_writer(
+    max_width,
+    output_path,
+    row_limit=0,
+    datetime_format=None,
+    duration_fmt=None,
+):
+    writer = FastTableWriter(max_width=restrict_width(max_width))
+    try:
+        writer.output_setup(
+            output_obj=output_path or ClickEchoPager,
+            row_limit=row_limit,
+            datetime_format=datetime_format,
+            duration_fmt=duration_fmt,
+        )
+    except Exception as err:
+        # I.e., FileNotFoundError, or PermissionError.
+        dob_in_user_exit(str(err))
+    return writer
+
+
+# ***
+
+def fast_table_streams(
+    controller,
+    query_terms,
+    output_format,
+    table_type,
+    custom_columns=None,
+    re_sort=False,
+):
+    """Whether the report is a 'fast' table that can be written as the results stream.
+
+    The results must be simple enough for FactRows, and no column may depend
+    on every result, like the sparkline does (which scales to the longest).
+    """
+    return (
+        output_format == 'table'
+        and table_type == 'fast'
+        and fact_rows_supported(controller, query_terms, output_format)
+        and not (custom_columns and 'sparkline' in custom_columns)
+        and not re_sort
+    )
+
+
+def write_fast_table_stream(
+    controller,
+    results,
+    query_terms,
+    show_usage=False,
+    show_duration=False,
+    hide_description=False,
+    custom_columns=None,
+    max_width=-1,
+    row_limit=0,
+    output_path=None,
+):
+    """Tabulates and writes the results a batch at a time, as they stream.
+
+    Args:
+        results (iterable): The (at least one) results, as they stream
+            from the query (see ``dob.store.streaming.stream_fact_rows``).
+
+        Most of the other arguments are the same as ``render_results``'.
+
+    Returns:
+        tuple: The number of results read, and the number of rows written.
+    """
+    # Because the results are already in order, and because results_final_sort
+    # logs as it skips its re-sort, give tabulate_results no sort columns.
+    batch_qt = copy.copy(query_terms)
+    batch_qt.sort_cols = ()
+
+    n_read = [0]
+
+    def _write_fast_table_stream():
+        writer = fast_table_writer(max_width, output_path, row_limit)
+        tabulations = tabulate_batches()
+        # The first batch decides the columns (and is the writer's sample).
+        tabulation = next(tabulations)
+        headers = [repcol.header for repcol in tabulation.repcols]
+        rows = chain(
+            tabulation.table,
+            chain.from_iterable(batch.table for batch in tabulations),
+        )
+        n_written = writer.write_report(rows, headers, tabulation)
+        return n_read[0], n_written
+
+    def tabulate_batches():
+        # Like tabulate_results, the row_limit limits the results read.
+        limited = iter(results)
+        if row_limit and row_limit > 0:
+            limited = islice(limited, row_limit)
+        while True:
+            batch = list(islice(limited, STREAM_BATCH_SIZE))
+            if not batch:
+                return
+            n_read[0] += len(batch)
+            yield tabulate_batch(batch)
+
+    def tabulate_batch(batch):
+        return tabulate_results(
+            controller,
+            batch,
+            query_terms=batch_qt,
+            show_usage=show_usage,
+            show_duration=show_duration,
+            show_description=not hide_description,
+            custom_columns=custom_columns,
+            output_format='table',
+        )
+
+    return _write_fast_table_stream()
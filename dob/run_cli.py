@@ -22,9 +22,6 @@ from functools import update_wrapper
 
 import click_hotoffthehamster as click
 
-# BREADCRUMB: PROFILING
-from nark.helpers.dev.profiling import profile_elapsed, timefunct
-
 from dob_bright.termio import click_echo, echo_exit
 from dob_bright.termio.paging import ClickEchoPager
 
@@ -32,6 +29,10 @@ from .clickux import help_strings
 from .clickux.aliasable_bunchy_plugin import ClickAliasableBunchyPluginGroup
 from .controller import DobController
 from .copyright import echo_copyright
+from .helpers.versions import package_versions
+from .instrument.memory import start_memprofile
+from .instrument.sql import echo_query_summary
+from .instrument.timeline import PROFILE_FORMATS, start_profiling, timeline_phase
 
 __all__ = (
     'pass_controller',
@@ -44,7 +45,7 @@ __all__ = (
 
 
 # Profiling: Controller is made during Command.invoke via click.MultiCommand.invoke.
-# Profiling: Controller calls _get_store: ~ 0.173 secs.
+# - The store is made lazily, on first use (see DobController.store).
 pass_controller = click.make_pass_decorator(DobController, ensure=True)
 
 
@@ -67,9 +68,7 @@ def pass_controller_context(func):
 def dob_versions(include_all=False):
     '''Return CLI version information, either for this package, or all HOTH packages.
     '''
-    vers = ''
     include_head = include_all
-    import importlib
     # MAYBE/2020-04-01: Add config_decorator and pedantic_timedelta.
     hothlibs = ['dob']
     if include_all:
@@ -79,16 +78,20 @@ def dob_versions(include_all=False):
             'dob_bright',
             'nark',
         ]
-    minlen = max([len(name) for name in hothlibs])
-    for hothlib in hothlibs:
-        mod = importlib.import_module(hothlib, package=None)
-        vers += '\n' if vers else ''
-        vers += '{name:{minlen}s} version {vers}'.format(
-            minlen=minlen,
-            name=mod.__package_name__,
-            vers=mod.get_version(include_head=include_head),
-        )
-    return vers
+    versions = package_versions(hothlibs, include_head=include_head)
+    minlen = max([len(name) for name, _vers in versions])
+    return '\n'.join([
+        '{name:{minlen}s} version {vers}'.format(minlen=minlen, name=name, vers=vers)
+        for name, vers in versions
+    ])
+
+
+def echo_versions_and_exit(ctx, param, value):
+    """Print the --version (computed only if asked) and exit."""
+    if not value or ctx.resilient_parsing:
+        return
+    click_echo(dob_versions())
+    ctx.exit()
 
 
 # ***
@@ -146,8 +149,11 @@ CONTEXT_SETTINGS = dict(
     help=help_strings.RUN_HELP_OVERVIEW,
     context_settings=CONTEXT_SETTINGS,
 )
-# (lb): Also include version to avoid RuntimeError, ha!
-@click.version_option(message=dob_versions(), version='')
+# Not using click.version_option, which wants the version message up front,
+# but resolving the version is costly, and it's rarely needed.
+@click.option('--version', is_flag=True, expose_value=False, is_eager=True,
+              callback=echo_versions_and_exit,
+              help=help_strings.GLOBAL_OPT_VERSION)
 # (lb): Hide -v: version_option adds help for --version, so don't repeat ourselves.
 @click.option('-v', is_flag=True, help=help_strings.VERSION_HELP, hidden=True)
 # (lb): Note that universal --options must com before the sub command.
@@ -167,13 +173,38 @@ CONTEXT_SETTINGS = dict(
 # (lb): We could use `type=click.File('r')` here. Or not.
 @click.option('-F', '--configfile', metavar='PATH',
               help=help_strings.GLOBAL_OPT_CONFIGFILE)
+# Note that Click 7 does not support options with optional values,
+# so --profile requires the FILE argument (use '-' for stderr).
+@click.option('--profile', 'profile_path', metavar='FILE',
+              help=help_strings.GLOBAL_OPT_PROFILE)
+@click.option('--profile-format', type=click.Choice(PROFILE_FORMATS),
+              default=PROFILE_FORMATS[0],
+              help=help_strings.GLOBAL_OPT_PROFILE_FORMAT)
+@click.option('--cprofile', 'cprofile_path', metavar='FILE',
+              help=help_strings.GLOBAL_OPT_CPROFILE)
+@click.option('--memprofile', 'memprofile_path', metavar='FILE',
+              help=help_strings.GLOBAL_OPT_MEMPROFILE)
 # Profiling: pass_controller appears to take ~ ¼ seconds.
-@timefunct('run: create Controller [_get_store]')
+# - See the 'controller' phase in `dob --profile - ...` output.
 @pass_controller
 @click.pass_context
 # NOTE: @click.group transforms this func. definition into a callback that
 #       we use as a decorator for the top-level commands (see: @run.command).
-def run(ctx, controller, v, verbose, verboser, color, pager, config, configfile):
+def run(
+    ctx,
+    controller,
+    v,
+    verbose,
+    verboser,
+    color,
+    pager,
+    config,
+    configfile,
+    profile_path,
+    profile_format,
+    cprofile_path,
+    memprofile_path,
+):
     """General context run right before any of the commands."""
 
     def _run(ctx, controller, show_version):
@@ -186,13 +217,19 @@ def run(ctx, controller, v, verbose, verboser, color, pager, config, configfile)
         Show version and exit, if user specified -v option.
         Setup up loggers.
         """
-        profile_elapsed('To dob:    run')
-        controller.ensure_config(ctx, configfile, *config)
-        _setup_tty_options(ctx, controller)
+        start_profiling(ctx, profile_path, profile_format, cprofile_path)
+        start_memprofile(ctx, memprofile_path)
+        with timeline_phase('config'):
+            controller.ensure_config(ctx, configfile, *config)
+        with timeline_phase('style'):
+            _setup_tty_options(ctx, controller)
         _run_handle_banner()
         _run_handle_version(ctx, show_version)
         _run_handle_without_command(ctx)
-        controller.setup_logging(verbose, verboser)
+        with timeline_phase('logging'):
+            controller.setup_logging(verbose, verboser)
+        if verboser:
+            ctx.call_on_close(echo_query_summary)
 
     def _setup_tty_options(ctx, controller):
         # If piping output, Disable color and paging.
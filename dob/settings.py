@@ -0,0 +1,282 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Configuration settings specific to ``dob`` (not shared with upstream)."""
+
+from gettext import gettext as _
+
+from nark.config import ConfigRoot, NarkConfigurableDb
+
+__all__ = (
+    'DobConfigurableChanges',
+    'DobConfigurableEditor',
+    'DobConfigurableLog',
+    'DobConfigurablePlugins',
+    'DobConfigurablePostProcess',
+    'DobConfigurableSqlite',
+)
+
+
+# ***
+
+@ConfigRoot.section('editor')
+class DobConfigurableEditor(object):
+    """"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Number of Facts the Carousel prefetches on either side of a Fact."),
+    )
+    def window_size(self):
+        return 25
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Maximum number of prefetched Facts the Carousel keeps in memory."),
+    )
+    def window_cache(self):
+        return 500
+
+
+# ***
+
+@ConfigRoot.section('log')
+class DobConfigurableLog(object):
+    """"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Log SQL statements slower than this many milliseconds"
+          " (0 to not log); see dob.instrument.sql."),
+    )
+    def slow_query_ms(self):
+        return 250
+
+
+# ***
+
+@NarkConfigurableDb.section('sqlite')
+class DobConfigurableSqlite(object):
+    """PRAGMAs applied to each SQLite connection (see dob.store.pragmas),
+    and how writers cope with a locked database (see dob.store.contention).
+
+    For the PRAGMAs, an empty string or a zero means leave SQLite's default alone.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("SQLite journal mode, e.g., ‘wal’ lets readers and a writer overlap."),
+        choices=['', 'delete', 'truncate', 'persist', 'memory', 'wal', 'off'],
+    )
+    def journal_mode(self):
+        return ''
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("SQLite synchronous level; ‘normal’ is safe, and faster, with ‘wal’."),
+        choices=['', 'off', 'normal', 'full', 'extra'],
+    )
+    def synchronous(self):
+        return ''
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("SQLite page cache size: pages if positive, KiB if negative."),
+    )
+    def cache_size(self):
+        return 0
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Bytes of the SQLite database file to memory-map for reads."),
+    )
+    def mmap_size(self):
+        return 0
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Where SQLite keeps temporary tables and indices."),
+        choices=['', 'default', 'file', 'memory'],
+    )
+    def temp_store(self):
+        return ''
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Milliseconds SQLite waits on a locked database before giving up."),
+    )
+    def busy_timeout(self):
+        return 0
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("SQLite page size in bytes. Only applies when a new store is created."),
+    )
+    def page_size(self):
+        return 0
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Times to retry a write that fails because the database is locked."),
+    )
+    def write_retries(self):
+        return 5
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Milliseconds of backoff before the first write retry (doubles"
+            " on each retry, and is jittered)."),
+    )
+    def retry_backoff(self):
+        return 50
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("If True, writers take turns using an advisory lock file beside"
+            " the database."),
+    )
+    def write_lock(self):
+        return False
+
+
+# ***
+
+@NarkConfigurableDb.section('changes')
+class DobConfigurableChanges(object):
+    """How long to keep the Fact change feed (see dob.store.changes)."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Days of Fact changes to keep in the change feed (0 to keep all)."),
+    )
+    def retention_days(self):
+        return 90
+
+    # ***
+
+    @property
+    @NarkConfigurableDb.setting(
+        _("Most Fact changes to keep in the change feed (0 for no limit)."),
+    )
+    def retention_rows(self):
+        return 100000
+
+
+# ***
+
+@ConfigRoot.section('post_process')
+class DobConfigurablePostProcess(object):
+    """How plugin post-processors run after Facts are saved (see dob.spool)."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("If True, spool post-processing, and run it in a background worker."),
+    )
+    def spool(self):
+        return False
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Seconds a spooled post-processor may run before it is abandoned."),
+    )
+    def timeout(self):
+        return 30
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Times a spooled post-processor is tried before its entry is failed."),
+    )
+    def retries(self):
+        return 3
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Most spooled post-processors to run at once."),
+    )
+    def concurrency(self):
+        return 2
+
+
+# ***
+
+@ConfigRoot.section('plugins')
+class DobConfigurablePlugins(object):
+    """Plugin accounting (see dob.instrument.plugins)."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ***
+
+    @property
+    @ConfigRoot.setting(
+        _("Milliseconds a plugin may add to a command before"
+          " `dob details --tmi` flags it."),
+    )
+    def cost_threshold(self):
+        return 100
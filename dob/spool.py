@@ -0,0 +1,482 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Spool plugin post-processing, to run it after the command returns.
+
+Plugins can register post-processors (see ``Controller.post_processor``)
+that dob calls after each command that saves Facts, e.g., to push the
+Facts to a remote timesheet service. Normally dob waits on these before
+exiting, so a slow network slows down every ``dob now``.
+
+When ``post_process.spool`` is set, dob instead writes the post-process
+payload (the saved Fact PKs, and a snapshot of each Fact) to a spool
+directory under the user data directory, starts a background worker, and
+returns. The worker (``dob debug spool --drain``) runs each post-processor
+on each entry, oldest entry first, with a time limit
+(``post_process.timeout``), and runs a few post-processors at once
+(``post_process.concurrency``). A post-processor that fails (or runs out
+of time) is tried again by the next worker, i.e., after the next command
+that saves Facts, until it has been tried ``post_process.retries`` times,
+after which its entry is moved to the ``failed`` subdirectory.
+
+Each post-processor runs at least once per entry, but might run more than
+once, e.g., if it runs out of time but finishes anyway. Post-processors run
+on worker threads, so they should not use the store (they are passed the
+Facts, reloaded from the store, or rebuilt from the snapshot if gone).
+
+Run ``dob debug spool`` to see what's pending.
+"""
+
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from gettext import gettext as _
+from queue import Empty, Queue
+
+from dob_bright.config.app_dirs import AppDirs
+from dob_bright.controller import Controller
+from dob_bright.crud.fact_dressed import FactDressed
+from dob_bright.termio import click_echo
+
+from nark.items.activity import Activity
+from nark.items.category import Category
+from nark.items.tag import Tag
+
+from .helpers.files import file_lock, write_json_atomic
+from .instrument.plugins import PLUGIN_COSTS, plugin_name
+
+__all__ = (
+    'SPOOL_DIRNAME',
+    'SPOOL_FAILED_DIRNAME',
+    'drain_spool',
+    'echo_spool',
+    'handler_name',
+    'load_spool_entry',
+    'requeue_failed',
+    'run_with_limits',
+    'spawn_spool_worker',
+    'spool_entry_paths',
+    'spool_path',
+    'spool_post_process',
+    # Private:
+    #  '_SPOOL_SEQUENCE',
+    #  '_fact_fields',
+    #  '_fields_fact',
+)
+
+
+SPOOL_DIRNAME = 'spool'
+
+SPOOL_FAILED_DIRNAME = 'failed'
+
+# Bump this if the entry fields change (older entries are then failed).
+SPOOL_VERSION = 1
+
+# The spool stores times in local time, sans timezone (like the store).
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Tie-breaks the names of entries spooled at the same clock time.
+_SPOOL_SEQUENCE = itertools.count()
+
+
+def spool_path():
+    """Return the path to the spool directory in the user data directory."""
+    return os.path.join(AppDirs.user_data_dir, SPOOL_DIRNAME)
+
+
+def spool_entry_paths(spool_dir=None, failed=False):
+    """Return the paths to the spool entries, oldest first."""
+    spool_dir = spool_dir or spool_path()
+    if failed:
+        spool_dir = os.path.join(spool_dir, SPOOL_FAILED_DIRNAME)
+    try:
+        names = os.listdir(spool_dir)
+    except OSError:
+        return []
+    # Entry names start with a timestamp, so they sort in the order spooled.
+    return [
+        os.path.join(spool_dir, name) for name in sorted(names)
+        if name.endswith('.json') and not name.startswith('.')
+    ]
+
+
+def load_spool_entry(path):
+    """Return the spool entry at the path, or None if unreadable."""
+    try:
+        with open(path, 'r') as entry_f:
+            entry = json.load(entry_f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get('version') != SPOOL_VERSION:
+        return None
+    return entry
+
+
+def handler_name(handler):
+    """Return a name for the post-processor that's stable across runs."""
+    return '{}:{}'.format(
+        plugin_name(handler), getattr(handler, '__qualname__', repr(handler)),
+    )
+
+
+# *** [SPOOL] POST-PROCESS
+
+def spool_post_process(controller, fact_facts_or_true, command=None, spool_dir=None):
+    """Spool the post-process payload, and start a worker to drain the spool.
+
+    Returns the new entry's path, or None if there was nothing to spool
+    (no Facts were saved, or no plugin registered a post-processor).
+    """
+    def _spool_post_process():
+        if not fact_facts_or_true or not Controller.POST_PROCESSORS:
+            return None
+        entry = new_entry()
+        path = write_entry(spool_dir or spool_path(), entry)
+        spawn_spool_worker(controller)
+        return path
+
+    def new_entry():
+        entry = {
+            'version': SPOOL_VERSION,
+            'spooled_at': datetime.now().strftime(TIME_FORMAT),
+            'command': command,
+            'payload': 'true',
+            'pks': None,
+            'facts': None,
+            'done': [],
+            'handlers': {},
+        }
+        if fact_facts_or_true is not True:
+            if isinstance(fact_facts_or_true, list):
+                entry['payload'] = 'facts'
+                facts = fact_facts_or_true
+            else:
+                entry['payload'] = 'fact'
+                facts = [fact_facts_or_true]
+            entry['pks'] = [fact.pk for fact in facts]
+            entry['facts'] = [_fact_fields(fact) for fact in facts]
+        return entry
+
+    def write_entry(spool_dir, entry):
+        os.makedirs(spool_dir, exist_ok=True)
+        # The clock orders the entries (time.time_ns() would be more precise,
+        # but it's Python 3.7+), the PID keeps names unique when two processes
+        # spool at once, and the sequence, when one process spools twice at once.
+        basename = '{:020d}-{}-{:06d}.json'.format(
+            int(time.time() * 1e9), os.getpid(), next(_SPOOL_SEQUENCE),
+        )
+        path = os.path.join(spool_dir, basename)
+        write_json_atomic(path, entry, fsync=True)
+        return path
+
+    return _spool_post_process()
+
+
+def spawn_spool_worker(controller):
+    """Start a detached ``dob debug spool --drain`` with the same config."""
+    argv = [sys.executable, '-c', 'from dob.dob import run; run(prog_name="dob")']
+    if controller.configfile_path:
+        argv += ['-F', controller.configfile_path]
+    for keyval in controller.config_keyvals or ():
+        argv += ['-C', keyval]
+    argv += ['debug', 'spool', '--drain']
+    try:
+        subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            # Outlive the terminal (and ignore its Ctrl-C).
+            start_new_session=True,
+        )
+    except OSError as err:
+        # Not fatal: the next command that spools will try again.
+        controller.client_logger.warning(
+            _('Could not start spool worker: {}').format(err)
+        )
+
+
+# *** [DRAIN] SPOOL
+
+def drain_spool(controller, spool_dir=None):
+    """Run the post-processors on each spooled entry, oldest entry first.
+
+    Only one process drains the spool at a time; others wait their turn.
+
+    Returns a Counter of entries 'drained', 'pending' (to be retried),
+    and 'failed'.
+    """
+    def _drain_spool():
+        outcomes = Counter()
+        with drain_lock():
+            attempted = set()
+            # Keep going until no new entries arrive (spooled while draining).
+            while True:
+                paths = [
+                    path for path in spool_entry_paths(spool_dir)
+                    if path not in attempted
+                ]
+                if not paths:
+                    break
+                for path in paths:
+                    attempted.add(path)
+                    outcomes[drain_entry(path)] += 1
+        return outcomes
+
+    def drain_lock():
+        lock_dir = spool_dir or spool_path()
+        os.makedirs(lock_dir, exist_ok=True)
+        return file_lock(os.path.join(lock_dir, '.drain.lock'))
+
+    def drain_entry(path):
+        entry = load_spool_entry(path)
+        if entry is None:
+            if os.path.exists(path):
+                move_to_failed(path)
+                return 'failed'
+            # Another drainer beat us to it.
+            return 'drained'
+        handlers = [
+            (handler_name(handler), handler)
+            for handler in Controller.POST_PROCESSORS
+        ]
+        todo = [(name, handler) for name, handler in handlers
+                if name not in entry['done']]
+        if todo:
+            run_handlers(entry, todo)
+        return settle_entry(path, entry, handlers)
+
+    def run_handlers(entry, todo):
+        facts = entry_facts(entry)
+        calls = [
+            (name, make_call(handler, facts))
+            for name, handler in todo
+        ]
+        errors = run_with_limits(
+            calls,
+            timeout=controller.config['post_process.timeout'],
+            concurrency=controller.config['post_process.concurrency'],
+        )
+        for name, _handler in todo:
+            error = errors[name]
+            if error is None:
+                entry['done'].append(name)
+                entry['handlers'].pop(name, None)
+                continue
+            status = entry['handlers'].setdefault(name, {'tries': 0, 'error': None})
+            status['tries'] += 1
+            status['error'] = error
+            controller.client_logger.warning(
+                _('Post-processor {} failed (try {}): {}').format(
+                    name, status['tries'], error,
+                )
+            )
+
+    def make_call(handler, facts):
+        def call():
+            with PLUGIN_COSTS.timed(plugin_name(handler), 'spooled'):
+                handler(
+                    controller.ctx,
+                    controller,
+                    facts,
+                    show_plugin_error=None,
+                    carousel_active=False,
+                )
+        return call
+
+    def entry_facts(entry):
+        if entry['payload'] == 'true':
+            return True
+        facts = [load_fact(fields) for fields in entry['facts']]
+        if entry['payload'] == 'fact':
+            return facts[0]
+        return facts
+
+    def load_fact(fields):
+        # Prefer the stored Fact, but fall back on the snapshot, e.g., if
+        # the store was recreated since.
+        if fields['pk'] is not None:
+            try:
+                return controller.facts.get(fields['pk'])
+            except KeyError:
+                pass
+        return _fields_fact(fields, FactDressed)
+
+    def settle_entry(path, entry, handlers):
+        if all(name in entry['done'] for name, _handler in handlers):
+            os.remove(path)
+            return 'drained'
+        retries = max(1, controller.config['post_process.retries'])
+        if any(
+            status['tries'] >= retries for status in entry['handlers'].values()
+        ):
+            write_json_atomic(path, entry, fsync=True)
+            move_to_failed(path)
+            return 'failed'
+        write_json_atomic(path, entry, fsync=True)
+        return 'pending'
+
+    def move_to_failed(path):
+        failed_dir = os.path.join(os.path.dirname(path), SPOOL_FAILED_DIRNAME)
+        os.makedirs(failed_dir, exist_ok=True)
+        os.replace(path, os.path.join(failed_dir, os.path.basename(path)))
+        controller.client_logger.warning(
+            _('Moved spool entry to failed: {}').format(os.path.basename(path))
+        )
+
+    return _drain_spool()
+
+
+def run_with_limits(calls, timeout, concurrency):
+    """Run the named calls on threads, a few at a time, each with a time limit.
+
+    Returns a dict mapping each name to None on success, or else to the
+    error message. A call that runs out of time is abandoned (its thread
+    is a daemon, so it won't keep the process alive).
+    """
+    finished = Queue()
+    pending = list(calls)
+    running = {}
+    errors = {}
+    concurrency = max(1, concurrency)
+
+    def target(name, call):
+        try:
+            call()
+            finished.put((name, None))
+        except BaseException as err:
+            # Includes SystemExit, e.g., from dob_in_user_exit.
+            finished.put((name, str(err) or err.__class__.__name__))
+
+    while pending or running:
+        while pending and len(running) < concurrency:
+            name, call = pending.pop(0)
+            thread = threading.Thread(target=target, args=(name, call), daemon=True)
+            running[name] = time.monotonic() + timeout
+            thread.start()
+        wait = max(0, min(running.values()) - time.monotonic())
+        try:
+            name, error = finished.get(timeout=wait)
+        except Empty:
+            now = time.monotonic()
+            for name, deadline in list(running.items()):
+                if deadline <= now:
+                    del running[name]
+                    errors[name] = _('Timed out after {}s').format(timeout)
+            continue
+        # Ignore calls that finish after being abandoned.
+        if name in running:
+            del running[name]
+            errors[name] = error
+    return errors
+
+
+# *** [SHOW] SPOOL
+
+def echo_spool(controller, spool_dir=None):
+    """Print the pending and failed spool entries."""
+    def _echo_spool():
+        echo_entries(_('Pending'), spool_entry_paths(spool_dir))
+        echo_entries(_('Failed'), spool_entry_paths(spool_dir, failed=True))
+
+    def echo_entries(title, paths):
+        click_echo('{}: {} {}'.format(title, len(paths), _('entries')))
+        for path in paths:
+            echo_entry(path, load_spool_entry(path))
+
+    def echo_entry(path, entry):
+        basename = os.path.basename(path)
+        if entry is None:
+            click_echo('  {}  {}'.format(basename, _('(unreadable)')))
+            return
+        if entry['pks'] is None:
+            what = _('All Facts')
+        else:
+            what = _('Facts: {}').format(
+                ', '.join(str(pk) for pk in entry['pks'])
+            )
+        click_echo('  {}  {} `{}`  {}'.format(
+            basename, entry['spooled_at'].split('.')[0], entry['command'], what,
+        ))
+        for name, status in sorted(entry['handlers'].items()):
+            click_echo('    {}  {}'.format(
+                name,
+                _('tried {} time(s): {}').format(status['tries'], status['error']),
+            ))
+
+    _echo_spool()
+
+
+def requeue_failed(spool_dir=None):
+    """Move failed entries back to the spool, to be tried anew.
+
+    Returns the number of entries moved.
+    """
+    spool_dir = spool_dir or spool_path()
+    paths = spool_entry_paths(spool_dir, failed=True)
+    for path in paths:
+        entry = load_spool_entry(path)
+        if entry is not None:
+            entry['handlers'] = {}
+            write_json_atomic(path, entry, fsync=True)
+        os.replace(path, os.path.join(spool_dir, os.path.basename(path)))
+    return len(paths)
+
+
+# ***
+
+def _fact_fields(fact):
+    activity = fact.activity
+    category = activity.category if activity is not None else None
+    return {
+        'pk': fact.pk,
+        'start': fact.start.strftime(TIME_FORMAT) if fact.start else None,
+        'end': fact.end.strftime(TIME_FORMAT) if fact.end else None,
+        'activity': activity.name if activity is not None else None,
+        'category': category.name if category is not None else None,
+        'tags': [tag.name for tag in fact.tags_sorted],
+        'description': fact.description,
+        'deleted': bool(fact.deleted),
+    }
+
+
+def _fields_fact(fields, fact_cls):
+    def parse_time(value):
+        return datetime.strptime(value, TIME_FORMAT) if value else None
+
+    activity = None
+    if fields['activity'] is not None:
+        category = None
+        if fields['category'] is not None:
+            category = Category(name=fields['category'])
+        activity = Activity(name=fields['activity'], category=category)
+    return fact_cls(
+        activity=activity,
+        start=parse_time(fields['start']),
+        end=parse_time(fields['end']),
+        pk=fields['pk'],
+        description=fields['description'],
+        tags=[Tag(name=name) for name in fields['tags']],
+        deleted=fields['deleted'],
+    )
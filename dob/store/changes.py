@@ -0,0 +1,290 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""An append-only feed of changes to Facts, for sync scripts and the like.
+
+Rather than rescan the ``facts`` table to find what changed, a consumer can
+remember the sequence number of the last change it saw, and ask for the
+changes since, e.g.,::
+
+    dob store changes --since 1234 --follow
+
+Each insert, update, and delete of a Fact row is appended to the
+``dob_fact_changes`` table by SQLite triggers, so every write path (adding,
+editing, stopping, cancelling, importing, and the Carousel) records its
+changes in the same transaction as the change itself. The sequence number
+is an AUTOINCREMENT key, so it only ever increases, even after compaction.
+
+Note that nark edits a Fact by marking it deleted and inserting a new Fact
+(that's ``split_from`` the old one), so an edit appears as an update and an
+insert. Stopping or deleting a Fact updates it in place.
+
+The table is compacted after commands that save Facts, per the
+``db.changes.retention_days`` and ``db.changes.retention_rows`` settings,
+but only once it's a day, or a tenth of the rows, past its retention.
+"""
+
+import json
+import time
+from gettext import gettext as _
+
+import lazy_import
+
+from dob_bright.termio import click_echo, dob_in_user_warning
+
+# Register the db.changes settings.
+from .. import settings  # noqa: F401 '<>' imported but unused
+
+from .contention import retry_write
+from .schema import ensure_sqlite_schema
+
+__all__ = (
+    'FACT_CHANGES_DDL',
+    'compact_fact_changes',
+    'echo_fact_changes',
+    'ensure_fact_changes',
+    'fact_changes',
+)
+
+# Only consulted after a query fails, by which point SQLAlchemy is loaded.
+sqlalchemy_exc = lazy_import.lazy_module('sqlalchemy.exc')
+
+# How far past its retention the feed grows before it's compacted.
+COMPACTION_SLACK_DAYS = 1
+COMPACTION_SLACK_ROWS_RATIO = 0.1
+
+
+def _change_trigger(event, row):
+    return (
+        'tr_dob_fact_changes_{}'.format(event),
+        'CREATE TRIGGER tr_dob_fact_changes_{event} AFTER {EVENT} ON facts'
+        ' BEGIN'
+        '  INSERT INTO dob_fact_changes ('
+        '   changed_at, op, fact_id, deleted, split_from_id,'
+        '   start_time, end_time, activity_id, description'
+        '  ) VALUES ('
+        "   strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), '{event}', {row}.id,"
+        '   {row}.deleted, {row}.split_from_id, {row}.start_time,'
+        '   {row}.end_time, {row}.activity_id, {row}.description'
+        '  );'
+        ' END'.format(event=event, EVENT=event.upper(), row=row),
+    )
+
+
+FACT_CHANGES_DDL = (
+    (
+        'dob_fact_changes',
+        'CREATE TABLE dob_fact_changes ('
+        ' seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,'
+        ' changed_at TEXT NOT NULL,'
+        ' op TEXT NOT NULL,'
+        ' fact_id INTEGER NOT NULL,'
+        ' deleted BOOLEAN,'
+        ' split_from_id INTEGER,'
+        ' start_time DATETIME,'
+        ' end_time DATETIME,'
+        ' activity_id INTEGER,'
+        ' description TEXT'
+        ')',
+    ),
+    _change_trigger('insert', 'NEW'),
+    _change_trigger('update', 'NEW'),
+    _change_trigger('delete', 'OLD'),
+)
+
+
+def ensure_fact_changes(store):
+    """Create the change feed table and triggers, if missing (SQLite only)."""
+    ensure_sqlite_schema(store, FACT_CHANGES_DDL, _('Fact change feed'))
+
+
+# ***
+
+def fact_changes(store, since=0, batch_size=500):
+    """Yield each change after sequence number ``since``, oldest first, as a dict.
+
+    The activity, category, and tags are looked up when read, one batch at
+    a time; the other Fact fields are as they were after the change (or,
+    for a delete, before it).
+    """
+    def _fact_changes():
+        last_seq = since
+        while True:
+            rows = fetch_batch(last_seq)
+            if not rows:
+                return
+            tags = fetch_tags(set(row['fact_id'] for row in rows))
+            for row in rows:
+                yield change_dict(row, tags.get(row['fact_id'], []))
+            last_seq = rows[-1]['seq']
+
+    def fetch_batch(after_seq):
+        return store.session.execute(
+            'SELECT chg.seq, chg.changed_at, chg.op, chg.fact_id, chg.deleted,'
+            '  chg.split_from_id, chg.start_time, chg.end_time, chg.description,'
+            '  act.name AS activity, cat.name AS category'
+            ' FROM dob_fact_changes AS chg'
+            ' LEFT OUTER JOIN activities AS act ON act.id = chg.activity_id'
+            ' LEFT OUTER JOIN categories AS cat ON cat.id = act.category_id'
+            ' WHERE chg.seq > :after_seq'
+            ' ORDER BY chg.seq'
+            ' LIMIT :batch_size',
+            {'after_seq': after_seq, 'batch_size': batch_size},
+        ).fetchall()
+
+    def fetch_tags(fact_ids):
+        tags = {}
+        rows = store.session.execute(
+            'SELECT fact_tags.fact_id, tags.name'
+            ' FROM fact_tags JOIN tags ON tags.id = fact_tags.tag_id'
+            ' WHERE fact_tags.fact_id IN ({})'
+            ' ORDER BY tags.name'.format(
+                ', '.join(str(int(fact_id)) for fact_id in fact_ids)
+            )
+        )
+        for fact_id, name in rows:
+            tags.setdefault(fact_id, []).append(name)
+        return tags
+
+    def change_dict(row, tags):
+        return {
+            'seq': row['seq'],
+            'changed_at': row['changed_at'],
+            'op': row['op'],
+            'fact_id': row['fact_id'],
+            'deleted': bool(row['deleted']),
+            'split_from': row['split_from_id'],
+            'start': seconds(row['start_time']),
+            'end': seconds(row['end_time']),
+            'activity': row['activity'],
+            'category': row['category'],
+            'tags': tags,
+            'description': row['description'],
+        }
+
+    def seconds(when):
+        # nark stores, e.g., '2020-01-01 12:34:56.000000'.
+        return when[:19] if when else None
+
+    return _fact_changes()
+
+
+def oldest_change_seq(store):
+    return store.session.execute('SELECT MIN(seq) FROM dob_fact_changes').scalar()
+
+
+def echo_fact_changes(controller, since=0, follow=False, interval=1.0):
+    """Print the changes after ``since`` as JSON lines, and maybe keep following."""
+    store = controller.store
+
+    def _echo_fact_changes():
+        try:
+            warn_if_compacted()
+            last_seq = echo_changes(since)
+            while follow:
+                # Do not hold a read transaction between polls.
+                store.session.rollback()
+                time.sleep(interval)
+                last_seq = echo_changes(last_seq)
+        except sqlalchemy_exc.OperationalError as err:
+            # E.g., 'no such table', if the store is not SQLite.
+            dob_in_user_warning(str(err))
+        except KeyboardInterrupt:
+            pass
+
+    def warn_if_compacted():
+        oldest = oldest_change_seq(store)
+        if oldest is not None and since + 1 < oldest:
+            dob_in_user_warning(_(
+                'Changes before #{} were compacted away.'
+            ).format(oldest))
+
+    def echo_changes(last_seq):
+        for change in fact_changes(store, since=last_seq):
+            click_echo(json.dumps(change, sort_keys=True))
+            last_seq = change['seq']
+        return last_seq
+
+    _echo_fact_changes()
+
+
+# ***
+
+def compact_fact_changes(controller):
+    """Delete changes older than the retention settings allow.
+
+    Returns the number of changes deleted. This is best effort: if the
+    store is locked, or has no change feed, nothing is deleted.
+    """
+    retention_days = controller.config['db.changes.retention_days']
+    retention_rows = controller.config['db.changes.retention_rows']
+
+    def _compact_fact_changes():
+        if retention_days <= 0 and retention_rows <= 0:
+            return 0
+        try:
+            if not compaction_due():
+                return 0
+            return retry_write(controller, compact)
+        except sqlalchemy_exc.SQLAlchemyError as err:
+            controller.store.session.rollback()
+            controller.client_logger.debug(
+                _('Did not compact change feed: {}').format(str(err))
+            )
+            return 0
+
+    def compaction_due():
+        # Compacting deletes and commits, which waits on other writers, so
+        # rather than compact after every save, let the feed run a little
+        # past its retention, which a read of either end of the key can tell.
+        n_rows, oldest_stale = controller.store.session.execute(
+            'SELECT MAX(seq) - MIN(seq) + 1,'
+            '  (SELECT changed_at FROM dob_fact_changes ORDER BY seq LIMIT 1)'
+            "   < strftime('%Y-%m-%dT%H:%M:%fZ', 'now', :ago)"
+            ' FROM dob_fact_changes',
+            {'ago': '-{} days'.format(int(retention_days) + COMPACTION_SLACK_DAYS)},
+        ).fetchone()
+        if retention_days > 0 and oldest_stale:
+            return True
+        slack_rows = int(retention_rows * COMPACTION_SLACK_ROWS_RATIO)
+        return retention_rows > 0 and (n_rows or 0) > retention_rows + slack_rows
+
+    def compact():
+        session = controller.store.session
+        deleted = 0
+        if retention_days > 0:
+            # The changes are in time order, so find the oldest to keep by
+            # walking the primary key, and delete everything before it.
+            deleted += session.execute(
+                'DELETE FROM dob_fact_changes WHERE seq < COALESCE('
+                '  (SELECT seq FROM dob_fact_changes'
+                "   WHERE changed_at >= strftime('%Y-%m-%dT%H:%M:%fZ', 'now', :ago)"
+                '   ORDER BY seq LIMIT 1),'
+                '  (SELECT MAX(seq) + 1 FROM dob_fact_changes)'
+                ')',
+                {'ago': '-{} days'.format(int(retention_days))},
+            ).rowcount
+        if retention_rows > 0:
+            deleted += session.execute(
+                'DELETE FROM dob_fact_changes'
+                ' WHERE seq <= (SELECT MAX(seq) FROM dob_fact_changes) - :rows',
+                {'rows': int(retention_rows)},
+            ).rowcount
+        session.commit()
+        return deleted
+
+    return _compact_fact_changes()
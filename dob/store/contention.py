@@ -0,0 +1,188 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Retry writes that find the database locked, and optionally queue writers.
+
+SQLite allows one writer at a time. When several dob processes write at
+once (e.g., from a few terminals, an editor plugin, and a git hook), the
+loser waits out the busy timeout (see ``db.sqlite.busy_timeout``) and then
+fails with "database is locked". Here, such writes are rolled back and
+retried, after a jittered, exponential backoff (``db.sqlite.write_retries``
+and ``db.sqlite.retry_backoff``).
+
+Writers can also take turns using an advisory lock file beside the database
+(``db.sqlite.write_lock``), so that they queue on the lock file rather than
+poll SQLite. The lock is a POSIX ``flock``, and is skipped where that is not
+available.
+
+Each write logs its contention (lock wait, retries, and backoff) at the
+INFO level, i.e., run ``dob --verbose`` to see it.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from gettext import gettext as _
+
+import lazy_import
+
+from .transaction import in_single_transaction
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # E.g., Windows.
+    fcntl = None
+
+__all__ = (
+    'WRITE_CONTENTION',
+    'WriteContention',
+    'is_database_locked',
+    'retry_write',
+    'write_lock',
+    'write_lock_path',
+)
+
+# Only consulted after a write fails, by which point SQLAlchemy is loaded.
+sqlalchemy_exc = lazy_import.lazy_module('sqlalchemy.exc')
+
+
+# The longest any one backoff sleeps, no matter how many retries.
+MAXIMUM_BACKOFF_SECS = 2.0
+
+
+class WriteContention(object):
+    """Running totals of how much writers waited on one another."""
+
+    def __init__(self):
+        self.writes = 0
+        self.retries = 0
+        self.lock_wait = 0.0
+        self.backoff = 0.0
+
+    def __str__(self):
+        return _(
+            '{} write(s), {} retry(s), waited {:.3f}s on lock, {:.3f}s in backoff'
+        ).format(self.writes, self.retries, self.lock_wait, self.backoff)
+
+    def add(self, other):
+        self.writes += other.writes
+        self.retries += other.retries
+        self.lock_wait += other.lock_wait
+        self.backoff += other.backoff
+
+
+# The totals for this process.
+WRITE_CONTENTION = WriteContention()
+
+
+def is_database_locked(err):
+    """Return True if the error is SQLite reporting a locked (busy) database."""
+    if not isinstance(err, sqlalchemy_exc.OperationalError):
+        return False
+    message = str(err.orig).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+# ***
+
+def write_lock_path(controller):
+    """Return the advisory lock file path, or None if not locking."""
+    if not controller.config['db.sqlite.write_lock'] or fcntl is None:
+        return None
+    if controller.config['db.engine'] != 'sqlite':
+        return None
+    db_path = controller.config['db.path']
+    if not db_path or db_path == ':memory:':
+        return None
+    return '{}.lock'.format(db_path)
+
+
+@contextmanager
+def write_lock(controller, contention=None):
+    """Hold the advisory write lock file, if configured, for the block.
+
+    The time spent waiting on the lock is added to ``contention.lock_wait``.
+    """
+    lock_path = write_lock_path(controller)
+    if lock_path is None:
+        yield
+        return
+    began = time.time()
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        if contention is not None:
+            contention.lock_wait += time.time() - began
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+# ***
+
+def retry_write(controller, write):
+    """Call ``write`` (which should commit), and retry it if the db is locked.
+
+    Between tries, the session is rolled back, and the process sleeps for
+    a random time up to the backoff, which doubles with each retry (what's
+    called "full jitter", so that competing writers spread out).
+
+    If already within a ``single_transaction``, ``write`` is simply called,
+    and it's up to whoever opened the transaction to retry the whole thing.
+
+    Because ``write`` may be called again after it fails, it should not
+    depend on anything a failed try changed, e.g., it should save a copy
+    of a Fact, because nark's save changes the Fact it's passed.
+
+    Returns whatever ``write`` returns.
+    """
+    def _retry_write():
+        if in_single_transaction(controller.store):
+            return write()
+        contention = WriteContention()
+        contention.writes = 1
+        try:
+            return write_with_retries(contention)
+        finally:
+            WRITE_CONTENTION.add(contention)
+            controller.client_logger.info(
+                _('Write contention: {}').format(contention)
+            )
+
+    def write_with_retries(contention):
+        retries = max(0, controller.config['db.sqlite.write_retries'])
+        backoff = max(0, controller.config['db.sqlite.retry_backoff']) / 1000.0
+        attempt = 0
+        while True:
+            try:
+                with write_lock(controller, contention):
+                    return write()
+            except Exception as err:
+                if attempt >= retries or not is_database_locked(err):
+                    raise
+                controller.store.session.rollback()
+            delay = random.uniform(0, min(MAXIMUM_BACKOFF_SECS, backoff * 2 ** attempt))
+            controller.client_logger.debug(
+                _('Database locked; retrying write in {:.3f}s').format(delay)
+            )
+            time.sleep(delay)
+            contention.backoff += delay
+            contention.retries += 1
+            attempt += 1
+
+    return _retry_write()
@@ -0,0 +1,87 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Eager loading of the relationships that lists and reports read.
+
+nark maps each Fact's Activity, the Activity's Category, and the Fact's
+Tags as lazy relationships, so hydrating query results (see the items'
+``as_hamster``) runs another query for each Activity, Category, and Fact
+(for its Tags) not already loaded, i.e., the "N+1" query pattern.
+
+Within ``eager_loading``, queries on the store's session for Facts or
+Activities instead load those relationships with one query each, using
+"select IN" loading (which, unlike a joined load, is safe to add to the
+aggregate, i.e., GROUP BY, queries that the usage reports run). So each
+report costs a constant number of queries, regardless of the results.
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import Load, Query
+
+from nark.backends.sqlalchemy.objects import AlchemyActivity, AlchemyFact
+
+__all__ = (
+    'EAGER_RELATIONSHIPS',
+    'eager_loading',
+    # Private:
+    #  '_eager_load_options',
+)
+
+
+# The relationships to load eagerly, as paths from each queried entity.
+EAGER_RELATIONSHIPS = {
+    AlchemyFact: (('activity', 'category'), ('tags',)),
+    AlchemyActivity: (('category',),),
+}
+
+# The session.info key that enables eager loading.
+EAGER_LOADING_KEY = 'dob_eager_loading'
+
+
+@contextmanager
+def eager_loading(controller):
+    """Eager-load the Fact and Activity relationships of queries in the block."""
+    session = controller.store.session
+    enabled = session.info.get(EAGER_LOADING_KEY, False)
+    session.info[EAGER_LOADING_KEY] = True
+    try:
+        yield
+    finally:
+        session.info[EAGER_LOADING_KEY] = enabled
+
+
+@event.listens_for(Query, 'before_compile', retval=True)
+def _eager_load_options(query):
+    session = query.session
+    if session is None or not session.info.get(EAGER_LOADING_KEY, False):
+        return query
+    options = []
+    for column in query.column_descriptions:
+        entity = column['entity']
+        # Skip columns (e.g., aggregates), and aliased entities.
+        if column['expr'] is not entity or column['aliased']:
+            continue
+        for path in EAGER_RELATIONSHIPS.get(entity, ()):
+            loader = Load(entity)
+            for name in path:
+                loader = loader.selectinload(name)
+            options.append(loader)
+    if not options:
+        return query
+    return query.enable_assertions(False).options(*options)
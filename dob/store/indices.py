@@ -0,0 +1,63 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Secondary indices that ``dob`` maintains on the nark data store."""
+
+from gettext import gettext as _
+
+from sqlalchemy import Index, inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+from nark.backends.sqlalchemy.objects import facts
+
+__all__ = (
+    'FACT_INDICES',
+    'ensure_fact_indices',
+)
+
+
+# The nark schema only indexes primary keys. Rather than wait on an upstream
+# migration, dob creates the indices it needs itself, after the store is stood
+# up. Existing indices are skipped, so this is cheap on every run.
+FACT_INDICES = (
+    # Keyset navigation (see dob.store.keyset) seeks and orders on (start, id).
+    Index('ix_dob_facts_start_time_id', facts.c.start_time, facts.c.id),
+)
+
+
+def ensure_fact_indices(store):
+    """Create any missing ``dob`` indices on the ``facts`` table."""
+    def _ensure_fact_indices():
+        bind = store.session.get_bind()
+        existing = existing_index_names(bind)
+        for index in FACT_INDICES:
+            if index.name not in existing:
+                ensure_index(bind, index)
+
+    def existing_index_names(bind):
+        return set(idx['name'] for idx in inspect(bind).get_indexes(facts.name))
+
+    def ensure_index(bind, index):
+        try:
+            index.create(bind=bind)
+        except SQLAlchemyError as err:
+            # E.g., read-only database file. Queries still work, just slower.
+            store.logger.warning(
+                _('Could not create index “{}”: {}').format(index.name, str(err))
+            )
+
+    _ensure_fact_indices()
@@ -0,0 +1,136 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Interning of the Activities, Categories, and Tags that query results share.
+
+nark makes a new Activity and Category for each Fact that it hydrates (see
+the items' ``as_hamster``), and a new Tag for each of each Fact's Tags, and
+each item holds its own copy of its name. So a report on 500,000 Facts holds
+500,000 Activities, even if there are only 300 distinct Activities.
+
+Within ``interning``, the results instead share one object per Activity,
+Category, and Tag (keyed by its pk, or, for the Tags that nark fetches only
+by name, by its name), and the names are interned (see ``sys.intern``).
+
+Because the items are shared, the results are for reading (e.g., reports).
+Do not edit one Fact's Activity, Category, or Tags in place.
+"""
+
+import sys
+from contextlib import contextmanager
+
+from nark.backends.sqlalchemy.objects import (
+    AlchemyActivity,
+    AlchemyCategory,
+    AlchemyFact,
+    AlchemyTag
+)
+from nark.items.tag import Tag
+
+__all__ = (
+    'ItemInterner',
+    'intern_name',
+    'interning',
+)
+
+
+def intern_name(name):
+    """Return the interned name, or None if None."""
+    if name is None:
+        return None
+    return sys.intern(name)
+
+
+class ItemInterner(object):
+    """Hydrates each Activity, Category, and Tag once, and shares it thereafter."""
+
+    def __init__(self):
+        self.activities = {}
+        self.categories = {}
+        self.tags = {}
+        # The Tags that nark fetches by name only (without their pks).
+        self.tags_by_name = {}
+
+    def interned(self, items, key, make_item):
+        try:
+            return items[key]
+        except KeyError:
+            item = make_item()
+            item.name = intern_name(item.name)
+            items[key] = item
+            return item
+
+    def tag_named(self, name):
+        return self.interned(
+            self.tags_by_name, name, lambda: Tag(name=name),
+        )
+
+    def intern_fact_tags(self, tags, set_freqs):
+        # When grouping, nark counts each Tag name, and sets the counts on each
+        # Fact's (new) Tags, so those Tags cannot be shared. But their names can.
+        if set_freqs:
+            return [
+                intern_name(tag) if isinstance(tag, str) else tag for tag in tags
+            ]
+        return [
+            self.tag_named(tag) if isinstance(tag, str) else tag for tag in tags
+        ]
+
+
+@contextmanager
+def interning():
+    """Share the Activities, Categories, and Tags of query results in the block."""
+    interner = ItemInterner()
+
+    def category_as_hamster(self, store):
+        return interner.interned(
+            interner.categories, self.pk,
+            lambda: originals[AlchemyCategory](self, store),
+        )
+
+    def activity_as_hamster(self, store):
+        return interner.interned(
+            interner.activities, self.pk,
+            lambda: originals[AlchemyActivity](self, store),
+        )
+
+    def tag_as_hamster(self, store):
+        return interner.interned(
+            interner.tags, self.pk,
+            lambda: originals[AlchemyTag](self, store),
+        )
+
+    def fact_as_hamster(self, store, tags=None, set_freqs=False):
+        if tags is not None:
+            tags = interner.intern_fact_tags(tags, set_freqs)
+        return originals[AlchemyFact](self, store, tags, set_freqs)
+
+    replacements = {
+        AlchemyCategory: category_as_hamster,
+        AlchemyActivity: activity_as_hamster,
+        AlchemyTag: tag_as_hamster,
+        AlchemyFact: fact_as_hamster,
+    }
+    # (Note the current methods, which --memprofile might have wrapped.)
+    originals = {cls: cls.as_hamster for cls in replacements}
+    for cls, as_hamster in replacements.items():
+        cls.as_hamster = as_hamster
+    try:
+        yield interner
+    finally:
+        for cls, as_hamster in originals.items():
+            cls.as_hamster = as_hamster
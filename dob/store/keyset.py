@@ -0,0 +1,188 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Keyset (seek) navigation of Facts ordered by (start, id).
+
+Rather than page through Facts with OFFSET, which makes the database
+step over every skipped row, keyset navigation remembers the last key
+seen, (start, pk), and asks for the rows just beyond it. Paired with
+the (start_time, id) index (see :mod:`dob.store.indices`), each seek
+is a short index range scan, regardless of the size of the store.
+"""
+
+from sqlalchemy import String, and_, or_, type_coerce
+
+from nark.backends.sqlalchemy.objects import AlchemyFact
+
+__all__ = (
+    'fact_keyset_latest',
+    'fact_keyset_next',
+    'fact_keyset_nth_latest',
+    'fact_keyset_prev',
+    'fact_keyset_seek',
+)
+
+
+# ***
+
+def fact_keyset_seek(
+    controller,
+    start=None,
+    pk=None,
+    forward=False,
+    limit=1,
+    restrict=None,
+    deleted=False,
+):
+    """Return up to ``limit`` Facts adjacent to the (start, pk) key.
+
+    Args:
+        controller: The dob controller, with its store stood up.
+
+        start (datetime.datetime): The start of the reference Fact, or None
+            to seek from the very end (or beginning, if ``forward``).
+
+        pk (int): The ID of the reference Fact, used to break start ties.
+            If None, all Facts that share ``start`` are excluded.
+
+        forward (bool): If True, seek to later Facts, ordered ascending;
+            otherwise seek to earlier Facts, ordered descending.
+
+        limit (int): The maximum number of Facts to return.
+
+        restrict (str): If 'ended', exclude the active Fact;
+            if 'ongoing', only consider the active Fact.
+
+        deleted (bool): Whether to seek deleted Facts instead of real ones.
+
+    Returns:
+        list: The Facts found, nearest to the reference key first.
+    """
+    def _fact_keyset_seek():
+        query = controller.store.session.query(AlchemyFact)
+        query = query_filter_deleted(query)
+        query = query_filter_restrict(query)
+        query = query_filter_keyset(query)
+        query = query_order_by_keyset(query)
+        query = query.limit(limit)
+        return [found.as_hamster(controller.store) for found in query.all()]
+
+    def query_filter_deleted(query):
+        if deleted is None:
+            return query
+        return query.filter(AlchemyFact.deleted == deleted)
+
+    def query_filter_restrict(query):
+        if restrict == 'ended':
+            query = query.filter(AlchemyFact.end != None)  # noqa: E711
+        elif restrict == 'ongoing':
+            query = query.filter(AlchemyFact.end == None)  # noqa: E711
+        else:
+            assert not restrict
+        return query
+
+    def query_filter_keyset(query):
+        if start is None:
+            return query
+        # Compare the raw column, and not func.datetime(start_time) like
+        # the nark FactManager does, otherwise the database cannot use the
+        # index. The leading inclusive range term is redundant with the OR,
+        # but it lets SQLite seek directly to the key, rather than walking
+        # the index from one end and testing each row.
+        # - Because the comparison is textual, bind the key as text, too,
+        #   in both of the formats that a start_time might be stored in.
+        start_text = type_coerce(AlchemyFact.start, String)
+        lowest, highest = _stored_time_bounds(start)
+        if forward:
+            in_range = start_text >= lowest
+            beyond = start_text > highest
+            tiebreak = AlchemyFact.pk > pk if pk is not None else False
+        else:
+            in_range = start_text <= highest
+            beyond = start_text < lowest
+            tiebreak = AlchemyFact.pk < pk if pk is not None else False
+        return query.filter(and_(in_range, or_(beyond, tiebreak)))
+
+    def query_order_by_keyset(query):
+        if forward:
+            return query.order_by(AlchemyFact.start.asc(), AlchemyFact.pk.asc())
+        return query.order_by(AlchemyFact.start.desc(), AlchemyFact.pk.desc())
+
+    return _fact_keyset_seek()
+
+
+# ***
+
+def fact_keyset_prev(controller, fact):
+    """Return the Fact that starts just before ``fact``, or None."""
+    return _first_or_none(
+        fact_keyset_seek(controller, start=fact.start, pk=fact.pk, forward=False)
+    )
+
+
+def fact_keyset_next(controller, fact):
+    """Return the Fact that starts just after ``fact``, or None."""
+    return _first_or_none(
+        fact_keyset_seek(controller, start=fact.start, pk=fact.pk, forward=True)
+    )
+
+
+def fact_keyset_latest(controller, restrict=None):
+    """Return the latest Fact (by start), or None if the store is empty."""
+    return _first_or_none(fact_keyset_seek(controller, restrict=restrict))
+
+
+def fact_keyset_nth_latest(controller, nth):
+    """Return the nth latest Fact, where nth=1 is the latest Fact, or None."""
+    def _fact_keyset_nth_latest():
+        assert nth > 0
+        key = query_nth_key()
+        if key is None:
+            return None
+        return hydrate_fact(key.pk)
+
+    def query_nth_key():
+        # Select only the key columns, so the OFFSET walks the (start_time, id)
+        # index, and nothing gets hydrated along the way. The index does not
+        # cover the deleted filter, so each row skipped still costs a lookup
+        # by rowid, but nth is a relative edit key the user typed, e.g., -3.
+        query = controller.store.session.query(AlchemyFact.start, AlchemyFact.pk)
+        query = query.filter(AlchemyFact.deleted == False)  # noqa: E712
+        query = query.order_by(AlchemyFact.start.desc(), AlchemyFact.pk.desc())
+        return query.offset(nth - 1).limit(1).first()
+
+    def hydrate_fact(pk):
+        found = controller.store.session.query(AlchemyFact).get(pk)
+        return found.as_hamster(controller.store)
+
+    return _fact_keyset_nth_latest()
+
+
+def _first_or_none(found):
+    return found[0] if found else None
+
+
+def _stored_time_bounds(when):
+    # SQLAlchemy stores SQLite datetimes with microseconds, but Facts from
+    # legacy (hamster) stores may be stored without, e.g., '2020-01-01 10:00:00'
+    # as well as '2020-01-01 10:00:00.000000'. These compare unequal as text,
+    # so return the lowest and highest text that each stand for ``when``.
+    when = when.replace(tzinfo=None)
+    highest = when.isoformat(sep=' ', timespec='microseconds')
+    if when.microsecond:
+        return highest, highest
+    return when.isoformat(sep=' ', timespec='seconds'), highest
@@ -0,0 +1,153 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""dob's item managers, which extend nark's with the hooks that dob's queries use.
+
+``install_dob_managers`` replaces the store's Activity, Category, Tag, and
+Fact managers with these subclasses, which behave the same as nark's, but:
+
+- Within ``fact_spans`` (see dob.store.spans), each manager filters by time
+  on the span table's epochs, and the usage managers sum its durations.
+
+- ``DobFactManager.get_all`` accepts a ``gatherer``, which it calls in place
+  of nark's ``gather``, after nark parses and checks the query terms (see
+  dob.store.projection).
+
+- ``DobFactManager.prepare_query`` returns the query that ``get_all`` would
+  run, without running it (see dob.store.streaming).
+"""
+
+from nark.backends.sqlalchemy.managers.activity import ActivityManager
+from nark.backends.sqlalchemy.managers.category import CategoryManager
+from nark.backends.sqlalchemy.managers.fact import FactManager
+from nark.backends.sqlalchemy.managers.tag import TagManager
+
+from .spans import (
+    fact_spans_active,
+    query_filter_by_span_times,
+    query_join_fact_spans,
+    span_aggregate_cols
+)
+
+__all__ = (
+    'DobActivityManager',
+    'DobCategoryManager',
+    'DobFactManager',
+    'DobTagManager',
+    'FactSpansManagerMixin',
+    'UsageSpansManagerMixin',
+    'install_dob_managers',
+    # Private:
+    #  '_PreparedQuery',
+)
+
+
+# The session.info key that has query_prepared_trace stop nark's gather.
+PREPARED_QUERY_KEY = 'dob_prepared_query'
+
+
+class _PreparedQuery(Exception):
+    """Carries the prepared query out of nark's gather, before nark runs it."""
+
+    def __init__(self, query):
+        super(_PreparedQuery, self).__init__()
+        self.query = query
+
+
+class FactSpansManagerMixin(object):
+    """Filters by time on the span table, within ``fact_spans``."""
+
+    def query_filter_by_fact_times(
+        self, query, since=None, until=None, endless=False, partial=False,
+    ):
+        if not fact_spans_active(self.store):
+            return super(FactSpansManagerMixin, self).query_filter_by_fact_times(
+                query, since, until, endless, partial,
+            )
+        return query_filter_by_span_times(query, since, until, endless, partial)
+
+
+class UsageSpansManagerMixin(FactSpansManagerMixin):
+    """Also sums the span table's durations for the usage 'span', in ``fact_spans``."""
+
+    def _gather_query_start_aggregate(self, qt, agg_cols):
+        spans_cols = fact_spans_active(self.store) and span_aggregate_cols(agg_cols)
+        query = super(UsageSpansManagerMixin, self)._gather_query_start_aggregate(
+            qt, agg_cols,
+        )
+        if not spans_cols:
+            return query
+        return query_join_fact_spans(query)
+
+
+class DobActivityManager(UsageSpansManagerMixin, ActivityManager):
+    """nark's ActivityManager, with dob's hooks."""
+
+
+class DobCategoryManager(UsageSpansManagerMixin, CategoryManager):
+    """nark's CategoryManager, with dob's hooks."""
+
+
+class DobTagManager(UsageSpansManagerMixin, TagManager):
+    """nark's TagManager, with dob's hooks."""
+
+
+class DobFactManager(FactSpansManagerMixin, FactManager):
+    """nark's FactManager, with dob's hooks."""
+
+    def gather(self, query_terms, lazy_tags=False, gatherer=None):
+        if gatherer is not None:
+            return gatherer(query_terms)
+        return super(DobFactManager, self).gather(query_terms, lazy_tags=lazy_tags)
+
+    def prepare_query(self, query_terms):
+        """Returns the Fact query that ``get_all`` would run, without running it.
+
+        nark builds and runs its query in one go, but it calls
+        ``query_prepared_trace`` in between, so stop nark there, and
+        take the query from it. If nark ever runs its query without
+        first calling the trace, raise rather than return its results.
+        """
+        info = self.store.session.info
+        info[PREPARED_QUERY_KEY] = True
+        try:
+            self.get_all(query_terms=query_terms)
+        except _PreparedQuery as prepared:
+            return prepared.query
+        finally:
+            del info[PREPARED_QUERY_KEY]
+        raise NotImplementedError(
+            'nark ran its Fact query without calling query_prepared_trace'
+        )
+
+    def query_prepared_trace(self, query):
+        # Log the query as usual (which compiles it) before taking it.
+        super(DobFactManager, self).query_prepared_trace(query)
+        if self.store.session.info.get(PREPARED_QUERY_KEY):
+            raise _PreparedQuery(query)
+
+
+# ***
+
+def install_dob_managers(store):
+    """Replaces the store's item managers with dob's, unless already done."""
+    if isinstance(store.facts, DobFactManager):
+        return
+    store.categories = DobCategoryManager(store)
+    store.activities = DobActivityManager(store)
+    store.tags = DobTagManager(store)
+    store.facts = DobFactManager(store, localize=store.config['time.tz_aware'])
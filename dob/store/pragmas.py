@@ -0,0 +1,105 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""SQLite PRAGMAs that ``dob`` applies to each data store connection."""
+
+from collections import OrderedDict
+
+import lazy_import
+
+__all__ = (
+    'SQLITE_PRAGMAS',
+    'apply_sqlite_pragmas',
+    'install_sqlite_pragmas',
+    'query_sqlite_pragmas',
+    'sqlite_pragmas',
+)
+
+# Only needed once an engine is made, and engines load SQLAlchemy anyway.
+event_listen = lazy_import.lazy_callable('sqlalchemy.event.listen')
+
+
+# The ``db.sqlite`` settings, in the order they're applied. The page size is
+# first, because it only takes effect before the first table is created, and
+# switching the journal to WAL writes to the database.
+SQLITE_PRAGMAS = (
+    'page_size',
+    'journal_mode',
+    'synchronous',
+    'cache_size',
+    'mmap_size',
+    'temp_store',
+    'busy_timeout',
+)
+
+
+def sqlite_pragmas(config):
+    """Return an ordered mapping of the configured (non-default) PRAGMAs.
+
+    Returns an empty mapping if the store is not SQLite.
+    """
+    pragmas = OrderedDict()
+    if config['db.engine'] != 'sqlite':
+        return pragmas
+    for name in SQLITE_PRAGMAS:
+        value = config['db.sqlite.{}'.format(name)]
+        # Both '' and 0 mean leave SQLite's default alone.
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Run each PRAGMA on the raw DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(store, pragmas):
+    """Arrange for the store's engine to apply ``pragmas`` on every connect.
+
+    Call before the store is stood up: The engine is wrapped as it's made,
+    so even the connection that creates a new database file is configured
+    (which is when ``page_size`` counts).
+    """
+    if not pragmas:
+        return
+
+    create_storage_engine = store.create_storage_engine
+
+    def _create_storage_engine():
+        engine = create_storage_engine()
+        event_listen(engine, 'connect', on_connect)
+        return engine
+
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    store.create_storage_engine = _create_storage_engine
+
+
+def query_sqlite_pragmas(store):
+    """Return an ordered mapping of each PRAGMA's value in effect on the store."""
+    bind = store.session.get_bind()
+    return OrderedDict(
+        (name, bind.execute('PRAGMA {}'.format(name)).scalar())
+        for name in SQLITE_PRAGMAS
+    )
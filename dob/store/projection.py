@@ -0,0 +1,328 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Projected, read-only Fact rows for reports that only read Fact fields.
+
+nark's ``FactManager.get_all`` selects every Fact column and hydrates each
+record twice over, first as an ``AlchemyFact``, and then as a ``Fact`` (or
+``FactDressed``), including its Activity, Category, and Tag objects. But the
+simple export writers (CSV, TSV, JSON, and XML) and the table tabulator only
+read a few fields from each Fact, and call a few formatting methods.
+
+``gather_fact_rows`` instead selects just those columns, joining the Activity
+and Category names (and, if asked, the Tag names), and wraps each record in a
+``FactRow``, a small ``__slots__`` object that supports the same read-only
+interface that those writers use.
+"""
+
+from collections import namedtuple
+
+from sqlalchemy import case, distinct, func
+from sqlalchemy.sql.expression import or_
+
+from nark.backends.sqlalchemy.managers import (
+    query_apply_limit_offset,
+    query_apply_true_or_not,
+    query_prepare_datetime,
+    query_sort_order_at_index
+)
+from nark.backends.sqlalchemy.objects import (
+    AlchemyActivity,
+    AlchemyCategory,
+    AlchemyFact,
+    AlchemyTag,
+    fact_tags
+)
+from nark.helpers import format_time
+
+from .interning import intern_name
+from .spans import epoch_of, fact_spans_ready, fact_spans_table
+
+__all__ = (
+    'FACT_ROWS_FORMATS',
+    'FACT_ROWS_SORT_COLS',
+    'FactRow',
+    'TagRow',
+    'fact_rows_supported',
+    'gather_fact_rows',
+)
+
+
+# The output formats whose writers only read FactRow attributes.
+FACT_ROWS_FORMATS = ('csv', 'json', 'table', 'tsv', 'xml')
+
+# The sort options that order by a Fact's own (or its names') columns.
+# (The 'day' and 'tag' sorts need nark's aggregate columns and Tags join.)
+FACT_ROWS_SORT_COLS = ('activity', 'category', 'fact', 'name', 'start', 'time', 'usage')
+
+# The same separator that nark uses to group_concat Tag names.
+TAG_NAMES_SEP = '%%%%,%%%%'
+
+
+# ***
+
+TagRow = namedtuple('TagRow', ('name', 'pk', 'freq'))
+
+
+class FactRow(object):
+    """A read-only Fact, with just the fields that the report writers read."""
+
+    __slots__ = (
+        'pk',
+        'start',
+        'end',
+        'activity_name',
+        'category_name',
+        'description',
+        'deleted',
+        'tags',
+        'time_now',
+    )
+
+    def __init__(
+        self,
+        pk,
+        start,
+        end,
+        activity_name,
+        category_name,
+        description,
+        deleted,
+        tags=(),
+        time_now=None,
+    ):
+        self.pk = pk
+        self.start = start
+        self.end = end
+        self.activity_name = activity_name or ''
+        self.category_name = category_name or ''
+        self.description = description or None
+        self.deleted = bool(deleted)
+        self.tags = tags
+        self.time_now = time_now
+
+    def __repr__(self):
+        return 'FactRow(pk={}, start={}, end={}, activity={}@{})'.format(
+            self.pk, self.start, self.end, self.activity_name, self.category_name,
+        )
+
+    @property
+    def description_or_empty(self):
+        return self.description or ''
+
+    def start_fmt(self, datetime_format='%Y-%m-%d %H:%M:%S'):
+        return self.start.strftime(datetime_format) if self.start else ''
+
+    def end_fmt(self, datetime_format='%Y-%m-%d %H:%M:%S'):
+        return self.end.strftime(datetime_format) if self.end else ''
+
+    def delta(self):
+        return (self.end or self.time_now) - self.start
+
+    def format_delta(self, style='%M', **kwargs):
+        return format_time.format_delta(self.delta(), style=style, **kwargs)
+
+    def oid_actegory(self):
+        return '{}@{}'.format(self.activity_name, self.category_name)
+
+
+# ***
+
+def fact_rows_supported(controller, query_terms, output_format):
+    """Whether the query and output format can use FactRows instead of Facts.
+
+    FactRows are not used for aggregate (grouped, or with stats) results,
+    nor when the query needs to match (or sort on) Tags, or to broadly
+    match search terms (which includes Tag names), nor for the output
+    formats that use other Fact (or FactDressed) methods. Like nark's
+    ``get_all``, they also rely on SQLite functions.
+    """
+    qt = query_terms
+    return (
+        controller.config['db.engine'] == 'sqlite'
+        and output_format in FACT_ROWS_FORMATS
+        and not qt.is_grouped
+        and not qt.include_stats
+        and not qt.count_results
+        and not qt.match_tags
+        and not (qt.search_terms and qt.broad_match)
+        and all(sort_col in FACT_ROWS_SORT_COLS for sort_col in qt.sort_cols or [])
+    )
+
+
+def gather_fact_rows(controller, query_terms, with_tags=False, yield_per=None):
+    """Return a FactRow for each Fact that matches the (simple) query terms.
+
+    Args:
+        controller: The dob controller, with its store stood up.
+
+        query_terms (nark.managers.query_terms.QueryTerms): The query,
+            for which ``fact_rows_supported`` must be True.
+
+        with_tags (bool): Whether to also fetch each Fact's Tag names.
+            Otherwise, each FactRow's ``tags`` is empty.
+
+        yield_per (int, optional): If set, fetch this many records at a time,
+            and return a generator of FactRows, rather than a list.
+
+    Returns:
+        list: The matching FactRows, ordered per the query's sort options.
+    """
+    qt = query_terms
+    manager = controller.facts
+
+    def _gather_fact_rows():
+        # Run the query through nark's get_all, which parses and checks the
+        # since and until terms, but have it call this module's gather (see
+        # dob.store.managers).
+        return manager.get_all(query_terms=qt, gatherer=gather)
+
+    def gather(_qt):
+        # (nark passes the same qt, after parsing its since and until.)
+        query = controller.store.session.query(*select_columns())
+        query = query.outerjoin(AlchemyFact.activity)
+        query = query.outerjoin(AlchemyActivity.category)
+        query = query_join_tags(query)
+        query = query_join_spans(query)
+        # Like nark, group by Fact, which collapses the Tags join, if any,
+        # and which the 'usage' sort (by each group's Fact count) expects.
+        query = query.group_by(AlchemyFact.pk)
+        query = manager.query_filter_by_fact_times(
+            query, qt.since, qt.until, qt.endless, qt.partial,
+        )
+        query = manager.query_filter_by_activities(query, qt)
+        query = manager.query_filter_by_categories(query, qt)
+        query = query_filter_by_search_terms(query)
+        query = manager.query_filter_by_item_pk(query, AlchemyFact, qt.key)
+        query = query_apply_true_or_not(query, AlchemyFact.deleted, qt.deleted)
+        query = query_filter_by_ongoing(query)
+        query = manager.query_order_by_sort_cols(
+            query, qt, True, span_cols(), None, None,
+        )
+        query = query_order_by_ties(query)
+        query = query_apply_limit_offset(query, qt.limit, qt.offset)
+        manager.query_prepared_trace(query)
+        time_now = controller.store.now
+        # Share one TagRow per Tag name, like ``interning`` does for Tags.
+        tag_rows = {}
+        if yield_per:
+            return (
+                fact_row(record, time_now, tag_rows)
+                for record in query.yield_per(yield_per)
+            )
+        return [fact_row(record, time_now, tag_rows) for record in query.all()]
+
+    def select_columns():
+        columns = [
+            AlchemyFact.pk,
+            AlchemyFact.start,
+            AlchemyFact.end,
+            AlchemyActivity.name,
+            AlchemyCategory.name,
+            AlchemyFact.description,
+            AlchemyFact.deleted,
+        ]
+        if with_tags:
+            columns.append(func.group_concat(AlchemyTag.name, TAG_NAMES_SEP))
+        return columns
+
+    def query_join_tags(query):
+        if not with_tags:
+            return query
+        query = query.outerjoin(fact_tags, AlchemyFact.pk == fact_tags.c.fact_id)
+        return query.outerjoin(AlchemyTag)
+
+    def query_join_spans(query):
+        if not fact_spans_ready(controller.store):
+            return query
+        return query.outerjoin(
+            fact_spans_table, fact_spans_table.c.fact_id == AlchemyFact.pk,
+        )
+
+    def span_cols():
+        # The aggregate columns that nark's FactManager sorts 'time' and 'usage'
+        # on (see its RESULT_GRP_INDEX), which are only used in the ORDER BY.
+        # - Each group is one Fact, so use its duration, and not the sum
+        #   (which would count the Fact once per Tag, if Tags are joined).
+        group_count_col = func.count(distinct(AlchemyFact.pk))
+        return [duration_col(), group_count_col, None, None]
+
+    def duration_col():
+        if fact_spans_ready(controller.store):
+            # The stored duration, or, for the active Fact, until now.
+            return func.coalesce(
+                fact_spans_table.c.duration,
+                epoch_of(controller.store.now) - fact_spans_table.c.start_epoch,
+            )
+        endornow_col = case(
+            [(AlchemyFact.end != None, AlchemyFact.end)],  # noqa: E711
+            else_=query_prepare_datetime(controller.store.now),
+        )
+        return func.julianday(endornow_col) - func.julianday(AlchemyFact.start)
+
+    def query_order_by_ties(query):
+        # nark leaves ties unordered, e.g., every ungrouped Fact's 'usage' is 1,
+        # and SQLite happens to return them (given nark's query plan) in start
+        # order, in the direction of the first sort. Make that explicit.
+        if 'start' in (qt.sort_cols or []):
+            return query
+        direction = query_sort_order_at_index(qt.sort_orders, 0)
+        return manager.query_order_by_start(query, direction)
+
+    def query_filter_by_search_terms(query):
+        if not qt.search_terms:
+            return query
+        # Like nark, match any of the terms, but (unless broad_match,
+        # which fact_rows_supported excludes) only on the description.
+        return query.filter(or_(*[
+            AlchemyFact.description.ilike('%{}%'.format(term))
+            for term in qt.search_terms
+        ]))
+
+    def query_filter_by_ongoing(query):
+        if not qt.exclude_ongoing:
+            return query
+        return query.filter(AlchemyFact.end != None)  # noqa: E711
+
+    def fact_row(record, time_now, tag_rows):
+        tags = ()
+        if with_tags:
+            *record, tag_names = record
+            tags = [
+                tag_row(name, tag_rows)
+                for name in (tag_names.split(TAG_NAMES_SEP) if tag_names else [])
+            ]
+        pk, start, end, activity_name, category_name, *record = record
+        return FactRow(
+            pk,
+            start,
+            end,
+            intern_name(activity_name),
+            intern_name(category_name),
+            *record,
+            tags=tags,
+            time_now=time_now,
+        )
+
+    def tag_row(name, tag_rows):
+        try:
+            return tag_rows[name]
+        except KeyError:
+            tag_rows[name] = TagRow(intern_name(name), None, 1)
+            return tag_rows[name]
+
+    return _gather_fact_rows()
@@ -0,0 +1,70 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Create the SQLite tables and triggers that ``dob`` adds to the nark store."""
+
+from gettext import gettext as _
+
+import lazy_import
+
+__all__ = (
+    'ensure_sqlite_schema',
+)
+
+# Only consulted after DDL fails, by which point SQLAlchemy is loaded.
+sqlalchemy_exc = lazy_import.lazy_module('sqlalchemy.exc')
+
+
+def ensure_sqlite_schema(store, named_ddl, what):
+    """Run each ``(name, ddl)`` statement whose object is missing (SQLite only).
+
+    All missing objects are made in one transaction. If they cannot be made
+    (e.g., the database file is read-only), a warning naming ``what`` is
+    logged, and the store works as before, just without the extra objects.
+
+    Returns False if the store is not SQLite, or if the DDL failed.
+    """
+    def _ensure_sqlite_schema():
+        bind = store.session.get_bind()
+        if bind.dialect.name != 'sqlite':
+            return False
+        existing = existing_names(bind)
+        missing = [ddl for name, ddl in named_ddl if name not in existing]
+        if not missing:
+            return True
+        return create_missing(bind, missing)
+
+    def existing_names(bind):
+        names = ', '.join("'{}'".format(name) for name, _ddl in named_ddl)
+        rows = bind.execute(
+            'SELECT name FROM sqlite_master WHERE name IN ({})'.format(names)
+        )
+        return set(row[0] for row in rows)
+
+    def create_missing(bind, missing):
+        try:
+            with bind.begin() as conn:
+                for ddl in missing:
+                    conn.execute(ddl)
+        except sqlalchemy_exc.SQLAlchemyError as err:
+            store.logger.warning(
+                _('Could not create {}: {}').format(what, str(err))
+            )
+            return False
+        return True
+
+    return _ensure_sqlite_schema()
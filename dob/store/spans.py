@@ -0,0 +1,260 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Integer epoch and duration columns for Facts, for index-driven time queries.
+
+nark stores each Fact's start and end as text. It filters on time windows
+with, e.g., ``datetime(start_time) >= ?``, which cannot use an index, and
+it sums durations with ``julianday(end_time) - julianday(start_time)``,
+which it evaluates for every row.
+
+So dob keeps a side table, ``dob_fact_spans``, with each Fact's start and
+end as integer epoch seconds, and its duration in seconds (NULL while the
+Fact is active), each indexed. (The epochs count from 1970-01-01 in the
+store's own time, which is all that comparing and subtracting them needs.)
+SQLite triggers on the ``facts`` table keep the rows in sync on every save,
+like dob.store.versions, and the rows for existing Facts are filled in
+when the table is made.
+
+Within ``fact_spans``, dob's managers (see dob.store.managers) filter time
+windows on the epoch indices, and the usage aggregates sum the stored
+durations. The projected Fact rows (see dob.store.projection) also sort on
+them by 'time'.
+"""
+
+from contextlib import contextmanager
+from gettext import gettext as _
+
+from sqlalchemy import Column, Integer, MetaData, Table, and_, cast, func, select
+from sqlalchemy.sql.expression import or_
+
+from nark.backends.sqlalchemy.managers import query_prepare_datetime
+from nark.backends.sqlalchemy.objects import AlchemyFact
+
+from .schema import ensure_sqlite_schema
+
+__all__ = (
+    'FACT_SPANS_DDL',
+    'FACT_SPANS_FILL_SQL',
+    'FACT_SPANS_KEY',
+    'SECONDS_PER_DAY',
+    'ensure_fact_spans',
+    'epoch_of',
+    'fact_spans',
+    'fact_spans_active',
+    'fact_spans_ready',
+    'fact_spans_table',
+    'query_filter_by_span_times',
+    'query_join_fact_spans',
+    'span_aggregate_cols',
+    # Private:
+    #  '_epoch_sql',
+    #  '_span_upsert_trigger',
+)
+
+
+SECONDS_PER_DAY = 86400.0
+
+# The session.info key that enables the span table queries.
+FACT_SPANS_KEY = 'dob_fact_spans'
+
+# The store's (SQLite) epoch seconds of a datetime column or value.
+_EPOCH_SQL = "CAST(strftime('%s', {}) AS INTEGER)"
+
+
+def _epoch_sql(column):
+    return _EPOCH_SQL.format(column)
+
+
+def _span_upsert_trigger(event, columns=''):
+    return (
+        'tr_dob_fact_spans_{}'.format(event),
+        'CREATE TRIGGER tr_dob_fact_spans_{event} AFTER {EVENT}{columns} ON facts'
+        ' BEGIN'
+        '  INSERT OR REPLACE INTO dob_fact_spans'
+        '   (fact_id, start_epoch, end_epoch, duration)'
+        '  VALUES (NEW.id, {start}, {end}, {end} - {start});'
+        ' END'.format(
+            event=event,
+            EVENT=event.upper(),
+            columns=columns,
+            start=_epoch_sql('NEW.start_time'),
+            end=_epoch_sql('NEW.end_time'),
+        ),
+    )
+
+
+# Fills in the span of every Fact (e.g., after a bulk load without triggers).
+FACT_SPANS_FILL_SQL = (
+    'INSERT OR REPLACE INTO dob_fact_spans'
+    ' (fact_id, start_epoch, end_epoch, duration)'
+    ' SELECT id, {start}, {end}, {end} - {start} FROM facts'.format(
+        start=_epoch_sql('start_time'),
+        end=_epoch_sql('end_time'),
+    )
+)
+
+
+FACT_SPANS_DDL = (
+    (
+        'dob_fact_spans',
+        'CREATE TABLE dob_fact_spans ('
+        ' fact_id INTEGER NOT NULL PRIMARY KEY,'
+        ' start_epoch INTEGER,'
+        ' end_epoch INTEGER,'
+        ' duration INTEGER'
+        ')',
+    ),
+    # The migration: When (and only when) the table is made, fill it in.
+    ('dob_fact_spans', FACT_SPANS_FILL_SQL),
+    (
+        'ix_dob_fact_spans_start_epoch',
+        'CREATE INDEX ix_dob_fact_spans_start_epoch ON dob_fact_spans (start_epoch)',
+    ),
+    (
+        'ix_dob_fact_spans_end_epoch',
+        'CREATE INDEX ix_dob_fact_spans_end_epoch ON dob_fact_spans (end_epoch)',
+    ),
+    (
+        'ix_dob_fact_spans_duration',
+        'CREATE INDEX ix_dob_fact_spans_duration ON dob_fact_spans (duration)',
+    ),
+    _span_upsert_trigger('insert'),
+    _span_upsert_trigger('update', ' OF start_time, end_time'),
+    (
+        'tr_dob_fact_spans_delete',
+        'CREATE TRIGGER tr_dob_fact_spans_delete AFTER DELETE ON facts'
+        ' BEGIN'
+        '  DELETE FROM dob_fact_spans WHERE fact_id = OLD.id;'
+        ' END',
+    ),
+)
+
+# For building queries (but not for creating the table; see FACT_SPANS_DDL).
+fact_spans_table = Table(
+    'dob_fact_spans',
+    MetaData(),
+    Column('fact_id', Integer, primary_key=True),
+    Column('start_epoch', Integer),
+    Column('end_epoch', Integer),
+    Column('duration', Integer),
+)
+
+
+def ensure_fact_spans(store):
+    """Create (and fill in) the span table and triggers, if missing (SQLite only)."""
+    store.dob_fact_spans = ensure_sqlite_schema(
+        store, FACT_SPANS_DDL, _('Fact spans'),
+    )
+
+
+def fact_spans_ready(store):
+    """Return True if ``ensure_fact_spans`` made (or found) the span table."""
+    return getattr(store, 'dob_fact_spans', False)
+
+
+def epoch_of(when):
+    """Return a SQL expression for the epoch seconds of the datetime (or string)."""
+    return cast(func.strftime('%s', query_prepare_datetime(when)), Integer)
+
+
+# ***
+
+@contextmanager
+def fact_spans(controller):
+    """Use the span table for the time filters and usage spans of queries in the block.
+
+    The block runs as usual if the store has no span table (or if it lacks
+    dob's managers, which consult the span table; see dob.store.managers).
+    """
+    info = controller.store.session.info
+    enabled = info.get(FACT_SPANS_KEY, False)
+    info[FACT_SPANS_KEY] = fact_spans_ready(controller.store)
+    try:
+        yield
+    finally:
+        info[FACT_SPANS_KEY] = enabled
+
+
+def fact_spans_active(store):
+    """Return True within ``fact_spans``, if the store has a span table."""
+    return store.session.info.get(FACT_SPANS_KEY, False)
+
+
+def query_filter_by_span_times(
+    query, since=None, until=None, endless=False, partial=False,
+):
+    """Like nark's ``query_filter_by_fact_times``, but on the epochs.
+
+    E.g., nark's ``datetime(start_time) >= since`` is ``start_epoch >= since``,
+    because both truncate to the second.
+    """
+    start, end = fact_spans_table.c.start_epoch, fact_spans_table.c.end_epoch
+    criteria = []
+    if partial:
+        if since and not until:
+            since = epoch_of(since)
+            criteria.append(or_(start >= since, end >= since))
+        elif not since and until:
+            until = epoch_of(until)
+            criteria.append(or_(start <= until, end <= until))
+        elif since and until:
+            since, until = epoch_of(since), epoch_of(until)
+            criteria.append(or_(
+                and_(start >= since, start <= until),
+                and_(end >= since, end <= until),
+            ))
+    else:
+        if since:
+            criteria.append(start >= epoch_of(since))
+        if until:
+            criteria.append(end <= epoch_of(until))
+        elif endless:
+            query = query.filter(AlchemyFact.end == None)  # noqa: E711
+    if not criteria:
+        return query
+    # Seek on the span indices, then look up each Fact by its PK.
+    # (And never correlate, should the query join the span table, too.)
+    return query.filter(AlchemyFact.pk.in_(
+        select([fact_spans_table.c.fact_id]).where(and_(*criteria)).correlate(None)
+    ))
+
+
+def span_aggregate_cols(agg_cols):
+    """Swap nark's 'span' aggregate for the sum of the stored durations.
+
+    nark sums each Fact's julianday() difference; the stored durations sum
+    the same, in the same unit (days). Returns True if there was a 'span'.
+    The query must then join the span table (see ``query_join_fact_spans``).
+    """
+    spans_idx = next(
+        (idx for idx, col in enumerate(agg_cols) if col.name == 'span'), None,
+    )
+    if spans_idx is None:
+        return False
+    # (nark reads the same list when it sorts, so replace in place.)
+    agg_cols[spans_idx] = (
+        func.sum(fact_spans_table.c.duration) / SECONDS_PER_DAY
+    ).label('span')
+    return True
+
+
+def query_join_fact_spans(query):
+    """Join each Fact's row from the span table."""
+    return query.outerjoin(
+        fact_spans_table, fact_spans_table.c.fact_id == AlchemyFact.pk,
+    )
@@ -0,0 +1,118 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Streamed, row-by-row Fact query results, for reports that write as they go.
+
+nark's ``FactManager.get_all`` runs its query with ``query.all()``, and then
+hydrates every record into a list, before it returns. So a report holds all
+its results in memory before it writes the first line.
+
+``prepare_fact_query`` instead has nark build the query (with all its
+filtering, grouping, and sorting), but takes the query before nark runs it.
+``stream_fact_results`` then runs that query, fetching a batch of records at
+a time, and hydrates and yields each result the same as ``get_all`` would,
+i.e., each is a Fact, or, if ``include_stats``, a list of the Fact and its
+aggregate columns (see nark's ``RESULT_GRP_INDEX``).
+
+``fact_durations_query`` selects just each result's duration from the same
+query, for reports that scale or align their output against every result
+(e.g., sparklines), before they write the first one.
+
+``stream_fact_rows`` similarly streams the lightweight FactRows (see
+``dob.store.projection``) for reports that only read Fact fields.
+"""
+
+from nark.backends.sqlalchemy.managers.fact import FactManager
+
+from .projection import TAG_NAMES_SEP, gather_fact_rows
+
+__all__ = (
+    'STREAM_BATCH_SIZE',
+    'fact_durations_query',
+    'prepare_fact_query',
+    'stream_fact_results',
+    'stream_fact_rows',
+)
+
+
+# The number of records to fetch from the cursor at a time.
+STREAM_BATCH_SIZE = 500
+
+
+def prepare_fact_query(controller, query_terms):
+    """Returns the Fact query that nark's ``get_all`` would run, without running it.
+
+    See ``DobFactManager.prepare_query`` (in dob.store.managers).
+    """
+    return controller.facts.prepare_query(query_terms)
+
+
+def stream_fact_results(controller, query, query_terms):
+    """Yields each result of the prepared query, hydrated as nark's get_all would.
+
+    Assumes that nark fetched the Tag names with the query (i.e., the
+    ``get_all`` default, not ``lazy_tags``), as the final column.
+    """
+    qt = query_terms
+
+    i_activities = FactManager.RESULT_GRP_INDEX['activities']
+    i_actegories = FactManager.RESULT_GRP_INDEX['actegories']
+    i_categories = FactManager.RESULT_GRP_INDEX['categories']
+
+    def _stream_fact_results():
+        for record in query.yield_per(STREAM_BATCH_SIZE):
+            yield hydrate_result(record)
+
+    def hydrate_result(record):
+        alchemy_fact, *cols = record
+        tag_names = cols.pop()
+        tag_names = tag_names.split(TAG_NAMES_SEP) if tag_names else []
+        fact = alchemy_fact.as_hamster(
+            controller.store, tag_names, set_freqs=qt.is_grouped,
+        )
+        if not qt.include_stats:
+            return fact
+        for index in (i_activities, i_actegories, i_categories):
+            reduce_aggregate_names(cols, index)
+        return [fact] + cols
+
+    def reduce_aggregate_names(cols, index):
+        # nark uses 0 in place of a group_concat that it did not select,
+        # and group_concat is None if all the values were None.
+        if cols[index] == 0:
+            return
+        names = cols[index]
+        cols[index] = set(names.split(TAG_NAMES_SEP)) if names else ''
+
+    return _stream_fact_results()
+
+
+def fact_durations_query(query):
+    """Returns the prepared query, selecting just each result's duration (in days)."""
+    # Select just the 'duration' aggregate, but otherwise the same query.
+    duration = next(
+        column['expr'] for column in query.column_descriptions
+        if column['name'] == 'duration'
+    )
+    return query.with_entities(duration.label('duration'))
+
+
+def stream_fact_rows(controller, query_terms, with_tags=False):
+    """Yields the FactRows that ``gather_fact_rows`` would return, as they're read."""
+    return gather_fact_rows(
+        controller, query_terms, with_tags=with_tags, yield_per=STREAM_BATCH_SIZE,
+    )
@@ -0,0 +1,234 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Top-K selection for limited reports that nark cannot sort in SQL.
+
+When a grouped report is sorted by a column that only exists after
+post-processing -- e.g., ``dob list facts --group category --sort activity``
+sorts on the activity names that nark ``group_concat``'s into each result --
+nark skips that ORDER BY, so an SQL LIMIT would keep an arbitrary K groups,
+and the report would then sort just those.
+
+For these reports, ``top_k_sort_keys`` says how to sort each result, and the
+caller lifts the LIMIT and OFFSET from the query, streams the results (see
+``dob.store.streaming``) to ``select_top_k``, which keeps the best ``offset +
+limit`` results in a bounded heap, and passes on just those to the report.
+So the groups are not all held in memory, nor sorted, but note that each is
+still read from the store and hydrated, to compute its sort key.
+
+Each key is the value the SQL would have sorted on, were it able, and the
+report (see dob_bright's ``tabulate_results``) still sorts the K results it
+is given, as it would otherwise.
+"""
+
+import heapq
+from functools import cmp_to_key
+from gettext import gettext as _
+
+from nark.backends.sqlalchemy.managers.fact import FactManager
+
+__all__ = (
+    'select_top_k',
+    'sorts_after_query',
+    'top_k_sort_keys',
+)
+
+
+def sorts_after_query(query_terms):
+    """Whether any sort column must be sorted after the query, and not by SQL.
+
+    Mirrors nark's ``query_order_by_sort_col``, which skips the ORDER BY for
+    these sorts, and dob_bright's ``sort_col_actual``, which re-sorts them.
+    """
+    qt = query_terms
+    if not qt.is_grouped:
+        return False
+    for sort_col in qt.sort_cols or ():
+        if sort_col == 'activity' and not qt.group_activity:
+            return True
+        elif sort_col == 'category' and not qt.group_category:
+            return True
+    return False
+
+
+def top_k_sort_keys(query_terms, output_format=None):
+    """Returns (key, descending) for each sort column, or None if SQL can sort.
+
+    Returns None unless at least one sort column must be sorted after the
+    query (see ``sorts_after_query``), or if any sort column is not handled
+    here (in which case the caller leaves the limit to the SQL, as before).
+
+    The ``output_format`` matters to the sort on names, which the journal
+    decorates (see ``key_names_concat``).
+    """
+    qt = query_terms
+    for_journal = output_format == 'journal'
+
+    i_duration = FactManager.RESULT_GRP_INDEX['duration']
+    i_group_count = FactManager.RESULT_GRP_INDEX['group_count']
+    i_first_start = FactManager.RESULT_GRP_INDEX['first_start']
+    i_final_end = FactManager.RESULT_GRP_INDEX['final_end']
+    i_activities = FactManager.RESULT_GRP_INDEX['activities']
+    i_actegories = FactManager.RESULT_GRP_INDEX['actegories']
+    i_categories = FactManager.RESULT_GRP_INDEX['categories']
+    i_start_date = FactManager.RESULT_GRP_INDEX['start_date']
+
+    def _top_k_sort_keys():
+        if not qt.is_grouped or not qt.include_stats or not qt.sort_cols:
+            return None
+
+        if not sorts_after_query(qt):
+            return None
+
+        sort_keys = []
+        for idx, sort_col in enumerate(qt.sort_cols):
+            key = sort_key_for_col(sort_col)
+            if key is None:
+                return None
+            sort_keys.append((key, is_descending(idx)))
+        return sort_keys
+
+    # ***
+
+    def is_descending(idx):
+        # Same as nark's query_sort_order_at_index: ascending unless told not.
+        try:
+            return bool(qt.sort_orders) and qt.sort_orders[idx] == 'desc'
+        except IndexError:
+            return False
+
+    # ***
+
+    def sort_key_for_col(sort_col):
+        if sort_col == 'start' or not sort_col:
+            return key_start
+        elif sort_col == 'time':
+            return key_aggregate(i_duration)
+        elif sort_col == 'day':
+            return key_start_date
+        elif sort_col == 'activity':
+            if qt.group_activity:
+                return key_activity_name
+            return key_names_concat(sort_col)
+        elif sort_col == 'category':
+            if qt.group_category:
+                return key_category_name
+            return key_names_concat(sort_col)
+        elif sort_col == 'usage':
+            return key_aggregate(i_group_count)
+        elif sort_col == 'name':
+            return key_description
+        elif sort_col == 'fact':
+            return key_fact_pk
+        # Not 'tag', which dob_bright builds from each Fact's Tags' frequencies.
+        return None
+
+    def key_start(result):
+        return (
+            nullable(result[1 + i_first_start]),
+            nullable(result[1 + i_final_end]),
+        )
+
+    def key_aggregate(index):
+        def _key_aggregate(result):
+            return nullable(result[1 + index])
+        return _key_aggregate
+
+    def key_start_date(result):
+        start_date = result[1 + i_start_date]
+        if start_date is None:
+            first_start = result[1 + i_first_start]
+            start_date = first_start.strftime('%Y-%m-%d') if first_start else ''
+        return start_date
+
+    def key_activity_name(result):
+        return result[0].activity_name
+
+    def key_category_name(result):
+        return result[0].category_name
+
+    def key_description(result):
+        return result[0].description or ''
+
+    def key_fact_pk(result):
+        return nullable(result[0].pk)
+
+    def key_names_concat(sort_col):
+        # The same strings as dob_bright's tabulate_results makes for the
+        # report's 'actegories', 'activities', or 'categories' columns (see
+        # prepare_actegories, et al), which is what the report sorts on.
+        if qt.group_tags or qt.group_days:
+            index = i_actegories
+            decorate = '{}'
+        elif sort_col == 'activity':
+            index = i_activities
+            decorate = '{}' + actcatsep()
+        else:
+            index = i_categories
+            decorate = actcatsep() + '{}'
+
+        def _key_names_concat(result):
+            names = result[1 + index]
+            if not names:
+                return ''
+            return _(', ').join([decorate.format(name) for name in sorted(names)])
+        return _key_names_concat
+
+    def actcatsep():
+        # The journal separates activity and category names with an '@'.
+        return _('@') if for_journal else ''
+
+    def nullable(value):
+        # Sort None first (as SQLite does), without comparing None to a value.
+        return (value is not None, value)
+
+    return _top_k_sort_keys()
+
+
+# ***
+
+def select_top_k(results, sort_keys, limit, offset=None):
+    """Returns the results ``sorted(...)[offset:offset + limit]`` would.
+
+    But only holds ``offset + limit`` results in a heap as it goes, rather
+    than sorting all of them. Like ``sorted``, the selection is stable.
+    """
+    def _select_top_k():
+        n_skip = offset if offset and offset > 0 else 0
+        n_keep = n_skip + limit
+        top_k = heapq.nsmallest(n_keep, results, key=sort_values)
+        return top_k[n_skip:]
+
+    # Compute each result's sort values once, not on every comparison.
+    def sort_values(result):
+        return compare_key(tuple(key(result) for key, _descending in sort_keys))
+
+    def compare_values(lhs_values, rhs_values):
+        for lhs_value, rhs_value, (_key, descending) in zip(
+            lhs_values, rhs_values, sort_keys,
+        ):
+            if lhs_value == rhs_value:
+                continue
+            precedes = lhs_value < rhs_value
+            if descending:
+                precedes = not precedes
+            return -1 if precedes else 1
+        return 0
+
+    compare_key = cmp_to_key(compare_values)
+
+    return _select_top_k()
@@ -0,0 +1,55 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Group several nark store writes into one database transaction."""
+
+from contextlib import contextmanager
+
+__all__ = (
+    'in_single_transaction',
+    'single_transaction',
+)
+
+
+@contextmanager
+def single_transaction(store):
+    """Defer each commit the managers make until the block exits, then commit once.
+
+    The nark managers commit after every item they save, so, e.g., stopping
+    the active Fact and starting a new one otherwise takes two transactions
+    (and, on SQLite, two fsyncs). Within this context, the managers' commits
+    only flush (so later queries still see the earlier writes), and then
+    everything is committed together, or rolled back if the block raises.
+    """
+    session = store.session
+    commit = session.commit
+    # Shadow the bound method on the instance, so the managers' commits flush.
+    session.commit = session.flush
+    try:
+        try:
+            yield session
+        finally:
+            del session.commit
+        commit()
+    except BaseException:
+        session.rollback()
+        raise
+
+
+def in_single_transaction(store):
+    """Return True if within a ``single_transaction`` on the store."""
+    return 'commit' in vars(store.session)
@@ -0,0 +1,218 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""Per-Fact row versions, for optimistic concurrency between dob processes.
+
+A Carousel session can stay open for a long while, and other dob processes
+might change the same Facts in the meantime. Rather than lock the store for
+the session, dob notes the store's version when it starts, and, when it
+saves, checks that none of the Facts being edited has changed since.
+
+The versions are kept in a side table, ``dob_fact_versions``, by SQLite
+triggers on the ``facts`` table, so that every writer bumps them (even one
+that knows nothing about them). Each update or delete of a Fact row stamps
+that row with the next number in one store-wide sequence. Inserts are not
+stamped, because a Fact that did not exist when it was read cannot have
+been edited by the reader.
+
+The check is one query for the whole set of edited Facts. It errs on the
+side of caution: A Fact read after another process changed it (but after
+this process started) is reported as changed, too.
+"""
+
+from contextlib import contextmanager
+from gettext import gettext as _
+
+import lazy_import
+
+from .schema import ensure_sqlite_schema
+
+__all__ = (
+    'FACT_VERSIONS_DDL',
+    'FactVersions',
+    'StaleFactsError',
+    'VersionedFactManager',
+    'ensure_fact_versions',
+    'fact_version_guard',
+    'fact_versions',
+)
+
+# Only consulted after a query fails, by which point SQLAlchemy is loaded.
+sqlalchemy_exc = lazy_import.lazy_module('sqlalchemy.exc')
+
+
+FACT_VERSIONS_DDL = (
+    (
+        'dob_fact_versions',
+        'CREATE TABLE dob_fact_versions ('
+        ' fact_id INTEGER NOT NULL PRIMARY KEY,'
+        ' version INTEGER NOT NULL'
+        ')',
+    ),
+    (
+        'ix_dob_fact_versions_version',
+        'CREATE INDEX ix_dob_fact_versions_version'
+        ' ON dob_fact_versions (version)',
+    ),
+    (
+        'tr_dob_fact_versions_update',
+        'CREATE TRIGGER tr_dob_fact_versions_update AFTER UPDATE ON facts'
+        ' BEGIN'
+        '  INSERT OR REPLACE INTO dob_fact_versions (fact_id, version)'
+        '  VALUES (OLD.id, (SELECT IFNULL(MAX(version), 0) + 1 FROM dob_fact_versions));'
+        ' END',
+    ),
+    (
+        'tr_dob_fact_versions_delete',
+        'CREATE TRIGGER tr_dob_fact_versions_delete AFTER DELETE ON facts'
+        ' BEGIN'
+        '  INSERT OR REPLACE INTO dob_fact_versions (fact_id, version)'
+        '  VALUES (OLD.id, (SELECT IFNULL(MAX(version), 0) + 1 FROM dob_fact_versions));'
+        ' END',
+    ),
+)
+
+
+def ensure_fact_versions(store):
+    """Create the version table and triggers, if missing (SQLite only)."""
+    ensure_sqlite_schema(store, FACT_VERSIONS_DDL, _('Fact versions'))
+
+
+# ***
+
+class StaleFactsError(ValueError):
+    """Raised when saving Facts that another process changed in the meantime."""
+
+    def __init__(self, pks):
+        self.pks = pks
+        super(StaleFactsError, self).__init__(
+            _('Another dob process changed {} since they were read: {}').format(
+                _('this Fact') if len(pks) == 1 else _('these Facts'),
+                ', '.join('#{}'.format(pk) for pk in pks),
+            )
+        )
+
+
+class FactVersions(object):
+    """Tracks which Fact versions this process has seen.
+
+    The store's version is noted on init, so make this object before
+    reading any Facts (see :func:`fact_versions`).
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.mark = self.query_mark()
+        # The version of each Fact this process itself has since changed.
+        self.written = {}
+
+    @property
+    def enabled(self):
+        return self.mark is not None
+
+    def query_mark(self):
+        # Read the mark on its own connection, and not in the session, which
+        # would otherwise hold a read transaction open (and with it, a shared
+        # lock on the database file) until the session next commits.
+        try:
+            return self.store.session.get_bind().execute(
+                'SELECT IFNULL(MAX(version), 0) FROM dob_fact_versions'
+            ).scalar()
+        except sqlalchemy_exc.SQLAlchemyError:
+            # Not SQLite, or the table could not be made.
+            return None
+
+    def query_versions(self, pks, newer_than=0):
+        pks = sorted(set(pk for pk in pks if pk and pk > 0))
+        if not self.enabled or not pks:
+            return {}
+        rows = self.store.session.execute(
+            'SELECT fact_id, version FROM dob_fact_versions'
+            ' WHERE fact_id IN ({}) AND version > {}'.format(
+                ', '.join(str(int(pk)) for pk in pks), int(newer_than),
+            )
+        )
+        return dict(rows.fetchall())
+
+    def changed(self, pks):
+        """Return the sorted PKs of the Facts that changed since they were read."""
+        changed = self.query_versions(pks, newer_than=self.mark)
+        return sorted(
+            pk for pk, version in changed.items()
+            if version > self.written.get(pk, self.mark)
+        )
+
+    def must_be_current(self, pks):
+        """Raise StaleFactsError if any of the Facts changed since read."""
+        changed = self.changed(pks)
+        if changed:
+            raise StaleFactsError(changed)
+
+    def record(self, pks):
+        """Note the versions of the Facts that this process just wrote."""
+        self.written.update(self.query_versions(pks, newer_than=self.mark))
+
+
+def fact_versions(store):
+    """Return the store's FactVersions, making it (and noting the mark) if new."""
+    try:
+        return store.dob_fact_versions
+    except AttributeError:
+        store.dob_fact_versions = FactVersions(store)
+        return store.dob_fact_versions
+
+
+# ***
+
+class VersionedFactManager(object):
+    """Wraps a FactManager, and checks each Fact's version before saving it.
+
+    Every other attribute is delegated to the wrapped manager.
+    """
+
+    def __init__(self, facts_mgr):
+        self.facts_mgr = facts_mgr
+
+    def __getattr__(self, name):
+        return getattr(self.facts_mgr, name)
+
+    def save(self, fact, *args, **kwargs):
+        versions = fact_versions(self.facts_mgr.store)
+        # Note that saving an edited Fact clears its PK (and saves a new Fact).
+        fact_pk = fact.pk
+        versions.must_be_current([fact_pk])
+        saved = self.facts_mgr.save(fact, *args, **kwargs)
+        versions.record([fact_pk])
+        return saved
+
+
+@contextmanager
+def fact_version_guard(controller):
+    """Check the version of each Fact saved through the Facts manager while in context.
+
+    The Carousel saves each edited Fact through the Facts manager, and shows
+    the StaleFactsError in a popup, like any other error that a save raises.
+    """
+    facts_mgr = controller.store.facts
+    if isinstance(facts_mgr, VersionedFactManager):
+        yield facts_mgr
+        return
+    controller.store.facts = VersionedFactManager(facts_mgr)
+    try:
+        yield controller.store.facts
+    finally:
+        controller.store.facts = facts_mgr
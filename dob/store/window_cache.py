@@ -0,0 +1,346 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+"""A windowed, least-recently-used cache of Facts for Carousel sessions.
+
+As the user scrolls through the Carousel, the viewer walks the store one
+Fact at a time, calling ``antecedent`` and ``subsequent`` on the Facts
+manager, each call its own round trip (and each Fact lazy-loading its
+activity, category, and tags). This module wraps the Facts manager for
+the duration of a Carousel session, and answers those lookups from
+windows of prefetched Facts. On a miss, one query fetches the Facts on
+either side of the reference time (and eager-loads their relations).
+When too many Facts are cached, the least recently used windows are
+evicted, so memory stays bounded however far the user scrolls.
+
+Lookups that a window cannot answer with certainty fall back to the
+Facts manager, so the cache never changes which Fact is found.
+"""
+
+import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import joinedload, selectinload
+
+from nark.backends.sqlalchemy.objects import AlchemyFact
+
+# Register the editor.window_size and editor.window_cache settings.
+from .. import settings  # noqa: F401 '<>' imported but unused
+
+__all__ = (
+    'FactWindowCache',
+    'fact_window_cache',
+)
+
+
+# Lookups that a window cannot answer return this, and not None,
+# which is a legitimate answer (no such Fact).
+_UNKNOWN = object()
+
+ONE_SECOND = datetime.timedelta(seconds=1)
+
+
+@contextmanager
+def fact_window_cache(controller):
+    """Swap a windowed cache in for the Facts manager while in context.
+
+    The window size and cache capacity are read from the
+    ``editor.window_size`` and ``editor.window_cache`` settings.
+    A window size of 0 disables the cache.
+    """
+    facts_mgr = controller.store.facts
+    window_size = controller.config['editor.window_size']
+    if window_size <= 0 or isinstance(facts_mgr, FactWindowCache):
+        yield facts_mgr
+        return
+    cache = FactWindowCache(
+        facts_mgr,
+        window_size=window_size,
+        max_facts=controller.config['editor.window_cache'],
+    )
+    controller.store.facts = cache
+    try:
+        yield cache
+    finally:
+        controller.store.facts = facts_mgr
+
+
+# ***
+
+class FactWindow(object):
+    """A run of Facts known to include every Fact between its bounds.
+
+    Every (non-deleted) Fact whose start is strictly between ``lo_bound``
+    and ``hi_bound`` is in ``rows``. A bound of None means the window
+    reaches that end of the store.
+    """
+
+    __slots__ = ('rows', 'lo_bound', 'hi_bound')
+
+    def __init__(self, rows, lo_bound, hi_bound):
+        self.rows = rows
+        self.lo_bound = lo_bound
+        self.hi_bound = hi_bound
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class FactWindowCache(object):
+    """Wraps a FactManager, answering antecedent/subsequent from a cache.
+
+    Every other attribute is delegated to the wrapped manager.
+    Calling ``save`` or ``remove`` through the cache clears it.
+    """
+
+    def __init__(self, facts_mgr, window_size=25, max_facts=500):
+        self.facts_mgr = facts_mgr
+        self.window_size = max(1, window_size)
+        # Always keep room for at least one whole window.
+        self.max_facts = max(max_facts, 2 * self.window_size)
+        self.windows = OrderedDict()
+        self.windows_seq = 0
+        self.cached_count = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        return getattr(self.facts_mgr, name)
+
+    @property
+    def store(self):
+        return self.facts_mgr.store
+
+    # ***
+
+    def invalidate(self):
+        self.windows.clear()
+        self.cached_count = 0
+
+    def save(self, *args, **kwargs):
+        self.invalidate()
+        return self.facts_mgr.save(*args, **kwargs)
+
+    def remove(self, *args, **kwargs):
+        self.invalidate()
+        return self.facts_mgr.remove(*args, **kwargs)
+
+    # ***
+
+    def antecedent(self, fact=None, ref_time=None):
+        if fact is not None:
+            if fact.end and isinstance(fact.end, datetime.datetime):
+                ref_time = fact.end
+            elif fact.start and isinstance(fact.start, datetime.datetime):
+                ref_time = fact.start
+        if not isinstance(ref_time, datetime.datetime):
+            # Let nark raise its ValueError.
+            return self.facts_mgr.antecedent(fact=fact, ref_time=ref_time)
+        ref_secs = ref_time.replace(microsecond=0)
+        return self.cached_lookup(
+            self.resolve_antecedent,
+            fact,
+            ref_secs,
+            # Fetch Facts that start before the second after ref_time (the
+            # nark query compares times truncated to the second), and after.
+            pivot=ref_secs + ONE_SECOND,
+            fallback=lambda: self.facts_mgr.antecedent(fact=fact, ref_time=ref_time),
+        )
+
+    def subsequent(self, fact=None, ref_time=None):
+        if fact is not None:
+            if fact.start and isinstance(fact.start, datetime.datetime):
+                ref_time = fact.start
+            elif fact.end and isinstance(fact.end, datetime.datetime):
+                ref_time = fact.end
+        if ref_time is None:
+            return self.facts_mgr.subsequent(fact=fact, ref_time=ref_time)
+        ref_secs = ref_time.replace(microsecond=0)
+        return self.cached_lookup(
+            self.resolve_subsequent,
+            fact,
+            ref_secs,
+            pivot=ref_secs,
+            fallback=lambda: self.facts_mgr.subsequent(fact=fact, ref_time=ref_time),
+        )
+
+    # ***
+
+    def cached_lookup(self, resolve, fact, ref_secs, pivot, fallback):
+        found = self.lookup_windows(resolve, fact, ref_secs)
+        if found is _UNKNOWN:
+            self.misses += 1
+            window = self.fetch_window(pivot)
+            found = resolve(window, fact, ref_secs)
+        else:
+            self.hits += 1
+        if found is _UNKNOWN:
+            return fallback()
+        elif found is None:
+            return None
+        return found.as_hamster(self.store)
+
+    def lookup_windows(self, resolve, fact, ref_secs):
+        for window_id in reversed(self.windows):
+            window = self.windows[window_id]
+            found = resolve(window, fact, ref_secs)
+            if found is not _UNKNOWN:
+                self.windows.move_to_end(window_id)
+                return found
+        return _UNKNOWN
+
+    # ***
+
+    def fetch_window(self, pivot):
+        """Fetch window_size Facts on either side of pivot, in one query."""
+        def _fetch_window():
+            rows = query_window_rows()
+            before = [row for row in rows if row.start < pivot]
+            after = [row for row in rows if row.start >= pivot]
+            lo_bound = None
+            if len(before) >= self.window_size:
+                lo_bound = min(row.start for row in before)
+            hi_bound = None
+            if len(after) >= self.window_size:
+                hi_bound = max(row.start for row in after)
+            window = FactWindow(rows, lo_bound, hi_bound)
+            remember_window(window)
+            return window
+
+        def query_window_rows():
+            before_pks = query_side_pks(
+                AlchemyFact.start < pivot,
+                AlchemyFact.start.desc(),
+                AlchemyFact.pk.desc(),
+            )
+            after_pks = query_side_pks(
+                AlchemyFact.start >= pivot,
+                AlchemyFact.start.asc(),
+                AlchemyFact.pk.asc(),
+            )
+            window_pks = union_all(
+                select([before_pks.c.id]),
+                select([after_pks.c.id]),
+            )
+            query = self.store.session.query(AlchemyFact)
+            query = query.options(
+                joinedload('activity').joinedload('category'),
+                selectinload('tags'),
+            )
+            query = query.filter(AlchemyFact.pk.in_(window_pks))
+            return query.all()
+
+        def query_side_pks(condition, *order_by):
+            query = self.store.session.query(AlchemyFact.pk)
+            query = query.filter(AlchemyFact.deleted == False)  # noqa: E712
+            query = query.filter(condition)
+            query = query.order_by(*order_by).limit(self.window_size)
+            return query.subquery()
+
+        def remember_window(window):
+            self.windows_seq += 1
+            self.windows[self.windows_seq] = window
+            self.cached_count += len(window)
+            while self.cached_count > self.max_facts and len(self.windows) > 1:
+                _window_id, evicted = self.windows.popitem(last=False)
+                self.cached_count -= len(evicted)
+
+        return _fetch_window()
+
+    # ***
+
+    # The resolve_* methods mimic the nark FactManager queries of the same name,
+    # and also report when the window cannot say for sure what the answer is.
+
+    def resolve_antecedent(self, window, fact, ref_secs):
+        def _resolve_antecedent():
+            if window.hi_bound is not None and window.hi_bound < ref_secs + ONE_SECOND:
+                # The window ends before ref_time, so it might be missing Facts.
+                return _UNKNOWN
+            candidates = [row for row in window.rows if is_antecedent(row)]
+            if not candidates:
+                return None if window.lo_bound is None else _UNKNOWN
+            found = max(candidates, key=_order_by_start_key)
+            if window.lo_bound is not None and found.start <= window.lo_bound:
+                # An uncached Fact that ties found on start might rank higher.
+                return _UNKNOWN
+            return found
+
+        def is_antecedent(row):
+            if _is_excluded(row, fact):
+                return False
+            start_secs = row.start.replace(microsecond=0)
+            if row.end is None:
+                return start_secs < ref_secs
+            end_secs = row.end.replace(microsecond=0)
+            if end_secs < ref_secs:
+                return True
+            if end_secs == ref_secs and start_secs < ref_secs:
+                return True
+            return (
+                fact is not None
+                and fact.pk is not None
+                and end_secs == ref_secs
+                and start_secs == ref_secs
+                and row.pk < fact.pk
+            )
+
+        return _resolve_antecedent()
+
+    def resolve_subsequent(self, window, fact, ref_secs):
+        def _resolve_subsequent():
+            if window.lo_bound is not None and window.lo_bound >= ref_secs:
+                # The window starts after ref_time, so it might be missing Facts.
+                return _UNKNOWN
+            candidates = [row for row in window.rows if is_subsequent(row)]
+            if not candidates:
+                return None if window.hi_bound is None else _UNKNOWN
+            found = min(candidates, key=_order_by_start_key)
+            if window.hi_bound is not None and found.start >= window.hi_bound:
+                return _UNKNOWN
+            return found
+
+        def is_subsequent(row):
+            if _is_excluded(row, fact):
+                return False
+            start_secs = row.start.replace(microsecond=0)
+            if start_secs > ref_secs:
+                return True
+            if start_secs != ref_secs or row.end is None:
+                return False
+            end_secs = row.end.replace(microsecond=0)
+            if end_secs > ref_secs:
+                return True
+            return (
+                fact is not None
+                and fact.pk is not None
+                and end_secs == ref_secs
+                and row.pk > fact.pk
+            )
+
+        return _resolve_subsequent()
+
+
+def _is_excluded(row, fact):
+    return fact is not None and not fact.unstored and row.pk == fact.pk
+
+
+def _order_by_start_key(row):
+    # Mimic ORDER BY start, end, id, where SQLite sorts NULL first.
+    return (row.start, row.end is not None, row.end or row.start, row.pk)
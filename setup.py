@@ -98,6 +98,8 @@ setup(
     # Ref:
     #   https://github.com/pypa/setuptools_scm
     setup_requires=['setuptools_scm'],
-    use_scm_version=True,
+    # Also stamp the version into the package, so that the runtime need not
+    # ask pkg_resources (or git) for it. (See dob.get_version.)
+    use_scm_version={'write_to': 'dob/_version.py'},
 )
 
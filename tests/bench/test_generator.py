@@ -0,0 +1,49 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+from datetime import timedelta
+
+from dob.bench.generator import ANCHOR_TIME, SyntheticFactGenerator
+
+
+class TestSyntheticFactGenerator(object):
+    def test_deterministic_given_seed(self):
+        facts_1 = list(SyntheticFactGenerator(seed=123, fact_count=200))
+        facts_2 = list(SyntheticFactGenerator(seed=123, fact_count=200))
+        facts_3 = list(SyntheticFactGenerator(seed=124, fact_count=200))
+        assert facts_1 == facts_2
+        assert facts_1 != facts_3
+
+    def test_facts_chronological_and_last_ongoing(self):
+        synthetic = list(SyntheticFactGenerator(seed=1, fact_count=500))
+        assert len(synthetic) == 500
+        assert synthetic[-1].end is None
+        for prev, fact in zip(synthetic, synthetic[1:]):
+            assert prev.start < prev.end <= fact.start
+
+    def test_not_ongoing(self):
+        synthetic = list(SyntheticFactGenerator(seed=1, fact_count=10, ongoing=False))
+        assert all(fact.end is not None for fact in synthetic)
+
+    def test_last_fact_ends_near_anchor(self):
+        for fact_count in (1, 500, 50000):
+            generator = SyntheticFactGenerator(seed=1, fact_count=fact_count)
+            first_start, last_time = generator.time_span()
+            assert first_start <= last_time
+            assert ANCHOR_TIME - timedelta(weeks=1) < last_time <= ANCHOR_TIME
+        synthetic = list(SyntheticFactGenerator(seed=1, fact_count=500, ongoing=False))
+        assert ANCHOR_TIME - timedelta(weeks=1) < synthetic[-1].end <= ANCHOR_TIME
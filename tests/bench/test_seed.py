@@ -0,0 +1,91 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from nark.backends.sqlalchemy.objects import categories, facts, fact_tags, metadata
+
+from dob.bench.generator import SyntheticFactGenerator
+from dob.bench.seed import seed_store
+from dob.store.changes import FACT_CHANGES_DDL
+from dob.store.spans import FACT_SPANS_DDL
+
+
+class TestSeedStore(object):
+    def test_seed_store_counts(self, tmpdir):
+        db_path = str(tmpdir.join('bench.sqlite'))
+        engine = create_engine('sqlite:///{}'.format(db_path))
+        metadata.create_all(engine)
+        generator = SyntheticFactGenerator(seed=7, fact_count=321)
+        assert seed_store(db_path, generator, batch_size=100) == 321
+        n_tagged = sum(len(fact.tags) for fact in generator)
+        with engine.connect() as conn:
+            count = conn.execute(select([func.count()]).select_from(facts)).scalar()
+            assert count == 321
+            count = conn.execute(select([func.count()]).select_from(fact_tags)).scalar()
+            assert count == n_tagged
+        engine.dispose()
+
+    def test_seed_store_shares_names_between_generators(self, tmpdir):
+        db_path = str(tmpdir.join('bench.sqlite'))
+        engine = create_engine('sqlite:///{}'.format(db_path))
+        metadata.create_all(engine)
+        older = SyntheticFactGenerator(seed=1, fact_count=30, ongoing=False)
+        newer = SyntheticFactGenerator(
+            seed=2, fact_count=30, anchor_time=datetime(2021, 1, 1, 18, 0),
+        )
+        assert seed_store(db_path, older, newer) == 60
+        with engine.connect() as conn:
+            count = conn.execute(select([func.count()]).select_from(categories)).scalar()
+            assert count == len(set(older.categories) | set(newer.categories))
+        engine.dispose()
+
+    def test_seed_store_skips_triggers_fills_spans(self, tmpdir):
+        db_path = str(tmpdir.join('bench.sqlite'))
+        engine = create_engine('sqlite:///{}'.format(db_path))
+        metadata.create_all(engine)
+        with engine.begin() as conn:
+            for _name, ddl in FACT_CHANGES_DDL + FACT_SPANS_DDL:
+                conn.execute(ddl)
+        generator = SyntheticFactGenerator(seed=3, fact_count=50)
+        assert seed_store(db_path, generator) == 50
+        with engine.connect() as conn:
+            # The triggers did not fire for the bulk load...
+            assert conn.execute('SELECT COUNT(*) FROM dob_fact_changes').scalar() == 0
+            # ...but the spans were filled in, and the triggers put back.
+            assert conn.execute('SELECT COUNT(*) FROM dob_fact_spans').scalar() == 50
+            n_triggers = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'"
+            ).scalar()
+            assert n_triggers == 6
+        engine.dispose()
+
+    def test_seed_store_refuses_store_with_names(self, tmpdir):
+        db_path = str(tmpdir.join('bench.sqlite'))
+        engine = create_engine('sqlite:///{}'.format(db_path))
+        metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(categories.insert(), {
+                'id': 1, 'name': 'Existing', 'deleted': False, 'hidden': False,
+            })
+        generator = SyntheticFactGenerator(seed=4, fact_count=10)
+        with pytest.raises(ValueError):
+            seed_store(db_path, generator)
+        engine.dispose()
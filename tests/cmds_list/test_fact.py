@@ -15,6 +15,7 @@
 # You can find the GNU General Public License reprinted in the file titled 'LICENSE',
 # or visit <http://www.gnu.org/licenses/>.
 
+import csv
 import os
 
 import fauxfactory
@@ -28,6 +29,7 @@ from dob_bright.crud.fact_dressed import FactDressed
 from dob_bright.reports.tabulate_results import report_table_columns
 
 from dob.cmds_list.fact import list_facts
+from dob.store.top_k import select_top_k
 
 from .. import truncate_to_whole_seconds
 
@@ -220,9 +222,154 @@ class TestCmdsListFactListFacts_PresentationArguments(object):
         sort_cols = ('activity', 'start')
         list_facts(controller, sort_cols=sort_cols)
 
+    def test_list_facts_top_k_streamed(
+        self,
+        five_report_facts_ctl,
+        capsys,
+        mocker,
+    ):
+        controller = five_report_facts_ctl
+
+        def _list_rows(**kwargs):
+            list_facts(
+                controller,
+                output_format='csv',
+                group_days=True,
+                sort_cols=('category',),
+                **kwargs
+            )
+            out, err = capsys.readouterr()
+            # Skip the header, and the totals.
+            rows = csv.reader(out.splitlines()[1:])
+            return [row for row in rows if row[0] and row[1] != 'TOTAL']
+
+        def select_streamed(results, *args):
+            # The top K are picked from streamed results, not a get_all list.
+            assert not isinstance(results, list)
+            return select_top_k(results, *args)
+
+        every_day = _list_rows()
+        mocker.patch('dob.cmds_list.fact.select_top_k', side_effect=select_streamed)
+        top_days = _list_rows(limit=2, offset=1)
+        assert len(every_day) > 3
+        # Sorted on the 'Actegories' names, as the report would sort them.
+        assert top_days == sorted(every_day, key=lambda row: row[1])[1:3]
+
     # ***
 
 
+# ***
+
+class TestCmdsListFactListFacts_JournalStream(object):
+    """Tests that the streamed Journal matches the Journal tabulated all at once."""
+
+    def _list_journal(self, controller, capsys, **kwargs):
+        list_facts(
+            controller,
+            output_format='journal',
+            group_activity=True,
+            group_category=True,
+            group_days=True,
+            sort_cols=('day', 'time'),
+            sort_orders=('asc', 'desc'),
+            **kwargs
+        )
+        out, err = capsys.readouterr()
+        return out
+
+    @pytest.mark.parametrize(
+        ('kwargs',), (
+            ({},),
+            ({'show_totals': True},),
+            ({'show_totals': True, 'spark_total': 'net'},),
+            ({'spark_total': 3600, 'spark_width': 20},),
+            ({'show_totals': True, 'row_limit': 2},),
+            ({'show_totals': True, 'column': ['start_date', 'actegory', 'tags']},),
+        )
+    )
+    def test_list_facts_journal_streamed_same_as_tabulated(
+        self,
+        five_report_facts_ctl,
+        capsys,
+        mocker,
+        kwargs,
+    ):
+        controller = five_report_facts_ctl
+        # The streamed Journal does not tabulate the report all at once.
+        mocker.patch('dob.cmds_list.fact.render_results', side_effect=AssertionError)
+        streamed = self._list_journal(controller, capsys, **kwargs)
+        mocker.stopall()
+        mocker.patch('dob.cmds_list.fact.journal_streams', return_value=False)
+        tabulated = self._list_journal(controller, capsys, **kwargs)
+        assert streamed
+        assert streamed == tabulated
+
+    @pytest.mark.parametrize(
+        ('kwargs',), (
+            ({'show_totals': True},),
+            ({'show_totals': True, 'row_limit': 3},),
+        )
+    )
+    def test_list_facts_journal_streamed_in_batches(
+        self,
+        five_report_facts_ctl,
+        capsys,
+        mocker,
+        kwargs,
+    ):
+        controller = five_report_facts_ctl
+        # Tabulate each day on its own (as the days are whole in each batch).
+        mocker.patch('dob.cmds_list.journal.STREAM_BATCH_SIZE', 1)
+        streamed = self._list_journal(controller, capsys, **kwargs)
+        mocker.stopall()
+        mocker.patch('dob.cmds_list.fact.journal_streams', return_value=False)
+        tabulated = self._list_journal(controller, capsys, **kwargs)
+        assert streamed
+        assert streamed == tabulated
+
+
+class TestCmdsListFactListFacts_FastTableStream(object):
+    """Tests that the streamed 'fast' table matches the one tabulated all at once."""
+
+    def _list_fast_table(self, controller, capsys, **kwargs):
+        list_facts(
+            controller,
+            output_format='table',
+            table_type='fast',
+            max_width=0,
+            **kwargs
+        )
+        out, err = capsys.readouterr()
+        return out
+
+    @pytest.mark.parametrize(
+        ('kwargs',), (
+            ({},),
+            ({'row_limit': 3},),
+            ({'sort_cols': ('start',), 'sort_orders': ('asc',)},),
+            ({'column': ['key', 'duration', 'activity', 'tags']},),
+        )
+    )
+    def test_list_facts_fast_table_streamed_same_as_tabulated(
+        self,
+        five_report_facts_ctl,
+        capsys,
+        mocker,
+        kwargs,
+    ):
+        controller = five_report_facts_ctl
+        # Tabulate the streamed results a couple at a time.
+        mocker.patch('dob.reports.render_results.STREAM_BATCH_SIZE', 2)
+        # The streamed table does not tabulate the report all at once.
+        mocker.patch('dob.cmds_list.fact.render_results', side_effect=AssertionError)
+        streamed = self._list_fast_table(controller, capsys, **kwargs)
+        mocker.stopall()
+        mocker.patch('dob.cmds_list.fact.fast_table_streams', return_value=False)
+        tabulated = self._list_fast_table(controller, capsys, **kwargs)
+        assert streamed
+        assert streamed == tabulated
+
+
 # ***
 
 class TestCmdsListFactListFacts_FactoidPermutations(object):
@@ -373,13 +520,15 @@ class TestCmdsListFactListFacts_OutputFormats(object):
         """Make sure that passing a end date is passed to the fact gathering method."""
         # (lb): Not sure utility of this test. It was from hamster-lib, so I
         # probably refactored away any utility.
+        # Use a format that reads whole Facts, which nark's gather returns.
+        # (Other formats use FactRows; see tests/store/test_projection.py.)
         mocker.patch.object(controller.facts, 'gather')
         since = fauxfactory.gen_datetime()
         # Get rid of fractions of a second.
         since = truncate_to_whole_seconds(since)
         list_facts(
             controller,
-            output_format='csv',
+            output_format='ical',
             since=since.strftime('%Y-%m-%d %H:%M'),
         )
         args, kwargs = controller.facts.gather.call_args
@@ -388,13 +537,15 @@ class TestCmdsListFactListFacts_OutputFormats(object):
 
     def test_with_until(self, controller, mocker):
         """Make sure that passing a until date is passed to the fact gathering method."""
+        # Use a format that reads whole Facts, which nark's gather returns.
+        # (Other formats use FactRows; see tests/store/test_projection.py.)
         mocker.patch.object(controller.facts, 'gather')
         until = fauxfactory.gen_datetime()
         # Get rid of fractions of a second.
         until = truncate_to_whole_seconds(until)
         list_facts(
             controller,
-            output_format='csv',
+            output_format='ical',
             until=until.strftime('%Y-%m-%d %H:%M'),
         )
         args, kwargs = controller.facts.gather.call_args
@@ -26,10 +26,15 @@ Fixtures available to the tests/.
   ``_parametrized`` to imply it has increased complexity.
 """
 
+import datetime
+import itertools
+
 import pytest
 
 from dob_bright.crud.fact_dressed import FactDressed
 
+from dob.store.managers import install_dob_managers
+
 # We leave this conftest out of pytest_plugins, otherwise its
 # test_fact_cls fixture is not overridden by the one below.
 # (lb): I tested a workaround, putting the test_fact_cls below in
@@ -38,6 +43,7 @@ from dob_bright.crud.fact_dressed import FactDressed
 # but the other conftest's fixture always wins (so maybe pytest sorts
 # pytest_plugins?).
 from dob_bright.tests.conftest import *  # noqa: F401, F403
+from dob_bright.tests.conftest import _controller_with_logging, prepare_controller
 
 # Load all upstream fixtures into the test namespace, as
 # though the fixtures from dob-bright were defined herein.
@@ -69,6 +75,41 @@ def test_fact_cls_ro():
     return FactDressed
 
 
+# ***
+
+# Like the DobController, give the (nark) stores dob's item managers.
+
+@pytest.fixture
+def controller(config_root, mocker, test_fact_cls):
+    controller = prepare_controller(config_root=config_root)
+    controller.ctx = mocker.MagicMock()
+    controller.configurable = mocker.MagicMock()
+    controller.standup_store(fact_cls=test_fact_cls)
+    install_dob_managers(controller.store)
+    yield controller
+    controller.store.cleanup()
+
+
+@pytest.fixture
+def controller_with_logging(config_root, mocker, test_fact_cls):
+    controller = _controller_with_logging(config_root, mocker.MagicMock, test_fact_cls)
+    install_dob_managers(controller.store)
+    yield controller
+    controller.store.cleanup()
+
+
+@pytest.fixture
+def alchemy_store(alchemy_store):
+    install_dob_managers(alchemy_store)
+    return alchemy_store
+
+
+@pytest.fixture(scope="session")
+def alchemy_store_ro(alchemy_store_ro):
+    install_dob_managers(alchemy_store_ro)
+    return alchemy_store_ro
+
+
 # ***
 
 # (lb): Possible scope values: function, class, module, package or session.
@@ -89,6 +130,53 @@ def five_report_facts_ctl(
     #   alchemy_store_ro.session.execute('SELECT COUNT(*) FROM facts;').fetchall()
     controller.store = alchemy_store_ro
     controller.store.fact_cls = test_fact_cls_ro  # FactDressed
+    # (Some test modules import nark's store fixtures, which win over ours.)
+    install_dob_managers(controller.store)
     # Ignored: set_of_alchemy_facts_ro.
     yield controller
 
+
+# ***
+
+# The tests share one in-memory store, in which some fixtures keep their
+# Facts for the whole session (e.g., five_report_facts_ctl). So each test
+# that queries the store by time makes its Facts in a window of time of its
+# own (using isolated_fact_factory), and queries since isolated_since.
+ISOLATED_EPOCH = datetime.datetime(2100, 1, 1, 12, 0, 0)
+
+ISOLATED_WINDOW = datetime.timedelta(days=30)
+
+_isolated_windows = itertools.count()
+
+
+@pytest.fixture
+def isolated_since():
+    """Returns a start time after all Facts but the test's own (and unique to it)."""
+    return ISOLATED_EPOCH + next(_isolated_windows) * ISOLATED_WINDOW
+
+
+@pytest.fixture
+def isolated_fact_factory(alchemy_fact_factory, isolated_since):
+    """Returns a function that makes Facts back to back, from isolated_since.
+
+    Each Fact starts ``step`` after the last, and ends ``duration`` after it
+    starts. Pass ``start`` to start elsewhere (e.g., a later day), and other
+    keyword arguments to pass along to alchemy_fact_factory.
+    """
+    def make_facts(
+        count,
+        step=datetime.timedelta(hours=1),
+        duration=datetime.timedelta(minutes=30),
+        start=None,
+        **kwargs
+    ):
+        start = isolated_since if start is None else start
+        facts = []
+        for idx in range(count):
+            fact_start = start + idx * step
+            facts.append(alchemy_fact_factory(
+                start=fact_start, end=fact_start + duration, **kwargs
+            ))
+        return facts
+
+    return make_facts
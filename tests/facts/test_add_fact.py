@@ -173,6 +173,25 @@ class TestAddFact(object):
         expect_description = expectation.get('description', None)
         assert fact.description == expect_description
 
+    @freeze_time('2015-12-25 18:00')
+    def test_add_new_fact_fast_path(self, controller_with_logging, mocker):
+        """Make sure a one-off Fact is saved without the backup file machinery."""
+        controller = controller_with_logging
+        mocker.patch.object(controller.facts, 'save')
+        backedup = mocker.patch('dob.facts.add_fact.prompt_and_save_backedup')
+        add_fact(controller, '13:00 to 16:30: foo@bar', time_hint='verify_both')
+        assert controller.facts.save.call_count == 1
+        assert not backedup.called
+
+    @freeze_time('2015-12-25 18:00')
+    def test_add_new_fact_dry_skips_fast_path(self, controller_with_logging, mocker):
+        controller = controller_with_logging
+        backedup = mocker.patch('dob.facts.add_fact.prompt_and_save_backedup')
+        add_fact(
+            controller, '13:00 to 16:30: foo@bar', time_hint='verify_both', dry=True,
+        )
+        assert backedup.called
+
 
 # ***
 
@@ -17,7 +17,8 @@
 
 import pytest
 
-from dob.facts.echo_fact import echo_ongoing_fact
+from dob.facts import echo_fact
+from dob.facts.echo_fact import echo_ongoing_fact, format_fact_status
 
 
 class TestCurrent(object):
@@ -30,3 +31,26 @@ class TestCurrent(object):
             echo_ongoing_fact(controller)
             assert False  # Unreachable.
 
+    def test_ongoing_fact_cached_falls_back(
+        self, controller, ongoing_fact, mocker, capsys,
+    ):
+        """Make sure a missing (or stale) snapshot means querying the store."""
+        mocker.patch.object(echo_fact, 'load_status_snapshot', return_value=None)
+        find_fact = mocker.Mock(return_value=ongoing_fact)
+        echo_ongoing_fact(controller, cached=True, find_fact=find_fact)
+        assert find_fact.called
+        out, err = capsys.readouterr()
+        assert ongoing_fact.activity_name in out
+
+    def test_format_fact_status(self, ongoing_fact):
+        status = format_fact_status(ongoing_fact, '{pk}|{actegory}|{minutes}')
+        pk, actegory, minutes = status.split('|')
+        assert pk == str(ongoing_fact.pk)
+        assert actegory == '{}@{}'.format(
+            ongoing_fact.activity_name, ongoing_fact.category_name,
+        )
+        assert int(minutes) >= 0
+
+    def test_format_fact_status_unknown_field(self, ongoing_fact):
+        with pytest.raises(SystemExit):
+            format_fact_status(ongoing_fact, '{nope}')
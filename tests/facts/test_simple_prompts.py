@@ -0,0 +1,84 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2018-2020 Landon Bouma,  2015-2016 Eric Goller.  All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+import sqlite3
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from nark.backends.sqlalchemy.objects import AlchemyFact
+from nark.items.activity import Activity
+from nark.items.category import Category
+
+from dob_bright.crud.fact_dressed import FactDressed
+
+from dob.facts.simple_prompts import save_facts_maybe
+
+
+def locked_error():
+    return OperationalError('COMMIT', {}, sqlite3.OperationalError('database is locked'))
+
+
+class TestSaveFactsMaybe(object):
+    """Unit tests for saving the Facts that one-off commands add and edit."""
+
+    def test_retry_saves_edit_from_fresh_copy(
+        self, controller_with_logging, isolated_since, mocker,
+    ):
+        """Make sure a retried edit does not save what the failed try changed."""
+        controller = controller_with_logging
+        saved = controller.facts.save(FactDressed(
+            activity=Activity(name='foo', category=Category(name='bar')),
+            start=isolated_since,
+            end=isolated_since + datetime.timedelta(minutes=30),
+            description='original',
+        ))
+        edited = saved.copy()
+        edited.description = 'edited'
+        # Fail the commit of the edit once, as though another writer had the lock.
+        # (Patch the class, because patching the session looks like being within
+        # a single_transaction, which leaves the retry to its opener.)
+        mocker.patch.object(
+            Session, 'commit', autospec=True, side_effect=self.fail_once(Session.commit),
+        )
+        session = controller.store.session
+        new_and_edited = save_facts_maybe(
+            controller, [], [(edited, saved)], ignore_pks=[], dry=False,
+        )
+        assert len(new_and_edited) == 1
+        new_fact = new_and_edited[0]
+        assert new_fact.description == 'edited'
+        assert not new_fact.deleted
+        assert new_fact.split_from.pk == saved.pk
+        # The caller's Fact is unchanged, and no duplicate Fact was saved.
+        assert not edited.deleted
+        query = session.query(AlchemyFact).filter(AlchemyFact.start == saved.start)
+        assert sorted((fact.pk, fact.deleted) for fact in query) == [
+            (saved.pk, True), (new_fact.pk, False),
+        ]
+
+    def fail_once(self, commit):
+        tries = []
+
+        def flaky_commit(session):
+            tries.append(True)
+            if len(tries) == 1:
+                raise locked_error()
+            return commit(session)
+
+        return flaky_commit
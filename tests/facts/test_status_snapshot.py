@@ -0,0 +1,109 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import sqlite3
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+
+from nark.backends.sqlalchemy.objects import metadata
+
+from dob_bright.crud.fact_dressed import FactDressed
+
+from dob.facts import status_snapshot
+from dob.facts.status_snapshot import (
+    database_stamp,
+    load_status_snapshot,
+    snapshot_fact,
+    write_status_snapshot
+)
+from dob.store.changes import FACT_CHANGES_DDL
+
+
+class TestStatusSnapshot(object):
+    """Unit tests for the status snapshot behind ``dob current --cached``."""
+
+    def mock_snapshot(self, mocker, tmpdir, stamp):
+        snapshot_path = tmpdir.join('status.json').strpath
+        mocker.patch.object(
+            status_snapshot, 'status_snapshot_path', return_value=snapshot_path,
+        )
+        return mocker.patch.object(status_snapshot, 'database_stamp', return_value=stamp)
+
+    def test_snapshot_round_trip(self, controller, fact, mocker, tmpdir):
+        self.mock_snapshot(mocker, tmpdir, ['dob.sqlite', [1, 2], None])
+        fact.end = None
+        fact.description = 'first line\nsecond line'
+        write_status_snapshot(controller, fact)
+        snapshot = load_status_snapshot(controller)
+        cached = snapshot_fact(snapshot, FactDressed)
+        assert cached.pk == fact.pk
+        assert cached.start == fact.start.replace(microsecond=0)
+        assert cached.activity_name == fact.activity_name
+        assert cached.category_name == fact.category_name
+        assert cached.tagnames() == fact.tagnames()
+        assert cached.description == 'first line'
+
+    def test_snapshot_no_active_fact(self, controller, mocker, tmpdir):
+        self.mock_snapshot(mocker, tmpdir, ['dob.sqlite', [1, 2], None])
+        write_status_snapshot(controller, None)
+        snapshot = load_status_snapshot(controller)
+        assert snapshot is not None
+        assert snapshot_fact(snapshot, FactDressed) is None
+
+    def test_snapshot_stale(self, controller, fact, mocker, tmpdir):
+        stamp = self.mock_snapshot(mocker, tmpdir, ['dob.sqlite', [1, 2], None])
+        write_status_snapshot(controller, fact)
+        # E.g., another process wrote to the database.
+        stamp.return_value = ['dob.sqlite', [3, 4], None]
+        assert load_status_snapshot(controller) is None
+
+    def test_snapshot_not_written_for_memory_store(self, controller):
+        # The test store is in-memory, so there's no file to stamp.
+        assert status_snapshot.database_stamp(controller) is None
+
+    def test_stamp_stable_across_wal_checkpoint(self, tmpdir):
+        db_path = tmpdir.join('dob.sqlite').strpath
+        engine = create_engine('sqlite:///{}'.format(db_path))
+        metadata.create_all(engine)
+        with engine.begin() as conn:
+            for _name, ddl in FACT_CHANGES_DDL:
+                conn.execute(ddl)
+        engine.dispose()
+        controller = SimpleNamespace(config={'db.engine': 'sqlite', 'db.path': db_path})
+
+        def insert_fact(conn):
+            conn.execute(
+                "INSERT INTO facts (start_time, deleted, description)"
+                " VALUES ('2020-01-01 10:00:00.000000', 0, '')"
+            )
+            conn.commit()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode = WAL')
+        insert_fact(conn)
+        # Stamp while the write-ahead log still holds the write...
+        stamp = database_stamp(controller)
+        assert tmpdir.join('dob.sqlite-wal').check()
+        # ...and again once closing checkpoints it into the database file.
+        conn.close()
+        assert not tmpdir.join('dob.sqlite-wal').check()
+        assert database_stamp(controller) == stamp
+        conn = sqlite3.connect(db_path)
+        insert_fact(conn)
+        conn.close()
+        assert database_stamp(controller) != stamp
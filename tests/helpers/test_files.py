@@ -0,0 +1,51 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2018-2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import json
+
+import pytest
+
+from dob.helpers.files import file_lock, write_json_atomic
+
+
+class TestWriteJsonAtomic(object):
+    def test_write_and_replace(self, tmp_path):
+        path = str(tmp_path / 'atomic.json')
+        write_json_atomic(path, {'run': 1})
+        write_json_atomic(path, {'run': 2}, fsync=True)
+        with open(path, 'r') as json_f:
+            assert json.load(json_f) == {'run': 2}
+        assert [child.name for child in tmp_path.iterdir()] == ['atomic.json']
+
+    def test_failure_leaves_file_and_no_temporary(self, tmp_path):
+        path = str(tmp_path / 'atomic.json')
+        write_json_atomic(path, {'run': 1})
+        with pytest.raises(TypeError):
+            write_json_atomic(path, {'run': object()})
+        with open(path, 'r') as json_f:
+            assert json.load(json_f) == {'run': 1}
+        assert [child.name for child in tmp_path.iterdir()] == ['atomic.json']
+
+
+class TestFileLock(object):
+    def test_lock_creates_lock_file(self, tmp_path):
+        lock_path = tmp_path / 'atomic.json.lock'
+        with file_lock(str(lock_path)):
+            assert lock_path.exists()
+        # And the lock is released, so it can be taken again.
+        with file_lock(str(lock_path)):
+            pass
@@ -0,0 +1,81 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import os
+
+import dob
+from dob.helpers.versions import package_versions
+
+
+class TestPackageVersions(object):
+    def test_package_versions_cached(self, tmpdir, mocker):
+        cache_path = tmpdir.join('versions.json').strpath
+        mocker.patch(
+            'dob.helpers.versions.get_appdirs_subdir_file_path',
+            return_value=cache_path,
+        )
+        get_version = mocker.patch.object(dob, 'get_version', return_value='1.2.3')
+        assert package_versions(['dob']) == [('dob', '1.2.3')]
+        assert os.path.exists(cache_path)
+        assert package_versions(['dob']) == [('dob', '1.2.3')]
+        assert get_version.call_count == 1
+        # A different lookup (e.g., with git details) is cached separately.
+        assert package_versions(['dob'], include_head=True) == [('dob', '1.2.3')]
+        assert get_version.call_count == 2
+
+    def test_package_versions_stale_stamp(self, tmpdir, mocker):
+        cache_path = tmpdir.join('versions.json').strpath
+        mocker.patch(
+            'dob.helpers.versions.get_appdirs_subdir_file_path',
+            return_value=cache_path,
+        )
+        get_version = mocker.patch.object(dob, 'get_version', return_value='1.2.3')
+        stamp = mocker.patch('dob.helpers.versions.version_stamp', return_value=[1])
+        package_versions(['dob'])
+        stamp.return_value = [2]
+        package_versions(['dob'])
+        assert get_version.call_count == 2
+
+
+class TestGetVersion(object):
+    def test_get_version_worktree_prefers_git(self, tmpdir, mocker):
+        cache_path = tmpdir.join('versions.json').strpath
+        mocker.patch(
+            'dob.helpers.versions.get_appdirs_subdir_file_path',
+            return_value=cache_path,
+        )
+        mocker.patch(
+            'dob.helpers.versions.git_worktree_dir',
+            return_value=tmpdir.strpath,
+        )
+        # A stale version stamped at install time, which git should trump.
+        mocker.patch.dict('sys.modules', {
+            'dob._version': mocker.Mock(version='0.0.1'),
+        })
+        nark_version = mocker.patch.object(
+            dob, '_nark_get_version', return_value='1.2.3.dev4',
+        )
+        assert dob.get_version() == '1.2.3.dev4'
+        assert dob.get_version() == '1.2.3.dev4'
+        assert nark_version.call_count == 1
+
+    def test_get_version_installed_uses_stamp(self, mocker):
+        mocker.patch('dob.helpers.versions.git_worktree_dir', return_value=None)
+        mocker.patch.dict('sys.modules', {
+            'dob._version': mocker.Mock(version='0.0.1'),
+        })
+        assert dob.get_version() == '0.0.1'
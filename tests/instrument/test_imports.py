@@ -0,0 +1,82 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+import sys
+
+import lazy_import
+import pytest
+
+from dob.instrument.imports import (
+    HOT_PATH_HEAVY_MODULES,
+    heavy_modules_imported,
+    heavy_modules_loaded,
+    import_times,
+    module_is_loaded
+)
+
+
+class TestModuleIsLoaded(object):
+    def test_lazy_module_not_loaded(self):
+        lazy_mod = lazy_import.lazy_module('dob.tests_lazy_module_never_loaded')
+        modules = {'dob.tests_lazy_module_never_loaded': lazy_mod}
+        assert not module_is_loaded('dob.tests_lazy_module_never_loaded', modules)
+        assert module_is_loaded('os', {'os': os})
+        assert not module_is_loaded('os', {})
+
+
+def run_dob(args, env):
+    proc = subprocess.run(
+        [sys.executable, '-c', 'from dob.dob import run; run()'] + args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        check=True,
+    )
+    return proc.stdout
+
+
+class TestImportBudget(object):
+    """Keeps the heavy (UI, storage) modules off of dob's startup path."""
+
+    def test_import_dob_loads_no_heavy_modules(self):
+        assert heavy_modules_imported() == []
+
+    @pytest.mark.parametrize('command', (
+        ['current'],
+        ['now', 'Testing@Tests: Import budget.'],
+    ))
+    def test_hot_path_loads_no_heavy_modules(self, command, tmpdir):
+        env = dict(os.environ)
+        for xdg_var in ('XDG_CONFIG_HOME', 'XDG_DATA_HOME', 'XDG_CACHE_HOME'):
+            env[xdg_var] = tmpdir.mkdir(xdg_var).strpath
+        heavy_modules_imported(['init'], env=env)
+        assert heavy_modules_imported(command, HOT_PATH_HEAVY_MODULES, env) == []
+        if command[0] == 'now':
+            # Verify the command did its job, and did not just bail early.
+            assert 'Import budget.' in run_dob(['current'], env)
+
+    def test_import_times(self):
+        times = import_times('dob.instrument')
+        assert times[-1].name == 'dob.instrument'
+        assert times[-1].depth == 0
+        assert all(imported.cumulative_us >= imported.self_us for imported in times)
+
+    def test_heavy_modules_loaded(self):
+        assert heavy_modules_loaded(('os', 'dob_no_such_module')) == ['os']
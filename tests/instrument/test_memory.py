@@ -0,0 +1,79 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import json
+import tracemalloc
+
+from dob.instrument.memory import MemoryProfiler, current_rss
+from dob.instrument.timeline import PhaseTimeline
+
+
+def allocate_lots():
+    return [str(idx) * 10 for idx in range(20000)]
+
+
+class TestMemoryProfiler(object):
+    """Unit tests for the per-phase memory accounting behind ``dob --memprofile``."""
+
+    def test_current_rss(self):
+        assert current_rss() > 0
+
+    def test_phases(self):
+        timeline = PhaseTimeline()
+        profiler = MemoryProfiler(timeline=timeline)
+        profiler.start()
+        try:
+            with timeline.phase('query'):
+                kept = allocate_lots()
+                with timeline.phase('render'):
+                    allocate_lots()
+        finally:
+            profiler.stop()
+        profile = json.loads(json.dumps(profiler.as_dict()))
+        query, render = profile['phases']
+        assert (query['name'], query['depth']) == ('query', 0)
+        assert (render['name'], render['depth']) == ('render', 1)
+        # What render freed doesn't count as allocated, but it counts
+        # toward the peak (its own, and its parent's).
+        assert render['allocated'] < render['peak_growth']
+        assert query['peak'] >= render['peak']
+        assert query['allocated'] > 20000 * 10
+        assert any('test_memory.py' in site['site'] for site in query['top'])
+        assert profile['peak'] >= query['peak']
+        assert profile['rss_peak'] > 0
+        assert profile['rss_samples']
+        assert kept
+
+    def test_phases_sampled_peaks(self, mocker):
+        # Before Python 3.9, tracemalloc cannot reset its peak.
+        mocker.patch('dob.instrument.memory.tracemalloc.reset_peak', create=True)
+        timeline = PhaseTimeline()
+        profiler = MemoryProfiler(timeline=timeline)
+        profiler.sampled_peaks = True
+        profiler.start()
+        try:
+            with timeline.phase('query'):
+                kept = allocate_lots()
+        finally:
+            profiler.stop()
+        profile = profiler.as_dict()
+        query, = profile['phases']
+        assert profile['sampled_peaks']
+        assert query['peak_growth'] >= query['allocated'] > 20000 * 10
+        assert profile['peak'] >= query['peak']
+        assert not tracemalloc.reset_peak.called
+        assert kept
@@ -0,0 +1,109 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import multiprocessing
+import types
+
+import pytest
+
+from dob.instrument.plugins import (
+    PLUGIN_COSTS_HISTORY,
+    PluginCosts,
+    echo_plugin_costs,
+    load_plugin_costs,
+    plugin_name,
+    summarize_plugin_costs,
+)
+
+
+@pytest.fixture
+def costs(mocker, tmp_path):
+    # Don't leave save() registered to run when pytest exits.
+    mocker.patch('atexit.register')
+    return PluginCosts(history_path=str(tmp_path / 'plugin-costs.json'))
+
+
+def pushes():
+    pass
+
+
+CONCURRENT_SAVERS = 4
+CONCURRENT_SAVES = 10
+
+
+def concurrent_saver(history_path):
+    """Runs in its own process: Save CONCURRENT_SAVES runs to the history."""
+    costs = PluginCosts(history_path=history_path)
+    costs.saving = True
+    for _run in range(CONCURRENT_SAVES):
+        costs.record('push.py', 'load', 0.01)
+        costs.save()
+
+
+class TestPluginCosts(object):
+    """Unit tests for the per-plugin accounting behind ``dob details --tmi``."""
+
+    def test_plugin_name(self):
+        assert plugin_name('/path/to/plugins/push.py') == 'push.py'
+        assert plugin_name(pushes) == 'test_plugins.py'
+
+    def test_timed_counts_failures(self, costs):
+        with costs.timed('push.py', 'hook'):
+            pass
+        with pytest.raises(ValueError):
+            with costs.timed('push.py', 'hook'):
+                raise ValueError()
+        costs.record('push.py', 'load', 0.5)
+        plugin = costs.plugins['push.py']
+        assert plugin['calls'] == 2
+        assert plugin['failures'] == 1
+        assert plugin['load'] == 0.5
+
+    def test_history_rolls(self, costs):
+        for _run in range(PLUGIN_COSTS_HISTORY + 2):
+            costs.record('push.py', 'load', 0.01)
+            costs.save()
+        history = load_plugin_costs(costs.history_path)
+        assert len(history) == PLUGIN_COSTS_HISTORY
+        # Nothing recorded since the last save, so nothing to add.
+        costs.save()
+        assert len(load_plugin_costs(costs.history_path)) == PLUGIN_COSTS_HISTORY
+
+    def test_history_keeps_concurrent_saves(self, costs):
+        with multiprocessing.Pool(CONCURRENT_SAVERS) as pool:
+            pool.map(concurrent_saver, [costs.history_path] * CONCURRENT_SAVERS)
+        history = load_plugin_costs(costs.history_path)
+        assert len(history) == CONCURRENT_SAVERS * CONCURRENT_SAVES
+
+    def test_summarize_and_flag(self, costs, capsys):
+        costs.record('fast.py', 'load', 0.001)
+        costs.record('slow.py', 'load', 0.1)
+        costs.record('slow.py', 'hook', 0.3)
+        costs.save()
+        costs.record('slow.py', 'load', 0.1)
+        costs.save()
+        summary = summarize_plugin_costs(load_plugin_costs(costs.history_path))
+        assert summary['slow.py']['runs'] == 2
+        assert summary['slow.py']['latency'] == pytest.approx(250)
+        assert summary['fast.py']['latency'] == pytest.approx(1)
+
+        controller = types.SimpleNamespace(config={'plugins.cost_threshold': 100})
+        echo_plugin_costs(controller, path=costs.history_path)
+        lines = capsys.readouterr().out.splitlines()
+        flagged = [line for line in lines if 'adds over 100 ms' in line]
+        assert len(flagged) == 1
+        assert 'slow.py' in flagged[0]
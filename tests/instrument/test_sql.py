@@ -0,0 +1,94 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import io
+import types
+
+from sqlalchemy import create_engine
+
+from dob.instrument.sql import (
+    N_PLUS_ONE_REPEATS,
+    QueryStats,
+    echo_query_summary,
+    install_query_instrumentation,
+    normalize_statement,
+)
+
+
+def instrumented_engine(tmp_path, slow_query_ms=0, count_rows=True):
+    db_url = 'sqlite:///{}'.format(tmp_path / 'dob.sqlite')
+    store = types.SimpleNamespace(create_storage_engine=lambda: create_engine(db_url))
+    config = {
+        'log.slow_query_ms': slow_query_ms,
+        'log.filepath': str(tmp_path / 'dob.log'),
+    }
+    stats = QueryStats()
+    install_query_instrumentation(store, config, count_rows=count_rows, stats=stats)
+    engine = store.create_storage_engine()
+    engine.execute('CREATE TABLE facts (id INTEGER PRIMARY KEY, name TEXT)')
+    for pk in range(1, 21):
+        engine.execute('INSERT INTO facts (id, name) VALUES (?, ?)', pk, 'fact')
+    return engine, stats
+
+
+class TestQueryInstrumentation(object):
+    """Unit tests for the SQL accounting behind ``dob -VV``."""
+
+    def test_normalize_statement(self):
+        assert normalize_statement(
+            "SELECT *\n  FROM facts WHERE id = 12 AND name = 'it''s'"
+        ) == 'SELECT * FROM facts WHERE id = ? AND name = ?'
+        assert normalize_statement(
+            'SELECT * FROM tags WHERE id IN (?, ?, ?)'
+        ) == 'SELECT * FROM tags WHERE id IN (?...)'
+
+    def test_counts_statements_and_rows(self, tmp_path):
+        engine, stats = instrumented_engine(tmp_path)
+        rows = engine.execute('SELECT id FROM facts WHERE id <= ?', 5).fetchall()
+        assert len(rows) == 5
+        select, = [
+            stmt for stmt in stats.by_statement() if stmt.statement.startswith('SELECT')
+        ]
+        assert select.count == 1
+        assert select.rows == 5
+        # CREATE, 20 INSERTs, and the SELECT.
+        assert stats.count == 22
+        assert stats.rows == 5
+
+    def test_detects_n_plus_one(self, tmp_path):
+        engine, stats = instrumented_engine(tmp_path)
+        for pk in range(1, N_PLUS_ONE_REPEATS + 1):
+            engine.execute('SELECT name FROM facts WHERE id = ?', pk).fetchone()
+        # The same statement with the same parameters is not N+1.
+        for _repeat in range(N_PLUS_ONE_REPEATS):
+            engine.execute('SELECT count(*) FROM facts').scalar()
+        n_plus_one = [stmt.statement for stmt in stats.n_plus_one()]
+        assert 'SELECT name FROM facts WHERE id = ?' in n_plus_one
+        assert 'SELECT count(*) FROM facts' not in n_plus_one
+        summary = io.StringIO()
+        echo_query_summary(stats, file=summary)
+        assert 'Possible N+1' in summary.getvalue()
+
+    def test_slow_query_log(self, tmp_path):
+        engine, stats = instrumented_engine(tmp_path, slow_query_ms=1e-6)
+        engine.execute('SELECT name FROM facts WHERE id = ?', 3).fetchone()
+        slow_log = (tmp_path / 'slow-queries.log').read_text()
+        assert 'SELECT name FROM facts WHERE id = ?\t(3,)' in slow_log
+
+    def test_no_slow_query_log(self, tmp_path):
+        engine, stats = instrumented_engine(tmp_path, slow_query_ms=0)
+        assert not (tmp_path / 'slow-queries.log').exists()
@@ -0,0 +1,77 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import json
+
+from dob.instrument.timeline import PhaseTimeline
+
+
+class TestPhaseTimeline(object):
+    """Unit tests for the phase timeline behind ``dob --profile``."""
+
+    def test_nested_phases(self):
+        timeline = PhaseTimeline()
+        with timeline.phase('outer'):
+            with timeline.phase('inner'):
+                pass
+        profile = timeline.as_dict()
+        names = [phase['name'] for phase in profile['phases']]
+        # Parents sort before their children.
+        assert names == ['outer', 'inner']
+        depths = [phase['depth'] for phase in profile['phases']]
+        assert depths == [0, 1]
+        assert profile['total'] >= profile['phases'][0]['duration']
+
+    def test_trace_events(self):
+        timeline = PhaseTimeline()
+        with timeline.phase('query'):
+            pass
+        profile = json.loads(json.dumps(timeline.as_trace_events()))
+        events = profile['traceEvents']
+        # The first event spans the whole process.
+        assert events[0]['ts'] == 0
+        assert events[1]['name'] == 'query'
+        assert all(event['ph'] == 'X' for event in events)
+
+
+class TestProfileOption(object):
+    """Integration test for the global ``--profile`` option."""
+
+    def test_profile_writes_timeline(self, runner, tmpdir):
+        profile_path = tmpdir.join('profile.json').strpath
+        result = runner(['--profile', profile_path])
+        assert result.exit_code == 0
+        with open(profile_path, 'r') as profile_f:
+            profile = json.load(profile_f)
+        names = [phase['name'] for phase in profile['phases']]
+        assert 'config' in names
+
+    def test_split_phase(self):
+        timeline = PhaseTimeline()
+        # Not within the parent, so nothing to split.
+        timeline.split('hydrate', parent='query')
+        with timeline.phase('query'):
+            timeline.split('hydrate', parent='query')
+            # Already split, so not again.
+            timeline.split('hydrate', parent='query')
+        with timeline.phase('render'):
+            pass
+        phases = [
+            (phase['name'], phase['depth']) for phase in timeline.as_dict()['phases']
+        ]
+        assert phases == [('query', 0), ('hydrate', 1), ('render', 0)]
+        assert timeline.depth == 0
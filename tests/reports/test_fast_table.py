@@ -0,0 +1,100 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import io
+
+from dob.reports.fast_table import (
+    FastTableWriter,
+    ansi_truncate,
+    cell_text,
+    fit_column_widths,
+    visible_len
+)
+
+
+class TestFastTable(object):
+    """Unit tests for the fixed-width 'fast' table."""
+
+    RED = '\x1b[31m'
+    RESET = '\x1b[0m'
+
+    def _write_table(self, rows, headers, max_width=0, row_limit=0, sample_size=500):
+        output = io.StringIO()
+        writer = FastTableWriter(max_width=max_width, sample_size=sample_size)
+        writer.output_setup(output_obj=output, row_limit=row_limit)
+        n_written = writer.write_report_table(rows, headers)
+        return n_written, output.getvalue().splitlines()
+
+    def test_ansi_truncate(self):
+        assert ansi_truncate('abcdefghij', 10) == 'abcdefghij'
+        assert ansi_truncate('abcdefghij', 6) == 'abc...'
+        assert ansi_truncate('abcdefghij', 2) == 'ab'
+        # The color codes take no room, and the style is reset after the cut.
+        text = 'ab' + self.RED + 'cdefgh' + self.RESET + 'ij'
+        assert visible_len(text) == 10
+        assert ansi_truncate(text, 10) == text
+        truncated = ansi_truncate(text, 7)
+        assert truncated == 'ab' + self.RED + 'cd...' + self.RESET
+        assert visible_len(truncated) == 7
+
+    def test_cell_text_one_line(self):
+        assert cell_text(None) == ''
+        assert cell_text(12) == '12'
+        assert cell_text('one\ntwo\tthree') == 'one\\ntwo three'
+
+    def test_fit_column_widths(self):
+        # 3 columns take 10 characters of borders.
+        assert fit_column_widths([5, 20, 30], 0) == [5, 20, 30]
+        assert fit_column_widths([5, 20, 30], 65) == [5, 20, 30]
+        # The widest columns give up their room first.
+        assert fit_column_widths([5, 20, 30], 45) == [5, 15, 15]
+        assert fit_column_widths([5, 20, 30], 44) == [5, 15, 14]
+        assert fit_column_widths([5, 20, 30], 16) == [2, 2, 2]
+        assert fit_column_widths([5, 20, 30], 12) is None
+
+    def test_writer_one_line_per_row(self):
+        rows = [
+            (1, 'Alpha', 'Short'),
+            (22, 'Beta', 'A description\nthat is much too long'),
+        ]
+        n_written, lines = self._write_table(
+            rows, ('Key', 'Name', 'Description'), max_width=40,
+        )
+        assert n_written == 2
+        assert lines == [
+            '+-----+-------+------------------------+',
+            '| Key | Name  |      Description       |',
+            '+=====+=======+========================+',
+            '|   1 | Alpha | Short                  |',
+            '|  22 | Beta  | A description\\nthat... |',
+            '+-----+-------+------------------------+',
+        ]
+        assert all(len(line) == 40 for line in lines)
+
+    def test_writer_sizes_columns_from_sample(self):
+        rows = iter([('a',), ('bb',), ('cccccc',)])
+        n_written, lines = self._write_table(
+            rows, ('X',), row_limit=3, sample_size=2,
+        )
+        assert n_written == 3
+        # The third row was not sampled, so it's truncated to fit.
+        assert lines[3:6] == ['|  a |', '| bb |', '| cc |']
+        n_written, lines = self._write_table(
+            iter([('a',), ('bb',), ('cccccc',)]), ('X',), row_limit=2,
+        )
+        assert n_written == 2
+        assert lines[3:] == ['|      a |', '|     bb |', '+--------+']
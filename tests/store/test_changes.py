@@ -0,0 +1,163 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import copy
+import datetime
+import json
+import logging
+import types
+
+import pytest
+
+from nark.backends.sqlalchemy.storage import SQLAlchemyStore
+from nark.items.activity import Activity
+from nark.items.category import Category
+from nark.items.fact import Fact
+
+from dob.store.changes import (
+    compact_fact_changes,
+    echo_fact_changes,
+    ensure_fact_changes,
+    fact_changes,
+)
+
+
+@pytest.fixture
+def feed_store(alchemy_config, tmpdir):
+    """A new nark store on file, with the change feed."""
+    config = copy.deepcopy(alchemy_config)
+    config['db']['path'] = str(tmpdir.join('feed.sqlite'))
+    store = SQLAlchemyStore(config)
+    store.standup()
+    ensure_fact_changes(store)
+    yield store
+    store.session.close()
+
+
+def feed_controller(store, retention_days=0, retention_rows=0):
+    return types.SimpleNamespace(
+        config={
+            'db.changes.retention_days': retention_days,
+            'db.changes.retention_rows': retention_rows,
+            'db.sqlite.write_lock': False,
+            'db.sqlite.write_retries': 0,
+            'db.sqlite.retry_backoff': 0,
+        },
+        store=store,
+        client_logger=logging.getLogger('dob'),
+    )
+
+
+class TestFactChanges(object):
+    """Unit tests for the Fact change feed."""
+
+    START = datetime.datetime(2100, 1, 1, 12, 0, 0)
+
+    def _save_fact(self, store):
+        activity = Activity(name='feeding', category=Category(name='changes'))
+        fact = Fact(activity=activity, start=self.START, description='feed')
+        return store.facts.save(fact)
+
+    def test_insert_and_update_appended(self, feed_store):
+        store = feed_store
+        fact = self._save_fact(store)
+        fact.end = self.START + datetime.timedelta(hours=1)
+        store.facts.save(fact)
+        changes = list(fact_changes(store))
+        assert [change['op'] for change in changes] == ['insert', 'update']
+        assert all(change['fact_id'] == fact.pk for change in changes)
+        assert changes[0]['end'] is None
+        assert changes[1]['end'] == '2100-01-01 13:00:00'
+        assert changes[1]['activity'] == fact.activity.name
+        assert changes[1]['category'] == fact.activity.category.name
+        # The sequence only increases, and --since skips what's been seen.
+        assert changes[0]['seq'] < changes[1]['seq']
+        assert list(fact_changes(store, since=changes[0]['seq'])) == changes[1:]
+
+    def test_batches(self, feed_store):
+        store = feed_store
+        fact = self._save_fact(store)
+        for minutes in range(1, 6):
+            fact.end = self.START + datetime.timedelta(minutes=minutes)
+            fact = store.facts.save(fact, ignore_pks=[fact.pk])
+        changes = list(fact_changes(store, batch_size=2))
+        # One insert, the in-place stop, then each edit inserts the new Fact,
+        # marks the old one deleted, and (as nark finishes saving) updates
+        # the new one.
+        assert len(changes) == 2 + 4 * 3
+        assert changes == list(fact_changes(store))
+        new_fact, old_fact = changes[-3], changes[-2]
+        assert (new_fact['op'], old_fact['op']) == ('insert', 'update')
+        assert old_fact['deleted']
+        assert new_fact['split_from'] == old_fact['fact_id']
+
+    def test_echo_json_lines(self, feed_store, capsys):
+        store = feed_store
+        fact = self._save_fact(store)
+        echo_fact_changes(feed_controller(store))
+        out, err = capsys.readouterr()
+        change = json.loads(out.strip())
+        assert change['fact_id'] == fact.pk
+        assert change['description'] == 'feed'
+
+    def test_compact_by_rows(self, feed_store):
+        store = feed_store
+        fact = self._save_fact(store)
+        for minutes in range(1, 5):
+            fact.end = self.START + datetime.timedelta(minutes=minutes)
+            fact = store.facts.save(fact, ignore_pks=[fact.pk])
+        last_seq = list(fact_changes(store))[-1]['seq']
+        assert last_seq == 2 + 3 * 3
+        assert compact_fact_changes(feed_controller(store, retention_rows=2)) == 9
+        assert [change['seq'] for change in fact_changes(store)] == [
+            last_seq - 1, last_seq,
+        ]
+
+    def test_compact_waits_until_past_retention(self, feed_store):
+        store = feed_store
+        fact = self._save_fact(store)
+        for minutes in range(1, 5):
+            fact.end = self.START + datetime.timedelta(minutes=minutes)
+            fact = store.facts.save(fact, ignore_pks=[fact.pk])
+        # 11 changes is within a tenth of 10, so they're left be...
+        assert compact_fact_changes(feed_controller(store, retention_rows=10)) == 0
+        assert len(list(fact_changes(store))) == 11
+        # ...but 11 is more than a tenth past 9.
+        assert compact_fact_changes(feed_controller(store, retention_rows=9)) == 2
+        # Likewise, the oldest change must be a day past the retention.
+        controller = feed_controller(store, retention_days=1)
+        for ago, compacted in (('-36 hours', 0), ('-60 hours', 1)):
+            store.session.execute(
+                "UPDATE dob_fact_changes SET changed_at = strftime("
+                "  '%Y-%m-%dT%H:%M:%fZ', 'now', :ago)"
+                " WHERE seq = (SELECT MIN(seq) FROM dob_fact_changes)",
+                {'ago': ago},
+            )
+            assert compact_fact_changes(controller) == compacted
+
+    def test_compact_by_days_keeps_recent(
+        self, feed_store,
+    ):
+        store = feed_store
+        self._save_fact(store)
+        assert compact_fact_changes(feed_controller(store, retention_days=1)) == 0
+        assert len(list(fact_changes(store))) == 1
+        store.session.execute(
+            "UPDATE dob_fact_changes SET changed_at = '2000-01-01T00:00:00.000Z'"
+        )
+        assert compact_fact_changes(feed_controller(store, retention_days=1)) == 1
+        assert not list(fact_changes(store))
@@ -0,0 +1,155 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import logging
+import multiprocessing
+import sqlite3
+import types
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from dob.store.contention import (
+    WRITE_CONTENTION,
+    is_database_locked,
+    retry_write,
+    write_lock_path,
+)
+
+STRESS_WRITERS = 8
+STRESS_WRITES = 25
+
+
+def stress_controller(db_path, session, write_lock=False, write_retries=200):
+    config = {
+        'db.engine': 'sqlite',
+        'db.path': db_path,
+        'db.sqlite.write_lock': write_lock,
+        'db.sqlite.write_retries': write_retries,
+        'db.sqlite.retry_backoff': 1,
+    }
+    return types.SimpleNamespace(
+        config=config,
+        store=types.SimpleNamespace(session=session),
+        client_logger=logging.getLogger('dob'),
+    )
+
+
+def stress_session(db_path):
+    # A tiny busy timeout, so writers collide (and retry) often.
+    engine = create_engine(
+        'sqlite:///{}'.format(db_path),
+        connect_args={'timeout': 0.001},
+        poolclass=NullPool,
+    )
+    return sessionmaker(bind=engine)()
+
+
+def stress_writer(db_path, writer, write_lock):
+    """Runs in its own process: Insert STRESS_WRITES rows, one per transaction."""
+    session = stress_session(db_path)
+    controller = stress_controller(db_path, session, write_lock)
+
+    def insert(seq):
+        session.execute(
+            text('INSERT INTO writes (writer, seq) VALUES (:writer, :seq)'),
+            {'writer': writer, 'seq': seq},
+        )
+        session.commit()
+
+    retries_0 = WRITE_CONTENTION.retries
+    for seq in range(STRESS_WRITES):
+        retry_write(controller, lambda: insert(seq))
+    return WRITE_CONTENTION.retries - retries_0
+
+
+def locked_error():
+    return OperationalError('INSERT', {}, sqlite3.OperationalError('database is locked'))
+
+
+class TestRetryWrite(object):
+    """Unit tests for retrying writes on a locked database."""
+
+    def test_is_database_locked(self):
+        assert is_database_locked(locked_error())
+        assert not is_database_locked(
+            OperationalError('INSERT', {}, sqlite3.OperationalError('no such table'))
+        )
+        assert not is_database_locked(ValueError('database is locked'))
+
+    def test_retries_until_success(self, mocker, tmpdir):
+        session = mocker.MagicMock()
+        controller = stress_controller(str(tmpdir.join('db.sqlite')), session)
+        write = mocker.MagicMock(side_effect=[locked_error(), locked_error(), 'saved'])
+        assert retry_write(controller, write) == 'saved'
+        assert write.call_count == 3
+        assert session.rollback.call_count == 2
+
+    def test_gives_up_after_retries(self, mocker, tmpdir):
+        session = mocker.MagicMock()
+        controller = stress_controller(
+            str(tmpdir.join('db.sqlite')), session, write_retries=1,
+        )
+        write = mocker.MagicMock(side_effect=locked_error())
+        with pytest.raises(OperationalError):
+            retry_write(controller, write)
+        assert write.call_count == 2
+
+    def test_other_errors_not_retried(self, mocker, tmpdir):
+        controller = stress_controller(str(tmpdir.join('db.sqlite')), mocker.MagicMock())
+        write = mocker.MagicMock(side_effect=ValueError('Oops'))
+        with pytest.raises(ValueError):
+            retry_write(controller, write)
+        assert write.call_count == 1
+
+    def test_write_lock_path(self, mocker):
+        controller = stress_controller('/tmp/dob.sqlite', None)
+        assert write_lock_path(controller) is None
+        controller.config['db.sqlite.write_lock'] = True
+        assert write_lock_path(controller) == '/tmp/dob.sqlite.lock'
+        controller.config['db.path'] = ':memory:'
+        assert write_lock_path(controller) is None
+
+
+class TestConcurrentWriters(object):
+    """Stress test: many writer processes on one SQLite store."""
+
+    @pytest.mark.parametrize('write_lock', [False, True])
+    def test_concurrent_writers(self, tmpdir, write_lock):
+        db_path = str(tmpdir.join('stress.sqlite'))
+        session = stress_session(db_path)
+        session.execute(text('CREATE TABLE writes (writer INTEGER, seq INTEGER)'))
+        session.commit()
+
+        with multiprocessing.Pool(STRESS_WRITERS) as pool:
+            retries = pool.starmap(
+                stress_writer,
+                [(db_path, writer, write_lock) for writer in range(STRESS_WRITERS)],
+            )
+
+        rows = session.execute(text('SELECT writer, seq FROM writes')).fetchall()
+        assert sorted(tuple(row) for row in rows) == [
+            (writer, seq)
+            for writer in range(STRESS_WRITERS)
+            for seq in range(STRESS_WRITES)
+        ]
+        if write_lock:
+            # The writers took turns, so SQLite never found itself busy.
+            assert not any(retries)
@@ -0,0 +1,80 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from sqlalchemy import event
+
+from dob.store.eager import eager_loading
+
+
+class TestEagerLoading(object):
+    """Unit tests for eager loading the relationships that reports read."""
+
+    def _make_facts(self, isolated_fact_factory, alchemy_tag_factory, count, **kwargs):
+        for fact in isolated_fact_factory(count, **kwargs):
+            fact.tags.append(alchemy_tag_factory())
+
+    def _count_queries(self, controller, alchemy_store, since, eager):
+        # Start from an empty identity map, so relationships aren't cached.
+        alchemy_store.session.expunge_all()
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        bind = alchemy_store.session.get_bind()
+        event.listen(bind, 'before_cursor_execute', count)
+        try:
+            if eager:
+                with eager_loading(controller):
+                    facts = controller.facts.get_all(since=since)
+            else:
+                facts = controller.facts.get_all(since=since)
+        finally:
+            event.remove(bind, 'before_cursor_execute', count)
+        assert all(fact.activity.category.name for fact in facts)
+        assert all(fact.tags for fact in facts)
+        return len(statements)
+
+    def test_constant_queries(
+        self,
+        controller,
+        alchemy_store,
+        test_fact_cls,
+        isolated_since,
+        isolated_fact_factory,
+        alchemy_tag_factory,
+    ):
+        controller.store = alchemy_store
+        controller.store.fact_cls = test_fact_cls
+        self._make_facts(isolated_fact_factory, alchemy_tag_factory, 3)
+        lazy_3 = self._count_queries(controller, alchemy_store, isolated_since, False)
+        eager_3 = self._count_queries(controller, alchemy_store, isolated_since, True)
+        self._make_facts(
+            isolated_fact_factory,
+            alchemy_tag_factory,
+            6,
+            start=isolated_since + datetime.timedelta(days=1),
+        )
+        lazy_9 = self._count_queries(controller, alchemy_store, isolated_since, False)
+        eager_9 = self._count_queries(controller, alchemy_store, isolated_since, True)
+        assert lazy_9 > lazy_3
+        assert eager_9 == eager_3
+        assert eager_9 < lazy_9
+        # Eager loading is only for the block.
+        assert not alchemy_store.session.info['dob_eager_loading']
@@ -0,0 +1,102 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import sys
+
+from nark.backends.sqlalchemy.objects import AlchemyActivity, AlchemyFact
+from nark.managers.query_terms import QueryTerms
+
+from dob.store.interning import interning
+from dob.store.projection import gather_fact_rows
+
+
+class TestInterning(object):
+    """Unit tests for sharing the Activities, Categories, and Tags of results."""
+
+    def _make_facts(
+        self, alchemy_activity_factory, isolated_fact_factory, alchemy_tag_factory,
+    ):
+        tag = alchemy_tag_factory()
+        for fact in isolated_fact_factory(3, activity=alchemy_activity_factory()):
+            fact.tags.append(tag)
+        return tag.name
+
+    def _tag_named(self, fact, name):
+        return next(tag for tag in fact.tags if tag.name == name)
+
+    def _get_facts(self, controller, since, lazy_tags):
+        qt = QueryTerms(since=since.isoformat(), sort_cols=('start',))
+        return controller.facts.get_all(query_terms=qt, lazy_tags=lazy_tags)
+
+    def test_facts_share_items(
+        self,
+        controller,
+        alchemy_store,
+        alchemy_activity_factory,
+        isolated_since,
+        isolated_fact_factory,
+        alchemy_tag_factory,
+    ):
+        controller.store = alchemy_store
+        tag_name = self._make_facts(
+            alchemy_activity_factory, isolated_fact_factory, alchemy_tag_factory,
+        )
+        as_hamsters = (AlchemyActivity.as_hamster, AlchemyFact.as_hamster)
+        facts = self._get_facts(controller, isolated_since, lazy_tags=False)
+        assert len(facts) == 3
+        assert facts[0].activity is not facts[1].activity
+        for lazy_tags in (False, True):
+            with interning():
+                facts = self._get_facts(controller, isolated_since, lazy_tags)
+            assert len(facts) == 3
+            first = facts[0]
+            assert first.activity.name is sys.intern(first.activity.name)
+            assert first.activity.category.name is sys.intern(first.category_name)
+            tag = self._tag_named(first, tag_name)
+            assert tag.name is sys.intern(tag_name)
+            for fact in facts[1:]:
+                assert fact.activity is first.activity
+                assert fact.activity.category is first.activity.category
+                assert self._tag_named(fact, tag_name) is tag
+        # The items' as_hamster are only replaced within the block.
+        assert (AlchemyActivity.as_hamster, AlchemyFact.as_hamster) == as_hamsters
+
+    def test_fact_rows_share_names(
+        self,
+        controller,
+        alchemy_store,
+        alchemy_activity_factory,
+        isolated_since,
+        isolated_fact_factory,
+        alchemy_tag_factory,
+    ):
+        controller.store = alchemy_store
+        tag_name = self._make_facts(
+            alchemy_activity_factory, isolated_fact_factory, alchemy_tag_factory,
+        )
+        qt = QueryTerms(since=isolated_since.isoformat(), sort_cols=('start',))
+        rows = gather_fact_rows(controller, qt, with_tags=True)
+        assert len(rows) == 3
+        first = rows[0]
+        assert first.activity_name is sys.intern(first.activity_name)
+        assert first.category_name is sys.intern(first.category_name)
+        tag = self._tag_named(first, tag_name)
+        assert tag.name is sys.intern(tag_name)
+        for row in rows[1:]:
+            assert row.activity_name is first.activity_name
+            assert row.category_name is first.category_name
+            assert self._tag_named(row, tag_name) is tag
@@ -0,0 +1,164 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from sqlalchemy import inspect
+
+from dob.store.indices import FACT_INDICES, ensure_fact_indices
+from dob.store.keyset import (
+    fact_keyset_latest,
+    fact_keyset_next,
+    fact_keyset_nth_latest,
+    fact_keyset_prev,
+    fact_keyset_seek
+)
+
+
+class TestFactKeyset(object):
+    """Unit tests for keyset navigation of Facts ordered by (start, id)."""
+
+    def _prepare(self, controller, alchemy_store, test_fact_cls):
+        controller.store = alchemy_store
+        controller.store.fact_cls = test_fact_cls
+        return controller
+
+    def _daily_facts(self, isolated_fact_factory):
+        # The isolated Facts are the latest in the store.
+        facts = isolated_fact_factory(
+            5, step=datetime.timedelta(days=1), duration=datetime.timedelta(minutes=20),
+        )
+        facts[-1].end = None
+        return facts
+
+    def test_latest_and_nth_latest(
+        self,
+        controller_with_logging,
+        alchemy_store,
+        test_fact_cls,
+        isolated_fact_factory,
+    ):
+        """Make sure seeking from the end finds the latest Facts."""
+        controller = self._prepare(
+            controller_with_logging, alchemy_store, test_fact_cls,
+        )
+        facts = self._daily_facts(isolated_fact_factory)
+        # The final Fact in the set is the active Fact.
+        latest = fact_keyset_latest(controller)
+        assert latest.pk == facts[-1].pk
+        assert latest.end is None
+        latest_ended = fact_keyset_latest(controller, restrict='ended')
+        assert latest_ended.pk == facts[-2].pk
+        ongoing = fact_keyset_latest(controller, restrict='ongoing')
+        assert ongoing.pk == latest.pk
+        for nth in range(1, len(facts) + 1):
+            found = fact_keyset_nth_latest(controller, nth)
+            assert found.pk == facts[-nth].pk
+        assert fact_keyset_nth_latest(controller, 1000000) is None
+
+    def test_prev_and_next_walk_facts(
+        self,
+        controller_with_logging,
+        alchemy_store,
+        test_fact_cls,
+        isolated_fact_factory,
+    ):
+        """Make sure prev and next visit every Fact in order."""
+        controller = self._prepare(
+            controller_with_logging, alchemy_store, test_fact_cls,
+        )
+        expect = [fact.pk for fact in self._daily_facts(isolated_fact_factory)]
+        fact = fact_keyset_latest(controller)
+        walked = [fact.pk]
+        for _ in range(len(expect) - 1):
+            fact = fact_keyset_prev(controller, fact)
+            walked.insert(0, fact.pk)
+        assert walked == expect
+        fact = controller.facts.get(pk=expect[0])
+        walked = [fact.pk]
+        while True:
+            fact = fact_keyset_next(controller, fact)
+            if fact is None:
+                break
+            walked.append(fact.pk)
+        assert walked == expect
+
+    def test_seek_breaks_start_ties_on_pk(
+        self,
+        controller_with_logging,
+        alchemy_store,
+        test_fact_cls,
+        isolated_since,
+        isolated_fact_factory,
+    ):
+        """Make sure Facts that share a start time are ordered by ID."""
+        controller = self._prepare(
+            controller_with_logging, alchemy_store, test_fact_cls,
+        )
+        # Beyond the other tests' Facts, so nothing follows.
+        moment = isolated_since
+        facts = isolated_fact_factory(
+            3, step=datetime.timedelta(0), duration=datetime.timedelta(0),
+        )
+        middle = facts[1]
+        prev_fact = fact_keyset_prev(controller, middle)
+        next_fact = fact_keyset_next(controller, middle)
+        assert prev_fact.pk == facts[0].pk
+        assert next_fact.pk == facts[2].pk
+        found = fact_keyset_seek(controller, start=moment, pk=None, forward=True)
+        assert found == []
+
+    def test_seek_from_seconds_only_start_times(
+        self,
+        controller_with_logging,
+        alchemy_store,
+        test_fact_cls,
+        isolated_fact_factory,
+    ):
+        """Make sure Facts stored without microseconds are not their own neighbor."""
+        controller = self._prepare(
+            controller_with_logging, alchemy_store, test_fact_cls,
+        )
+        facts = self._daily_facts(isolated_fact_factory)
+        # Store the middle Facts' start times as legacy stores do, without
+        # microseconds, e.g., '2100-01-02 12:00:00', and not '...:00.000000'.
+        alchemy_store.session.execute(
+            "UPDATE facts SET start_time = substr(start_time, 1, 19)"
+            " WHERE id IN ({}, {}, {})".format(*[fact.pk for fact in facts[1:4]])
+        )
+        middle = facts[2]
+        assert fact_keyset_prev(controller, middle).pk == facts[1].pk
+        assert fact_keyset_next(controller, middle).pk == facts[3].pk
+        assert fact_keyset_prev(controller, facts[1]).pk == facts[0].pk
+        assert fact_keyset_next(controller, facts[3]).pk == facts[4].pk
+        assert fact_keyset_next(controller, facts[0]).pk == facts[1].pk
+        assert fact_keyset_prev(controller, facts[4]).pk == facts[3].pk
+
+
+class TestEnsureFactIndices(object):
+    """Unit tests for creating the dob indices on the facts table."""
+
+    def test_ensure_fact_indices_creates_missing(self, alchemy_store):
+        bind = alchemy_store.session.get_bind()
+        for index in FACT_INDICES:
+            index.drop(bind=bind)
+        ensure_fact_indices(alchemy_store)
+        names = set(idx['name'] for idx in inspect(bind).get_indexes('facts'))
+        for index in FACT_INDICES:
+            assert index.name in names
+        # Calling again is a no-op.
+        ensure_fact_indices(alchemy_store)
@@ -0,0 +1,90 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import pytest
+from sqlalchemy import event
+
+from nark.managers.query_terms import QueryTerms
+
+from dob.store.managers import (
+    DobActivityManager,
+    DobCategoryManager,
+    DobFactManager,
+    DobTagManager,
+    install_dob_managers
+)
+
+
+class TestDobManagers(object):
+    """Unit tests for dob's item managers, and their hooks."""
+
+    def test_install_once(self, alchemy_store):
+        facts_mgr = alchemy_store.facts
+        assert isinstance(facts_mgr, DobFactManager)
+        assert isinstance(alchemy_store.activities, DobActivityManager)
+        assert isinstance(alchemy_store.categories, DobCategoryManager)
+        assert isinstance(alchemy_store.tags, DobTagManager)
+        install_dob_managers(alchemy_store)
+        assert alchemy_store.facts is facts_mgr
+
+    def test_gatherer(self, controller, alchemy_store, isolated_since):
+        controller.store = alchemy_store
+        gathered = []
+
+        def gatherer(qt):
+            gathered.append(qt)
+            return ['gathered']
+
+        qt = QueryTerms(since=isolated_since.isoformat())
+        assert controller.facts.get_all(query_terms=qt, gatherer=gatherer) == [
+            'gathered'
+        ]
+        # nark parsed the since term before it called the gatherer.
+        assert gathered == [qt]
+        assert qt.since == isolated_since
+
+    def test_prepare_query_unrun(
+        self, controller, alchemy_store, isolated_since, isolated_fact_factory,
+    ):
+        controller.store = alchemy_store
+        isolated_fact_factory(3)
+        executed = []
+
+        def count_execs(conn, cursor, statement, *args):
+            executed.append(statement)
+
+        qt = QueryTerms(since=isolated_since.isoformat())
+        bind = alchemy_store.session.get_bind()
+        event.listen(bind, 'after_cursor_execute', count_execs)
+        try:
+            query = controller.facts.prepare_query(qt)
+        finally:
+            event.remove(bind, 'after_cursor_execute', count_execs)
+        # nark never ran its query, and the flag is cleared.
+        assert not executed
+        assert 'dob_prepared_query' not in alchemy_store.session.info
+        assert len(query.all()) == 3
+
+    def test_prepare_query_raises_if_not_traced(
+        self, controller, alchemy_store, isolated_since, mocker,
+    ):
+        controller.store = alchemy_store
+        mocker.patch.object(DobFactManager, 'query_prepared_trace', autospec=True)
+        qt = QueryTerms(since=isolated_since.isoformat())
+        with pytest.raises(NotImplementedError):
+            controller.facts.prepare_query(qt)
+        assert 'dob_prepared_query' not in alchemy_store.session.info
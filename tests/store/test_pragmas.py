@@ -0,0 +1,71 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import types
+
+from sqlalchemy import create_engine
+
+from dob.store.pragmas import (
+    SQLITE_PRAGMAS,
+    apply_sqlite_pragmas,
+    install_sqlite_pragmas,
+    query_sqlite_pragmas,
+    sqlite_pragmas,
+)
+
+
+def flat_config(engine='sqlite', **pragmas):
+    config = {'db.engine': engine}
+    for name in SQLITE_PRAGMAS:
+        config['db.sqlite.{}'.format(name)] = pragmas.get(name, '')
+    return config
+
+
+class TestSqlitePragmas(object):
+    """Unit tests for the ``db.sqlite`` PRAGMA settings."""
+
+    def test_defaults_apply_nothing(self):
+        assert not sqlite_pragmas(flat_config(cache_size=0))
+
+    def test_configured_in_apply_order(self):
+        config = flat_config(journal_mode='wal', page_size=8192)
+        pragmas = sqlite_pragmas(config)
+        assert list(pragmas.items()) == [('page_size', 8192), ('journal_mode', 'wal')]
+
+    def test_not_sqlite_applies_nothing(self):
+        assert not sqlite_pragmas(flat_config('postgresql', journal_mode='wal'))
+
+    def test_install_configures_new_store(self, tmpdir):
+        db_url = 'sqlite:///{}'.format(tmpdir.join('pragmas.sqlite'))
+        store = types.SimpleNamespace(
+            create_storage_engine=lambda: create_engine(db_url),
+        )
+        pragmas = {'page_size': 8192, 'journal_mode': 'wal', 'busy_timeout': 1234}
+        install_sqlite_pragmas(store, pragmas)
+        engine = store.create_storage_engine()
+        engine.execute('CREATE TABLE foo (bar INTEGER)')
+        store.session = types.SimpleNamespace(get_bind=lambda: engine)
+        in_effect = query_sqlite_pragmas(store)
+        assert in_effect['page_size'] == 8192
+        assert in_effect['journal_mode'] == 'wal'
+        assert in_effect['busy_timeout'] == 1234
+
+    def test_apply_to_dbapi_connection(self):
+        dbapi_connection = create_engine('sqlite://').raw_connection()
+        apply_sqlite_pragmas(dbapi_connection, {'cache_size': -4096})
+        cursor = dbapi_connection.cursor()
+        assert cursor.execute('PRAGMA cache_size').fetchone()[0] == -4096
@@ -0,0 +1,107 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from nark.managers.query_terms import QueryTerms
+
+from dob.store.projection import FactRow, fact_rows_supported, gather_fact_rows
+
+
+class TestFactRow(object):
+    """Unit tests for the read-only FactRow."""
+
+    START = datetime.datetime(2020, 1, 1, 9, 0, 0)
+
+    def test_formats(self):
+        end = self.START + datetime.timedelta(minutes=90)
+        row = FactRow(1, self.START, end, 'act', 'cat', '', 0)
+        assert row.start_fmt() == '2020-01-01 09:00:00'
+        assert row.end_fmt('%H:%M') == '10:30'
+        assert row.format_delta(style='%H:%M') == '01:30'
+        assert row.description is None
+        assert row.description_or_empty == ''
+        assert row.deleted is False
+        assert row.oid_actegory() == 'act@cat'
+
+    def test_active(self):
+        now = self.START + datetime.timedelta(minutes=5)
+        row = FactRow(1, self.START, None, None, None, 'desc', 0, time_now=now)
+        assert row.end_fmt() == ''
+        assert row.delta() == datetime.timedelta(minutes=5)
+        assert row.activity_name == ''
+        assert row.oid_actegory() == '@'
+
+
+class TestGatherFactRows(object):
+    """Unit tests for gathering FactRows instead of Facts."""
+
+    def test_supported(self, controller):
+        def supported(output_format, **kwargs):
+            return fact_rows_supported(controller, QueryTerms(**kwargs), output_format)
+
+        assert supported('csv', sort_cols=('start',))
+        assert supported('table', sort_cols=('usage',))
+        assert not supported('factoid')
+        assert not supported('csv', group_activity=True)
+        assert not supported('csv', include_stats=True)
+        assert not supported('csv', sort_cols=('day',))
+        assert not supported('csv', match_tags=['foo'])
+
+    def test_same_as_facts(
+        self,
+        controller,
+        alchemy_store,
+        test_fact_cls,
+        isolated_since,
+        isolated_fact_factory,
+        alchemy_tag_factory,
+    ):
+        controller.store = alchemy_store
+        controller.store.fact_cls = test_fact_cls
+        for idx, fact in enumerate(isolated_fact_factory(4)):
+            for _idx in range(idx):
+                fact.tags.append(alchemy_tag_factory())
+
+        def query_terms():
+            return QueryTerms(since=isolated_since.isoformat(), sort_cols=('start',))
+
+        facts = controller.facts.get_all(query_terms=query_terms())
+        rows = gather_fact_rows(controller, query_terms(), with_tags=True)
+        assert len(rows) == len(facts) == 4
+        for row, fact in zip(rows, facts):
+            assert isinstance(row, FactRow)
+            assert row.pk == fact.pk
+            assert (row.start, row.end) == (fact.start, fact.end)
+            assert row.activity_name == fact.activity_name
+            assert row.category_name == fact.category_name
+            assert row.description == fact.description
+            assert row.deleted == fact.deleted
+            assert sorted(tag.name for tag in row.tags) == sorted(
+                tag.name for tag in fact.tags
+            )
+        # Without tags, and with nark's since and until parsing, and limits.
+        qt = query_terms()
+        qt.until = (isolated_since + datetime.timedelta(hours=3)).isoformat()
+        qt.limit = 2
+        rows = gather_fact_rows(controller, qt)
+        assert [row.pk for row in rows] == [fact.pk for fact in facts[:2]]
+        assert not any(row.tags for row in rows)
+        # The gatherer is only for the call.
+        assert [fact.pk for fact in controller.facts.get_all(query_terms=qt)] == [
+            fact.pk for fact in facts[:2]
+        ]
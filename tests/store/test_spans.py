@@ -0,0 +1,165 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+import logging
+import types
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from dob.store.spans import (
+    FACT_SPANS_DDL,
+    ensure_fact_spans,
+    fact_spans,
+    fact_spans_active,
+    fact_spans_ready
+)
+
+
+@pytest.fixture
+def spans_store(tmpdir):
+    """A bare-bones store with just a facts table, with Facts that predate the spans."""
+    engine = create_engine('sqlite:///{}'.format(tmpdir.join('spans.sqlite')))
+    engine.execute(
+        'CREATE TABLE facts ('
+        ' id INTEGER PRIMARY KEY, start_time DATETIME, end_time DATETIME'
+        ')'
+    )
+    engine.execute(
+        'INSERT INTO facts (id, start_time, end_time) VALUES'
+        " (1, '2020-01-01 10:00:00', '2020-01-01 10:30:00'),"
+        " (2, '2020-01-01 11:00:00.000000', NULL)"
+    )
+    store = types.SimpleNamespace(
+        session=sessionmaker(bind=engine)(),
+        logger=logging.getLogger('nark.store'),
+    )
+    ensure_fact_spans(store)
+    return store
+
+
+def fact_span_rows(store):
+    return store.session.execute(
+        'SELECT fact_id, start_epoch, end_epoch, duration FROM dob_fact_spans'
+        ' ORDER BY fact_id'
+    ).fetchall()
+
+
+class TestFactSpansTable(object):
+    """Unit tests for the epoch and duration side table, and its triggers."""
+
+    EPOCH_2020 = 1577836800
+
+    def test_ensure_fills_in_and_is_idempotent(self, spans_store):
+        assert fact_spans_ready(spans_store)
+        ensure_fact_spans(spans_store)
+        names = set(
+            row[0] for row in spans_store.session.execute(
+                'SELECT name FROM sqlite_master'
+            )
+        )
+        assert names.issuperset(name for name, _ddl in FACT_SPANS_DDL)
+        # The existing Facts were filled in once (and only once).
+        hour = 3600
+        assert fact_span_rows(spans_store) == [
+            (1, self.EPOCH_2020 + 10 * hour, self.EPOCH_2020 + 10 * hour + 1800, 1800),
+            (2, self.EPOCH_2020 + 11 * hour, None, None),
+        ]
+
+    def test_triggers_keep_in_sync(self, spans_store):
+        execute = spans_store.session.get_bind().execute
+        execute("UPDATE facts SET end_time = '2020-01-01 12:00:00' WHERE id = 2")
+        execute(
+            'INSERT INTO facts (id, start_time, end_time)'
+            " VALUES (3, '2020-01-02 00:00:00', '2020-01-02 00:00:05')"
+        )
+        execute('DELETE FROM facts WHERE id = 1')
+        assert [row[0] for row in fact_span_rows(spans_store)] == [2, 3]
+        assert [row[3] for row in fact_span_rows(spans_store)] == [3600, 5]
+
+    def test_time_window_uses_index(self, spans_store):
+        plan = ' '.join(
+            str(row[-1]) for row in spans_store.session.execute(
+                'EXPLAIN QUERY PLAN SELECT fact_id FROM dob_fact_spans'
+                ' WHERE start_epoch >= 0'
+            )
+        )
+        assert 'ix_dob_fact_spans_start_epoch' in plan
+
+
+class TestFactSpansQueries(object):
+    """Unit tests for the managers' time filters and spans within fact_spans."""
+
+    def _make_facts(self, alchemy_store, isolated_fact_factory):
+        facts = isolated_fact_factory(6, step=datetime.timedelta(hours=2))
+        for idx, fact in enumerate(facts):
+            fact.end = fact.start + datetime.timedelta(minutes=15 * (idx + 1))
+        facts[-1].end = None
+        # The store fixture runs each test in a transaction (which it rolls
+        # back), so run the DDL (and migration) in that transaction.
+        alchemy_store.session.flush()
+        for _name, ddl in FACT_SPANS_DDL:
+            alchemy_store.session.execute(ddl)
+        alchemy_store.dob_fact_spans = True
+
+    def test_time_filters_match_nark(
+        self, controller, alchemy_store, isolated_since, isolated_fact_factory,
+    ):
+        controller.store = alchemy_store
+        self._make_facts(alchemy_store, isolated_fact_factory)
+        since = isolated_since
+        hours = datetime.timedelta(hours=1)
+        windows = (
+            dict(since=since + 3 * hours),
+            dict(until=since + 5 * hours),
+            dict(since=since + 1 * hours, until=since + 7 * hours),
+            dict(since=since + 3 * hours, partial=True),
+            dict(until=since + 5 * hours, partial=True),
+            dict(since=since + 1 * hours, until=since + 9 * hours, partial=True),
+            dict(since=since, endless=True),
+        )
+        for window in windows:
+            expect = [fact.pk for fact in controller.facts.get_all(**window)]
+            with fact_spans(controller):
+                found = [fact.pk for fact in controller.facts.get_all(**window)]
+            assert found == expect, window
+            assert expect
+        # The span table is only used within the block.
+        assert not fact_spans_active(alchemy_store)
+
+    def test_usage_spans_match_nark(
+        self, controller, alchemy_store, isolated_since, isolated_fact_factory,
+    ):
+        controller.store = alchemy_store
+        self._make_facts(alchemy_store, isolated_fact_factory)
+
+        def usage(manager):
+            return [
+                (item.pk, uses, round(span or 0, 9))
+                for item, uses, span in manager.get_all_by_usage(
+                    since=isolated_since, sort_cols=('time',),
+                )
+            ]
+
+        managers = (controller.activities, controller.categories, controller.tags)
+        for manager in managers:
+            expect = usage(manager)
+            with fact_spans(controller):
+                assert usage(manager) == expect
+            assert expect
@@ -0,0 +1,82 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from nark.managers.query_terms import QueryTerms
+
+from dob.store.projection import gather_fact_rows
+from dob.store.streaming import (
+    fact_durations_query,
+    prepare_fact_query,
+    stream_fact_results,
+    stream_fact_rows
+)
+
+
+class TestStreaming(object):
+    """Unit tests for streaming the Fact query results."""
+
+    def _query_terms(self, since):
+        qt = QueryTerms(
+            since=since.isoformat(),
+            group_activity=True,
+            group_category=True,
+            group_days=True,
+            sort_cols=('day', 'time'),
+            sort_orders=('asc', 'desc'),
+        )
+        qt.include_stats = True
+        return qt
+
+    def _summarize(self, result):
+        fact, *cols = result
+        tags = sorted((tag.name, tag.freq) for tag in fact.tags)
+        return (fact.pk, fact.activity_name, fact.category_name, tags, cols)
+
+    def test_stream_same_as_get_all(
+        self, controller, alchemy_store, isolated_since, isolated_fact_factory,
+    ):
+        controller.store = alchemy_store
+        facts = isolated_fact_factory(6, step=datetime.timedelta(hours=9))
+        for idx, fact in enumerate(facts):
+            fact.end = fact.start + datetime.timedelta(minutes=30 + idx)
+        expect = controller.facts.get_all(query_terms=self._query_terms(isolated_since))
+        assert len(expect) == 6
+        qt = self._query_terms(isolated_since)
+        query = prepare_fact_query(controller, qt)
+        results = stream_fact_results(controller, query, qt)
+        assert iter(results) is results
+        results = list(results)
+        assert [self._summarize(result) for result in results] == [
+            self._summarize(result) for result in expect
+        ]
+        durations = [duration for (duration,) in fact_durations_query(query)]
+        assert durations == [result[1] for result in expect]
+
+    def test_stream_fact_rows_same_as_gather(
+        self, controller, alchemy_store, isolated_since, isolated_fact_factory,
+    ):
+        controller.store = alchemy_store
+        isolated_fact_factory(4, duration=datetime.timedelta(minutes=20))
+        qt = QueryTerms(since=isolated_since.isoformat())
+        expect = gather_fact_rows(controller, qt, with_tags=True)
+        assert len(expect) == 4
+        qt = QueryTerms(since=isolated_since.isoformat())
+        rows = stream_fact_rows(controller, qt, with_tags=True)
+        assert iter(rows) is rows
+        assert [repr(row) for row in rows] == [repr(row) for row in expect]
@@ -0,0 +1,96 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+from nark.backends.sqlalchemy.managers.fact import FactManager
+from nark.managers.query_terms import QueryTerms
+
+from dob.store.top_k import select_top_k, top_k_sort_keys
+
+
+class TestTopK(object):
+    """Unit tests for selecting the top K results of post-sorted reports."""
+
+    def test_select_top_k_matches_sorted(self):
+        results = [(idx % 3, 'abcde'[idx % 5], idx) for idx in range(30)]
+        sort_keys = [
+            (lambda result: result[0], True),
+            (lambda result: result[1], False),
+        ]
+        expect = sorted(results, key=lambda result: result[1])
+        expect = sorted(expect, key=lambda result: result[0], reverse=True)
+        assert select_top_k(results, sort_keys, 4) == expect[:4]
+        assert select_top_k(results, sort_keys, 4, offset=5) == expect[5:9]
+        assert select_top_k(results, sort_keys, 100) == expect
+
+    def test_sort_keys_only_when_sql_cannot_sort(self):
+        # Sorting Facts by activity works in SQL (as does grouping by it).
+        assert top_k_sort_keys(QueryTerms(sort_cols=('activity',))) is None
+        qt = QueryTerms(group_activity=True, sort_cols=('activity',))
+        qt.include_stats = True
+        assert top_k_sort_keys(qt) is None
+        # But not when grouping by category, which concats the activity names.
+        qt = QueryTerms(group_category=True, sort_cols=('activity', 'time'))
+        qt.include_stats = True
+        sort_keys = top_k_sort_keys(qt)
+        assert [descending for _key, descending in sort_keys] == [False, False]
+        # And the Tags aggregate is not handled, so leave it to SQL.
+        qt.sort_cols = ('activity', 'tag')
+        assert top_k_sort_keys(qt) is None
+
+    def test_sort_keys_names_like_report(self):
+        i_activities = FactManager.RESULT_GRP_INDEX['activities']
+
+        def result_with_activities(*names):
+            aggregate_cols = [None] * len(FactManager.RESULT_GRP_INDEX)
+            aggregate_cols[i_activities] = list(names)
+            return tuple([None] + aggregate_cols)
+
+        results = [
+            result_with_activities('ab', 'c'),
+            result_with_activities('ab1'),
+        ]
+        qt = QueryTerms(group_category=True, sort_cols=('activity',))
+        qt.include_stats = True
+        # The table sorts on 'ab, c' and 'ab1', but the journal on 'ab@, c@'
+        # and 'ab1@', which puts the latter first.
+        (key, _desc), = top_k_sort_keys(qt)
+        assert [key(result) for result in results] == ['ab, c', 'ab1']
+        assert select_top_k(results, [(key, False)], 1) == results[:1]
+        (key, _desc), = top_k_sort_keys(qt, output_format='journal')
+        assert [key(result) for result in results] == ['ab@, c@', 'ab1@']
+        assert select_top_k(results, [(key, False)], 1) == results[1:]
+
+    def test_top_k_groups_by_activity_names(
+        self, controller, alchemy_store, isolated_since, isolated_fact_factory,
+    ):
+        controller.store = alchemy_store
+        isolated_fact_factory(5)
+        qt = QueryTerms(
+            since=isolated_since.isoformat(),
+            group_category=True,
+            sort_cols=('activity',),
+            sort_orders=('desc',),
+        )
+        qt.include_stats = True
+        results = controller.facts.get_all(query_terms=qt)
+        assert len(results) == 5
+        expect = sorted(
+            results, key=lambda result: result[0].activity_name, reverse=True,
+        )
+        sort_keys = top_k_sort_keys(qt)
+        assert select_top_k(results, sort_keys, 2) == expect[:2]
+        assert select_top_k(results, sort_keys, 2, offset=2) == expect[2:4]
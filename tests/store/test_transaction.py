@@ -0,0 +1,46 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import pytest
+from sqlalchemy.orm import Session
+
+from nark.items.category import Category
+
+from dob.store.transaction import single_transaction
+
+
+class TestSingleTransaction(object):
+    """Unit tests for grouping store writes into one transaction."""
+
+    def test_commits_once(self, alchemy_store, mocker):
+        commit = mocker.patch.object(Session, 'commit')
+        with single_transaction(alchemy_store):
+            alchemy_store.categories.save(Category(name='txn-once-1'))
+            alchemy_store.categories.save(Category(name='txn-once-2'))
+        assert commit.call_count == 1
+        # The managers' commits were only flushes, but nonetheless visible.
+        assert alchemy_store.categories.get_by_name('txn-once-2')
+
+    def test_rolls_back_on_error(self, alchemy_store):
+        with pytest.raises(RuntimeError):
+            with single_transaction(alchemy_store):
+                alchemy_store.categories.save(Category(name='txn-rollback'))
+                raise RuntimeError('Oops')
+        with pytest.raises(KeyError):
+            alchemy_store.categories.get_by_name('txn-rollback')
+        # The session commits normally again.
+        assert 'commit' not in vars(alchemy_store.session)
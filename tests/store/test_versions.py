@@ -0,0 +1,114 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import logging
+import types
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from dob.store.versions import (
+    FACT_VERSIONS_DDL,
+    FactVersions,
+    StaleFactsError,
+    VersionedFactManager,
+    ensure_fact_versions,
+    fact_versions,
+)
+
+
+@pytest.fixture
+def versions_store(tmpdir):
+    """A bare-bones store with just a facts table, on a file, so that
+    a second session can stand in for another dob process."""
+    engine = create_engine('sqlite:///{}'.format(tmpdir.join('versions.sqlite')))
+    engine.execute('CREATE TABLE facts (id INTEGER PRIMARY KEY, deleted BOOLEAN)')
+    engine.execute('INSERT INTO facts (id, deleted) VALUES (1, 0), (2, 0), (3, 0)')
+    store = types.SimpleNamespace(
+        session=sessionmaker(bind=engine)(),
+        logger=logging.getLogger('nark.store'),
+    )
+    ensure_fact_versions(store)
+    return store
+
+
+def other_process(store, sql):
+    store.session.get_bind().execute(sql)
+
+
+class TestFactVersions(object):
+    """Unit tests for per-Fact row versions."""
+
+    def test_ensure_is_idempotent(self, versions_store):
+        ensure_fact_versions(versions_store)
+        names = set(
+            row[0] for row in versions_store.session.execute(
+                'SELECT name FROM sqlite_master'
+            )
+        )
+        assert names.issuperset(name for name, _ddl in FACT_VERSIONS_DDL)
+
+    def test_update_and_delete_bump_version(self, versions_store):
+        versions = FactVersions(versions_store)
+        assert versions.mark == 0
+        assert versions.changed([1, 2, 3]) == []
+        other_process(versions_store, 'UPDATE facts SET deleted = 1 WHERE id = 2')
+        other_process(versions_store, 'DELETE FROM facts WHERE id = 3')
+        # Inserts are not stamped.
+        other_process(versions_store, 'INSERT INTO facts (id, deleted) VALUES (4, 0)')
+        assert versions.changed([1, 2, 3, 4, None, -1]) == [2, 3]
+        with pytest.raises(StaleFactsError) as excinfo:
+            versions.must_be_current([1, 2])
+        assert excinfo.value.pks == [2]
+        assert '#2' in str(excinfo.value)
+
+    def test_own_writes_are_not_stale(self, versions_store):
+        versions = FactVersions(versions_store)
+        versions_store.session.execute('UPDATE facts SET deleted = 1 WHERE id = 1')
+        versions_store.session.commit()
+        versions.record([1])
+        assert versions.changed([1]) == []
+        # But the next change by someone else is.
+        other_process(versions_store, 'UPDATE facts SET deleted = 0 WHERE id = 1')
+        assert versions.changed([1]) == [1]
+
+    def test_disabled_without_table(self, versions_store):
+        versions_store.session.execute('DROP TABLE dob_fact_versions')
+        versions = FactVersions(versions_store)
+        assert not versions.enabled
+        assert versions.changed([1, 2, 3]) == []
+
+    def test_fact_versions_made_once(self, versions_store):
+        assert fact_versions(versions_store) is fact_versions(versions_store)
+
+
+class TestVersionedFactManager(object):
+    """Unit tests for checking versions on each save."""
+
+    def test_save_checks_version(self, versions_store, mocker):
+        facts_mgr = mocker.MagicMock(store=versions_store)
+        versioned = VersionedFactManager(facts_mgr)
+        fact_versions(versions_store)
+        versioned.save(types.SimpleNamespace(pk=1))
+        assert facts_mgr.save.call_count == 1
+        other_process(versions_store, 'UPDATE facts SET deleted = 1 WHERE id = 2')
+        with pytest.raises(StaleFactsError):
+            versioned.save(types.SimpleNamespace(pk=2))
+        assert facts_mgr.save.call_count == 1
+        # Other attributes are the wrapped manager's.
+        assert versioned.store is versions_store
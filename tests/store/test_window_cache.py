@@ -0,0 +1,82 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from dob.store.window_cache import FactWindowCache, fact_window_cache
+
+
+class TestFactWindowCache(object):
+    """Unit tests for the Carousel's windowed Fact cache."""
+
+    def _prepare(self, alchemy_store, test_fact_cls, isolated_fact_factory):
+        alchemy_store.fact_cls = test_fact_cls
+        facts = isolated_fact_factory(12, step=datetime.timedelta(minutes=45))
+        for fact in facts[3::4]:
+            # Include momentaneous Facts, the trickiest cases.
+            fact.end = fact.start
+        alchemy_store.session.flush()
+        return [alchemy_store.facts.get(pk=fact.pk) for fact in facts]
+
+    def test_cache_agrees_with_manager(
+        self, alchemy_store, test_fact_cls, isolated_fact_factory,
+    ):
+        """Make sure cached lookups find the same Facts as the store does."""
+        facts = self._prepare(alchemy_store, test_fact_cls, isolated_fact_factory)
+        facts_mgr = alchemy_store.facts
+        cache = FactWindowCache(facts_mgr, window_size=3, max_facts=6)
+        for fact in facts:
+            expect = facts_mgr.antecedent(fact=fact)
+            found = cache.antecedent(fact=fact)
+            assert (found and found.pk) == (expect and expect.pk)
+            expect = facts_mgr.subsequent(fact=fact)
+            found = cache.subsequent(fact=fact)
+            assert (found and found.pk) == (expect and expect.pk)
+            for ref_time in (fact.start, fact.end):
+                expect = facts_mgr.antecedent(ref_time=ref_time)
+                found = cache.antecedent(ref_time=ref_time)
+                assert (found and found.pk) == (expect and expect.pk)
+                expect = facts_mgr.subsequent(ref_time=ref_time)
+                found = cache.subsequent(ref_time=ref_time)
+                assert (found and found.pk) == (expect and expect.pk)
+        assert cache.hits > 0
+        assert cache.misses > 0
+        # The LRU keeps the cache bounded.
+        assert cache.cached_count <= cache.max_facts
+
+    def test_walking_backwards_reuses_window(
+        self, alchemy_store, test_fact_cls, isolated_fact_factory,
+    ):
+        """Make sure scrolling through the store answers from prefetched Facts."""
+        facts = self._prepare(alchemy_store, test_fact_cls, isolated_fact_factory)
+        cache = FactWindowCache(alchemy_store.facts, window_size=20, max_facts=100)
+        fact = facts[-1]
+        walked = [fact.pk]
+        for _ in range(len(facts) - 1):
+            fact = cache.antecedent(fact=fact)
+            walked.insert(0, fact.pk)
+        assert walked == [fact.pk for fact in facts]
+        assert cache.misses == 1
+
+    def test_context_manager_swaps_manager(self, controller_with_logging):
+        controller = controller_with_logging
+        facts_mgr = controller.store.facts
+        with fact_window_cache(controller) as cache:
+            assert isinstance(cache, FactWindowCache)
+            assert controller.facts is cache
+            assert cache.window_size == controller.config['editor.window_size']
+        assert controller.facts is facts_mgr
@@ -0,0 +1,63 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import sqlite3
+
+import pytest
+
+# Commands that never need the data store.
+NON_DATA_COMMANDS = (
+    ['help'],
+    ['version'],
+    ['config', 'get', 'db', 'path'],
+    ['config', 'show'],
+    ['styles', 'list'],
+    ['styles', 'show'],
+    ['rules', 'list'],
+    ['rules', 'show'],
+    ['ignore', 'list'],
+    ['ignore', 'show'],
+)
+
+
+class TestDobControllerLazyStore(object):
+    """Tests that the data store is only opened by commands that use it."""
+
+    @pytest.fixture
+    def sqlite_connect(self, mocker):
+        return mocker.patch.object(
+            sqlite3.dbapi2, 'connect', side_effect=sqlite3.dbapi2.connect,
+        )
+
+    @pytest.fixture
+    def germinated(self, runner):
+        result = runner(['init'])
+        assert result.exit_code == 0
+
+    @pytest.mark.parametrize('args', NON_DATA_COMMANDS)
+    def test_non_data_command_does_not_open_store(
+        self, runner, germinated, sqlite_connect, args,
+    ):
+        # Not checking the exit code: some of these commands exit nonzero
+        # when the user has no styles or rules config, which is fine here.
+        runner(args)
+        assert not sqlite_connect.called
+
+    def test_data_command_opens_store(self, runner, germinated, sqlite_connect):
+        result = runner(['stats'])
+        assert result.exit_code == 0
+        assert sqlite_connect.called
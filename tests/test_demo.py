@@ -0,0 +1,70 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import sqlite3
+
+from dob.demo import DemoFactGenerator
+
+
+def demo_fact_count():
+    return len([
+        name for name in dir(DemoFactGenerator) if name.startswith('demo_fact_')
+    ])
+
+
+def count_facts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestDemoBulkSeed(object):
+    def test_demo_out_seeds_history_and_demo_facts(self, runner, tmpdir):
+        out_path = tmpdir.join('demo.sqlite').strpath
+        result = runner(['demo', '--seed', '1', '--facts', '50', '--out', out_path])
+        assert result.exit_code == 0
+        n_demo = demo_fact_count()
+        assert count_facts(out_path) == 50 + n_demo
+        # The history ends before the first demo Fact, which gets the next ID.
+        conn = sqlite3.connect(out_path)
+        try:
+            history_end, demo_start = conn.execute(
+                'SELECT'
+                ' (SELECT MAX(end_time) FROM facts WHERE id <= 50),'
+                ' (SELECT MIN(start_time) FROM facts WHERE id > 50)'
+            ).fetchone()
+        finally:
+            conn.close()
+        assert history_end < demo_start
+
+    def test_demo_out_refuses_existing_file(self, runner, tmpdir):
+        out_path = tmpdir.join('demo.sqlite')
+        out_path.write('')
+        result = runner(['demo', '--out', out_path.strpath])
+        assert result.exit_code != 0
+
+    def test_demo_carousel_edits_only_demo_facts(self, runner, mocker):
+        confirmer = mocker.patch('dob.demo.prompt_and_save_confirmer')
+        result = runner(['demo', '--facts', '20'])
+        assert result.exit_code == 0
+        edit_facts = confirmer.call_args[1]['edit_facts']
+        n_demo = demo_fact_count()
+        assert len(edit_facts) == n_demo
+        assert edit_facts[-1].end is None
+        assert all(fact.activity.name == 'Demo' for fact in edit_facts)
@@ -36,6 +36,7 @@ class TestDetails(object):
             'Plugins directory at: ',
             'Logfile stored at: ',
             'Using sqlite on database: :memory:',
+            'SQLite PRAGMAs configured: (defaults)',
         )
         for idx, line in enumerate(out.splitlines()):
             assert line.startswith(startswiths[idx])
@@ -50,7 +51,19 @@ class TestDetails(object):
         out, err = capsys.readouterr()
         for item in (engine, path):
             assert item in out
-        assert out.splitlines()[-1] == 'Using {} on database: {}'.format(engine, path)
+        assert out.splitlines()[-2] == 'Using {} on database: {}'.format(engine, path)
+
+    def test_details_sqlite_pragmas(self, controller, mocker, capsys):
+        """Make sure the configured SQLite PRAGMAs are shown."""
+        mocker.patch.object(controller, '_get_store')
+        controller.setup_tty_color(use_color=False)
+        controller.config['db.sqlite.journal_mode'] = 'wal'
+        controller.config['db.sqlite.mmap_size'] = '1048576'
+        echo_app_details(controller)
+        out, err = capsys.readouterr()
+        assert out.splitlines()[-1] == (
+            'SQLite PRAGMAs configured: journal_mode=wal, mmap_size=1048576'
+        )
 
     def test_details_non_sqlite(
         self,
@@ -0,0 +1,191 @@
+# This file exists within 'dob':
+#
+#   https://github.com/hotoffthehamster/dob
+#
+# Copyright © 2020 Landon Bouma. All rights reserved.
+#
+# 'dob' is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License  as  published by the Free Software Foundation,
+# either version 3  of the License,  or  (at your option)  any   later    version.
+#
+# 'dob' is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY  or  FITNESS FOR A PARTICULAR
+# PURPOSE.  See  the  GNU General Public License  for  more details.
+#
+# You can find the GNU General Public License reprinted in the file titled 'LICENSE',
+# or visit <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import threading
+import time
+import types
+from datetime import datetime
+
+import pytest
+
+from dob_bright.controller import Controller
+
+from nark.items.activity import Activity
+from nark.items.category import Category
+from nark.items.fact import Fact
+
+from dob import spool
+from dob.instrument.plugins import PluginCosts
+from dob.spool import (
+    drain_spool,
+    load_spool_entry,
+    requeue_failed,
+    run_with_limits,
+    spool_entry_paths,
+    spool_post_process,
+)
+
+
+class NoSuchFacts(object):
+    def get(self, pk):
+        raise KeyError(pk)
+
+
+def spool_controller(timeout=5, retries=2, concurrency=2):
+    config = {
+        'post_process.timeout': timeout,
+        'post_process.retries': retries,
+        'post_process.concurrency': concurrency,
+    }
+    return types.SimpleNamespace(
+        config=config,
+        ctx=None,
+        facts=NoSuchFacts(),
+        configfile_path=None,
+        config_keyvals=(),
+        client_logger=logging.getLogger('dob'),
+    )
+
+
+@pytest.fixture
+def post_processors(mocker, tmp_path):
+    mocker.patch.object(spool, 'spawn_spool_worker')
+    # Keep the plugin accounting out of the user's cache.
+    mocker.patch.object(
+        spool, 'PLUGIN_COSTS', PluginCosts(history_path=str(tmp_path / 'costs.json')),
+    )
+    handlers = []
+    mocker.patch.object(Controller, 'POST_PROCESSORS', handlers)
+    return handlers
+
+
+def make_fact(pk):
+    return Fact(
+        activity=Activity(name='act', category=Category(name='cat')),
+        start=datetime(2020, 1, 1, 10, 0),
+        end=datetime(2020, 1, 1, 11, 30),
+        pk=pk,
+        description='Pushed later.',
+    )
+
+
+class TestRunWithLimits(object):
+
+    def test_outcomes(self):
+        def fails():
+            raise ValueError('nope')
+
+        errors = run_with_limits(
+            [('ok', lambda: None), ('fails', fails), ('slow', lambda: time.sleep(2))],
+            timeout=0.2,
+            concurrency=3,
+        )
+        assert errors['ok'] is None
+        assert errors['fails'] == 'nope'
+        assert errors['slow'].startswith('Timed out')
+
+    def test_concurrency_limit(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def call():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+        calls = [(str(idx), call) for idx in range(6)]
+        errors = run_with_limits(calls, timeout=5, concurrency=2)
+        assert set(errors.values()) == {None}
+        assert running[1] == 2
+
+
+class TestSpool(object):
+
+    def test_nothing_to_spool(self, post_processors, tmp_path):
+        controller = spool_controller()
+        spool_dir = str(tmp_path)
+        assert spool_post_process(controller, make_fact(1), spool_dir=spool_dir) is None
+        post_processors.append(lambda *args, **kwargs: None)
+        assert spool_post_process(controller, [], spool_dir=spool_dir) is None
+        assert not spool.spawn_spool_worker.called
+
+    def test_spool_and_drain(self, post_processors, tmp_path):
+        received = []
+
+        def handler(ctx, controller, facts, **kwargs):
+            received.append(facts)
+
+        post_processors.append(handler)
+        controller = spool_controller()
+        spool_dir = str(tmp_path)
+        path = spool_post_process(
+            controller, [make_fact(1), make_fact(2)], command='now', spool_dir=spool_dir,
+        )
+        assert spool.spawn_spool_worker.called
+        assert spool_entry_paths(spool_dir) == [path]
+        entry = load_spool_entry(path)
+        assert entry['pks'] == [1, 2]
+        assert entry['command'] == 'now'
+        # Nothing runs until drained.
+        assert received == []
+
+        outcomes = drain_spool(controller, spool_dir=spool_dir)
+        assert outcomes == {'drained': 1}
+        assert not os.path.exists(path)
+        # The Facts were rebuilt from the snapshot (the store doesn't have them).
+        facts, = received
+        assert [fact.pk for fact in facts] == [1, 2]
+        assert facts[0].activity.name == 'act'
+        assert facts[0].category.name == 'cat'
+        assert facts[0].end == datetime(2020, 1, 1, 11, 30)
+        assert facts[0].description == 'Pushed later.'
+
+    def test_retry_then_fail_then_requeue(self, post_processors, tmp_path):
+        calls = {'good': 0, 'flaky': 0}
+
+        def good(ctx, controller, facts, **kwargs):
+            calls['good'] += 1
+
+        def flaky(ctx, controller, facts, **kwargs):
+            calls['flaky'] += 1
+            raise RuntimeError('remote is down')
+
+        post_processors.extend([good, flaky])
+        controller = spool_controller(retries=2)
+        spool_dir = str(tmp_path)
+        path = spool_post_process(controller, make_fact(1), spool_dir=spool_dir)
+
+        assert drain_spool(controller, spool_dir=spool_dir) == {'pending': 1}
+        entry = load_spool_entry(path)
+        status, = entry['handlers'].values()
+        assert status == {'tries': 1, 'error': 'remote is down'}
+
+        assert drain_spool(controller, spool_dir=spool_dir) == {'failed': 1}
+        assert spool_entry_paths(spool_dir) == []
+        assert len(spool_entry_paths(spool_dir, failed=True)) == 1
+        # The handler that succeeded is not run again.
+        assert calls == {'good': 1, 'flaky': 2}
+
+        assert requeue_failed(spool_dir) == 1
+        post_processors.remove(flaky)
+        assert drain_spool(controller, spool_dir=spool_dir) == {'drained': 1}
+        assert calls == {'good': 1, 'flaky': 2}